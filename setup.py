@@ -15,6 +15,7 @@ setup(
         "geopy",
         "pyyaml",
         "numpy",
+        "scipy",
   #      "pytest",
         'gurobipy',
         "matplotlib",
@@ -23,13 +23,29 @@ def edmonds_karp_core(R, s, t, cutoff, is_lowest_hierarchy, routing_restrictions
     R_succ = R.succ
 
     path_map = {}
+    # (u, v) or (v, u) -> the first path identifier of the path map that was added for one of these directions
+    path_of_edge = {}
+    # index of a routing restriction -> its paths and the paths of it that are in the path map with their edges
+    restriction_paths = []
+    # path identifier -> the indices of the routing restrictions containing the path, in the order of the restrictions
+    restrictions_of_path = {}
     #Since the edmonds karp algorithm transformed a directed graph into an undirected graph,
     # the path map keeps track which directed edges were used to deduce the undirected graph
     if not is_lowest_hierarchy:
+        mapped_edges = set()
         for (u, v) in G.edges():
-            if (u, v) not in path_map.values():
+            if (u, v) not in mapped_edges:
+                mapped_edges.add((u, v))
                 path_map[G[u][v]["label"]] = (u, v)
                 G[u][v]['id'] = G[u][v]["label"]
+        for path_key, (u, v) in path_map.items():
+            path_of_edge.setdefault((u, v), path_key)
+            path_of_edge.setdefault((v, u), path_key)
+        for index, routing_restriction in enumerate(routing_restrictions or []):
+            paths = set(routing_restriction.paths)
+            restriction_paths.append((paths, [(p_prime, path_map[p_prime]) for p_prime in paths & path_map.keys()]))
+            for path_id in paths:
+                restrictions_of_path.setdefault(path_id, []).append(index)
 
     inf = R.graph['inf']
 
@@ -65,7 +81,7 @@ def edmonds_karp_core(R, s, t, cutoff, is_lowest_hierarchy, routing_restrictions
                     u = v
                     continue
                 # translate the tuple to a path identifier via the path map
-                path_id = next((path_key for path_key, p in path_map.items() if p == (u, v) or p == (v, u)), None)
+                path_id = path_of_edge.get((u, v))
                 logger.debug("Path {} resolves to path id {}".format((u, v), path_id))
                 if path_id == None:
                     continue
@@ -81,8 +97,13 @@ def edmonds_karp_core(R, s, t, cutoff, is_lowest_hierarchy, routing_restrictions
                 u = v
 
             logger.debug("Edmonds karp found a new path: {} with flow: {}".format(path, flow))
-            for routing_restriction in routing_restrictions:
-                intersection = set(routing_restriction.paths) & path_set
+            # only the restrictions containing a path of the augmenting path are affected
+            affected_restrictions = sorted({index for path_id in path_set
+                                            for index in restrictions_of_path.get(path_id, [])})
+            for index in affected_restrictions:
+                routing_restriction = routing_restrictions[index]
+                paths, mapped_paths = restriction_paths[index]
+                intersection = paths & path_set
                 if len(intersection) > 2:
                     logger.warn(
                         "Panic! The path {0} contains paths {1}, which are part of the same routing restriction {2}."
@@ -90,18 +111,16 @@ def edmonds_karp_core(R, s, t, cutoff, is_lowest_hierarchy, routing_restrictions
                                                                                                     intersection,
                                                                                                     routing_restriction.identifier))
                     raise RuntimeError()
-                for path_id in path_set:
-                    if path_id in routing_restriction.paths:
-                        intersection = set(routing_restriction.paths) & set(path_map.keys())
-                        logger.debug("Path {} was part of the routing restriction {}.".format(path_id,
-                                                                                              routing_restriction.identifier))
-                        logger.debug("Thus, the flow of paths {} will be reduced by {}".format(intersection, flow))
-                        for p_prime in intersection:
-                            if path_id != p_prime:
-                                (src, dst) = path_map[p_prime]
-                                logger.debug("Edge {} will be charged with {} cap".format((src, dst), flow))
-                                R_succ[src][dst]['capacity'] = max(R_succ[src][dst]['capacity'] - flow, 0)
-                                logger.debug("New flow of edge {} is {}".format((src, dst), R_succ[src][dst]['capacity']))
+                for path_id in intersection:
+                    logger.debug("Path {} was part of the routing restriction {}.".format(path_id,
+                                                                                          routing_restriction.identifier))
+                    logger.debug("Thus, the flow of paths {} will be reduced by {}".format(
+                        [p_prime for p_prime, _ in mapped_paths], flow))
+                    for p_prime, (src, dst) in mapped_paths:
+                        if path_id != p_prime:
+                            logger.debug("Edge {} will be charged with {} cap".format((src, dst), flow))
+                            R_succ[src][dst]['capacity'] = max(R_succ[src][dst]['capacity'] - flow, 0)
+                            logger.debug("New flow of edge {} is {}".format((src, dst), R_succ[src][dst]['capacity']))
 
         return flow
 
@@ -1,5 +1,8 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from multiprocessing import Manager
+from queue import Empty
 from shutil import copyfile
 
 import networkx as nx
@@ -7,9 +10,15 @@ import yaml as yaml
 from networkx.drawing.nx_pydot import write_dot
 
 import hvc.mip.gurobipy_mip as gmip
+import hvc.mip.heuristic as heuristic
+import hvc.mip.incremental as incremental
 import hvc.mip.solution_interpreter as interpreter
 import hvc.mip.utils as utils
 from hvc.coordinator.coordinator import Coordinator
+from hvc.mip.model_cache import ModelCache
+from hvc.mip.models import Parameters
+from hvc.mip.solution_store import SolutionRecord, condensed_solution_name, overlay_solution_store, \
+    write_solution_store
 
 logger = utils.setup_logger("gml", "path_computing.log")
 
@@ -66,67 +75,374 @@ def requests_for_coordinator_exists(path_prefix):
     return os.path.isfile("{0}/vnf_requests.yaml".format(path_prefix))
 
 
+def __setting_of_level(settings, level, default=None):
+    """
+    :param settings: a setting for each hierarchy level starting at the root, the last one is used for all deeper
+     levels
+    :return: the setting of the level
+    """
+    if settings is None or len(settings) == 0:
+        return default
+    return settings[min(level, len(settings) - 1)]
+
+
+class CoordinatorResult:
+    """
+    The outcome of solving the model of a single coordinator, the worker processes of the parallel mode return it.
+    """
+
+    def __init__(self, **kwargs):
+        self.name = kwargs["name"]
+        self.started = kwargs["started"]
+        self.ended = kwargs["ended"]
+        # the condensed solution records and the request mappings, see Coordinator.collect_solution_records
+        self.solution = kwargs["solution"]
+        # name of a child coordinator -> the Parameters of the requests generated for it, empty if they were put into
+        # the child queue
+        self.child_parameters = kwargs["child_parameters"]
+        self.build_profile = kwargs.get("build_profile")
+        self.seed_results = kwargs.get("seed_results")
+
+
 def recursively_solve_model(path_prefix, coordinator, max_timeout_delay=-1, seed=0, use_exact_placements=-1,
-                            path_aggregation="full_expansion"):
+                            path_aggregation="full_expansion", profile_build=False, warm_start=None, solvers=None,
+                            solve_policies=None, model_cache=None, seeds=None, incremental_models=None, yaml_output=True,
+                            level=0, parameters=None, solutions=None, workers=None, num_threads=None,
+                            build_profiles=None, seed_results=None):
+    """
+    Solves the model of the coordinator and recursively the models of its child coordinators with the requests
+    generated for them. The parameters are passed on in memory, the files of the coordinators are only written as
+    artifacts.
+    :param path_prefix: the folder the inputs and the solution of the coordinator are written to, None if no files are
+     written
+    :param parameters: the Parameters of the coordinator, by default they are read from the files in path_prefix
+    :param solutions: an optional dict the condensed solution records and the request mappings of each solved
+     coordinator are added to, see Coordinator.collect_solution_records
+    :param workers: the number of worker processes, if given all child coordinators with requests are solved in
+     parallel as soon as their parent is solved, otherwise the coordinators are solved one after another in this
+     process (incremental_models are only supported then)
+    :param num_threads: the number of threads of each Gurobi solve, by default the default of the solver is used
+    :param build_profiles: an optional dict the build profile of each solved coordinator is added to (if profile_build)
+    :param seed_results: an optional dict the results of the seeds of each solved coordinator are added to (if seeds)
+    """
+    if parameters is None:
+        ## files were copied here
+        parameters = gmip.load_descriptions(
+            network_description_file="{0}/network_description.yaml".format(path_prefix),
+            vnf_description_file="{0}/vnf_descriptions.yaml".format(path_prefix),
+            chain_description_file="{0}/chains.yaml".format(path_prefix),
+            vnf_request_description_file="{0}/vnf_requests.yaml".format(path_prefix),
+            advertised_restriction_file="{0}/advertised_restrictions.yaml".format(path_prefix))
+    options = dict(max_timeout_delay=max_timeout_delay, seed=seed, use_exact_placements=use_exact_placements,
+                   profile_build=profile_build, solvers=solvers, solve_policies=solve_policies, model_cache=model_cache,
+                   seeds=seeds, yaml_output=yaml_output, num_threads=num_threads)
+    if workers is not None:
+        if incremental_models is not None:
+            raise ValueError("The incremental models cannot be shared with worker processes")
+        __solve_in_parallel(path_prefix, coordinator, level, parameters, warm_start, workers, options,
+                            dict(solutions=solutions, build_profiles=build_profiles, seed_results=seed_results))
+        return
+
+    input_digest = None
+    if incremental_models is not None:
+        # the inputs as generated by the parent, before the domains of the requests are set
+        input_digest = ModelCache.key(parameters.descriptions(), {})
+        if incremental_models.get(coordinator.name, {}).get("input_digest") == input_digest:
+            # neither the solution of the coordinator nor the requests of its children can change
+            logger.info("The inputs of coordinator {} did not change, keeping its solution".format(coordinator.name))
+            if solutions is not None:
+                __keep_solutions(incremental_models, coordinator, solutions)
+            return
+
+    result = __solve_coordinator(path_prefix, coordinator, level, parameters, warm_start, incremental_models,
+                                 input_digest, **options)
+    __record_result(result, incremental_models, solutions=solutions, build_profiles=build_profiles,
+                    seed_results=seed_results)
+
+    # if there was a new request for a child -> recursively solve it
+    for child_coordinator in coordinator.child_coordinators:
+        if child_coordinator.name not in result.child_parameters:
+            if incremental_models is not None:
+                # the child has to be solved again once it gets requests
+                __forget_solutions(incremental_models, child_coordinator)
+            continue
+        print("*********** Now solving model for coordinator {} ***********".format(child_coordinator.name))
+        recursively_solve_model(path_prefix=__child_path(path_prefix, child_coordinator),
+                                coordinator=child_coordinator, seed=seed,
+                                max_timeout_delay=max_timeout_delay, use_exact_placements=use_exact_placements,
+                                profile_build=profile_build,
+                                warm_start=__child_path(None if isinstance(warm_start, dict) else warm_start,
+                                                        child_coordinator),
+                                solvers=solvers, solve_policies=solve_policies, model_cache=model_cache,
+                                seeds=seeds, incremental_models=incremental_models, yaml_output=yaml_output,
+                                level=level + 1, parameters=result.child_parameters[child_coordinator.name],
+                                solutions=solutions, num_threads=num_threads, build_profiles=build_profiles,
+                                seed_results=seed_results)
+
+
+def __child_path(path, child_coordinator):
+    """
+    :return: the folder of the child coordinator in the given folder, None if there is no folder
+    """
+    return None if path is None else "{0}/{1}".format(path, child_coordinator.name)
 
-    ## files were copied here
-    vnf_description_file = "{0}/vnf_descriptions.yaml".format(path_prefix)
-    chain_description_file = "{0}/chains.yaml".format(path_prefix)
-    vnf_request_description_file = "{0}/vnf_requests.yaml".format(path_prefix)
-    network_description_file = "{0}/network_description.yaml".format(path_prefix)
-    advertised_restriction_file = "{0}/advertised_restrictions.yaml".format(path_prefix)
 
+def __solve_in_parallel(path_prefix, coordinator, level, parameters, warm_start, workers, options, collected):
+    """
+    Solves the coordinator and its descendants in a pool of worker processes. A child coordinator is submitted as soon
+    as its parent generated its requests, thus it is solved while the parent still generates the requests of its
+    siblings, and siblings and the subtrees below them are solved concurrently.
+    :param collected: the dicts the results are added to, see __record_result
+    """
+    with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+        child_queue = manager.Queue()
+        # name of a submitted coordinator -> its folder, the coordinator, its level and its warm start
+        submitted = {}
+        pending = set()
+
+        def submit(path_prefix, coordinator, level, parameters, warm_start):
+            submitted[coordinator.name] = (path_prefix, coordinator, level, warm_start)
+            pending.add(executor.submit(__solve_coordinator, path_prefix, coordinator, level, parameters, warm_start,
+                                        None, None, child_queue=child_queue, **options))
+
+        def dispatch(parent_name, child_name, child_parameters):
+            path_prefix, parent, level, warm_start = submitted[parent_name]
+            child_coordinator = next(child for child in parent.child_coordinators if child.name == child_name)
+            print("*********** Now solving model for coordinator {} ***********".format(child_coordinator.name))
+            submit(__child_path(path_prefix, child_coordinator), child_coordinator, level + 1, child_parameters,
+                   __child_path(None if isinstance(warm_start, dict) else warm_start, child_coordinator))
+
+        submit(path_prefix, coordinator, level, parameters, warm_start)
+        while len(pending) > 0:
+            try:
+                dispatch(*child_queue.get(timeout=0.05))
+            except Empty:
+                pass
+            # a worker puts all children into the queue before it returns, draining the queue after the finished
+            # coordinators were determined dispatches all of their children
+            done = [future for future in pending if future.done()]
+            while True:
+                try:
+                    dispatch(*child_queue.get_nowait())
+                except Empty:
+                    break
+            for future in done:
+                pending.remove(future)
+                __record_result(future.result(), None, **collected)
+
+
+def __record_result(result, incremental_models, solutions=None, build_profiles=None, seed_results=None):
+    """
+    Adds the timestamps, the solution and the profiles of a solved coordinator to the collected results.
+    """
+    starting_timestamps[result.name] = result.started
+    ending_timestamps[result.name] = result.ended
+    delta[result.name] = (result.ended - result.started).total_seconds() * 1000
+    if result.build_profile is not None and build_profiles is not None:
+        build_profiles[result.name] = result.build_profile
+    if result.seed_results is not None and seed_results is not None:
+        seed_results[result.name] = result.seed_results
+    if solutions is not None:
+        solutions[result.name] = result.solution
+        if incremental_models is not None:
+            incremental_models.setdefault(result.name, {})["solution"] = result.solution
+
+
+def __solve_coordinator(path_prefix, coordinator, level, parameters, warm_start, incremental_models, input_digest,
+                        max_timeout_delay, seed, use_exact_placements, profile_build, solvers, solve_policies,
+                        model_cache, seeds, yaml_output, num_threads, child_queue=None):
+    """
+    Solves the model of a single coordinator and generates the requests of its child coordinators, runs in a worker
+    process in the parallel mode.
+    :param input_digest: the digest of the parameters kept with the incremental model of the coordinator
+    :param child_queue: if given, the name of the coordinator, the name of a child coordinator and its Parameters are
+     put into this queue as soon as the requests of the child are generated, instead of returning them in the result
+    :return: the CoordinatorResult
+    """
     # now set the ingress_domain field for the requests
-    with open(vnf_request_description_file, 'r') as requests:
-        vnf_requests = yaml.load(requests, Loader=yaml.FullLoader)
-        for request_k, request_v in vnf_requests.items():
-            ingress_node = request_v["ingress"]
-            egress_node = request_v["egress"]
-
-            if coordinator.is_lowest_hierarchy:
-                vnf_requests[request_k]["ingress_domain"] = ingress_node
-                vnf_requests[request_k]["egress_domain"] = egress_node
-            else:
-                for child in coordinator.child_coordinators:
-                    if ingress_node in child.get_substrate_nodes():
-                        vnf_requests[request_k]["ingress_domain"] = str(child.name)
-                    if egress_node in child.get_substrate_nodes():
-                        vnf_requests[request_k]["egress_domain"] = str(child.name)
-
-    # save the updated requests
-    with open(vnf_request_description_file, 'w') as requests:
-        yaml.dump(vnf_requests, requests)
-
-    starting_timestamps[coordinator.name] = datetime.now()
-    parameters, indices, decision_vars, model = gmip.solve_model(network_description_file=network_description_file,
-                                                                 chain_description_file=chain_description_file,
-                                                                 vnf_description_file=vnf_description_file,
-                                                                 vnf_request_description_file=vnf_request_description_file,
-                                                                 advertised_restriction_file=advertised_restriction_file,
-                                                                 pretty_print=True,
-                                                                 output_file=path_prefix,
-                                                                 with_delay_constraints=False,
-                                                                 generate_backward_paths=False,
-                                                                 max_timeout_delay=max_timeout_delay,
-                                                                 graph_output_path=path_prefix,
-                                                                 seed=seed,
-                                                                 use_exact_placements=use_exact_placements)
+    vnf_requests = parameters.vnf_requests
+    for request_k, request_v in vnf_requests.items():
+        ingress_node = request_v["ingress"]
+        egress_node = request_v["egress"]
+
+        if coordinator.is_lowest_hierarchy:
+            vnf_requests[request_k]["ingress_domain"] = ingress_node
+            vnf_requests[request_k]["egress_domain"] = egress_node
+        else:
+            # the last child coordinator containing a node is its domain
+            for child in coordinator.get_child_coordinators_of(ingress_node)[-1:]:
+                vnf_requests[request_k]["ingress_domain"] = str(child.name)
+            for child in coordinator.get_child_coordinators_of(egress_node)[-1:]:
+                vnf_requests[request_k]["egress_domain"] = str(child.name)
+
+    if path_prefix is not None:
+        # save the updated requests
+        with open("{0}/vnf_requests.yaml".format(path_prefix), 'w') as requests:
+            yaml.dump(vnf_requests, requests)
+
+    # the previous solution of this coordinator, if there is one
+    previous_solution = None
+    if isinstance(warm_start, dict):
+        # an in-memory solution only belongs to the coordinator it is given to
+        previous_solution = warm_start
+    elif warm_start is not None:
+        if utils.load_solution(warm_start) is not None:
+            previous_solution = warm_start
+        elif os.path.isfile("{0}/full_solution.log".format(warm_start)):
+            previous_solution = "{0}/full_solution.log".format(warm_start)
+
+    threads = {} if num_threads is None else {"num_threads": num_threads}
+    started = datetime.now()
+    solution = None
+    seed_outcomes = None
+    build_profile = None
+    if __setting_of_level(solvers, level, default="mip") == "heuristic":
+        solution = heuristic.solve_model(parameters=parameters,
+                                         pretty_print=True,
+                                         output_file=path_prefix,
+                                         generate_backward_paths=False,
+                                         graph_output_path=path_prefix,
+                                         yaml_output=yaml_output)
+        if not solution[3].feasible:
+            logger.info("The heuristic could not place all requests of coordinator {}, solving the MIP "
+                        "instead".format(coordinator.name))
+            solution = None
+    if solution is None and seeds is not None:
+        solution = gmip.solve_model_with_seeds(parameters=parameters,
+                                               seeds=seeds,
+                                               pretty_print=True,
+                                               output_file=path_prefix,
+                                               with_delay_constraints=False,
+                                               generate_backward_paths=False,
+                                               graph_output_path=path_prefix,
+                                               use_exact_placements=use_exact_placements,
+                                               warm_start=previous_solution,
+                                               solve_policy=__setting_of_level(solve_policies, level),
+                                               model_cache=model_cache,
+                                               yaml_output=yaml_output,
+                                               **threads)
+        seed_outcomes = solution[3]
+    elif solution is None and incremental_models is not None and use_exact_placements == -1:
+        solution = __solve_incrementally(incremental_models, coordinator, path_prefix, parameters,
+                                         solve_policy=__setting_of_level(solve_policies, level), seed=seed,
+                                         yaml_output=yaml_output, threads=threads)
+        incremental_models[coordinator.name]["input_digest"] = input_digest
+    elif solution is None:
+        solution = gmip.solve_model(parameters=parameters,
+                                    pretty_print=True,
+                                    output_file=path_prefix,
+                                    with_delay_constraints=False,
+                                    generate_backward_paths=False,
+                                    max_timeout_delay=max_timeout_delay,
+                                    graph_output_path=path_prefix,
+                                    seed=seed,
+                                    use_exact_placements=use_exact_placements,
+                                    profile_build=profile_build,
+                                    warm_start=previous_solution,
+                                    solve_policy=__setting_of_level(solve_policies, level),
+                                    model_cache=model_cache,
+                                    yaml_output=yaml_output,
+                                    **threads)
+        if profile_build:
+            build_profile = solution[4]
+    # the model is the result of the heuristic if it was used
+    parameters, indices, decision_vars, model = solution[:4]
     # solution logging...
-    ending_timestamps[coordinator.name] = datetime.now()
-    delta[coordinator.name] = (ending_timestamps[coordinator.name] - starting_timestamps[
-        coordinator.name]).total_seconds() * 1000
+    ended = datetime.now()
+
+    records = utils.condensed_solution_records(decision_vars, model)
+    coordinator_seed_results = None
+    if seed_outcomes is not None:
+        coordinator_seed_results = {seed: __seed_record(path_prefix, seed, seed == seeds[0], result, records) for
+                                    seed, result in seed_outcomes.items()}
 
+    child_parameters = {}
+    request_mappings = None
     if not coordinator.is_lowest_hierarchy:
-        interpreter.generate_requests_for_child_coordinators(parameters=parameters, indices=indices,
-                                                             decision_variables=decision_vars, model=model,
-                                                             path_prefix="{0}/".format(path_prefix))
-    # if there was a new request for a child -> recursively solve it
+        request_mappings = {}
+        children = {child.name: child for child in coordinator.child_coordinators}
+        network_descriptions = {name: child.network_description() for name, child in children.items()}
+        for domain, descriptions in interpreter.stream_requests_for_child_coordinators(
+                parameters=parameters, indices=indices, decision_variables=decision_vars, model=model,
+                request_resolver=request_mappings,
+                path_prefix=None if path_prefix is None else "{0}/".format(path_prefix),
+                network_descriptions=network_descriptions):
+            if descriptions is None:
+                continue
+            domain_parameters = Parameters(network_description=network_descriptions[domain],
+                                           advertised_restrictions=children[domain].advertised_restrictions(),
+                                           **descriptions)
+            if child_queue is None:
+                child_parameters[domain] = domain_parameters
+            else:
+                # the child is solved while the requests of its siblings are still generated
+                child_queue.put((coordinator.name, domain, domain_parameters))
+    return CoordinatorResult(name=coordinator.name, started=started, ended=ended,
+                             solution={"records": records, "request_mappings": request_mappings},
+                             child_parameters=child_parameters, build_profile=build_profile,
+                             seed_results=coordinator_seed_results)
+
+
+def __keep_solutions(incremental_models, coordinator, solutions):
+    """
+    Adds the solutions of the coordinator and its descendants of the previous call to the solutions.
+    """
+    state = incremental_models.get(coordinator.name, {})
+    if "solution" in state:
+        solutions[coordinator.name] = state["solution"]
     for child_coordinator in coordinator.child_coordinators:
-        if requests_for_coordinator_exists(path_prefix="{0}/{1}".format(path_prefix, child_coordinator.name)):
-            print("*********** Now solving model for coordinator {} ***********".format(child_coordinator.name))
-            recursively_solve_model(path_prefix="{0}/{1}".format(path_prefix, child_coordinator.name),
-                                    coordinator=child_coordinator,
-                                    max_timeout_delay=max_timeout_delay, use_exact_placements=use_exact_placements)
+        __keep_solutions(incremental_models, child_coordinator, solutions)
+
+
+def __forget_solutions(incremental_models, coordinator):
+    """
+    Drops the solutions of the coordinator and its descendants, their models are kept.
+    """
+    state = incremental_models.get(coordinator.name, {})
+    state.pop("solution", None)
+    state.pop("input_digest", None)
+    for child_coordinator in coordinator.child_coordinators:
+        __forget_solutions(incremental_models, child_coordinator)
+
+
+def __solve_incrementally(incremental_models, coordinator, path_prefix, parameters, solve_policy, seed, yaml_output,
+                          threads):
+    """
+    Updates the persistent model of the coordinator to its current requests and solves it, the model is built anew if
+    the network or the advertised restrictions of the coordinator changed.
+    :return: the parameters, indices, decision variables and model of the solution
+    """
+    model_digest = ModelCache.key([description for description in parameters.descriptions() if
+                                   description is not parameters.vnf_requests], {})
+    state = incremental_models.get(coordinator.name)
+    if state is not None and state.get("model_digest") == model_digest:
+        logger.info("Updating the model of coordinator {}".format(coordinator.name))
+        state["model"].set_requests(parameters.vnf_requests)
+    else:
+        state = {"model_digest": model_digest,
+                 "model": incremental.IncrementalModel(parameters=parameters, generate_backward_paths=False,
+                                                       solve_policy=solve_policy, seed=seed, **threads)}
+        incremental_models[coordinator.name] = state
+    return state["model"].solve(pretty_print=True, output_file=path_prefix, graph_output_path=path_prefix,
+                                yaml_output=yaml_output)
+
+
+def __seed_record(path_prefix, seed, is_first_seed, result, records):
+    """
+    :param records: the condensed solution records of the first seed
+    :return: the result of a seed together with the condensed solution it found, the solutions of the other seeds are
+     only available if they were saved to path_prefix
+    """
+    record = result.to_yaml_dict()
+    if result.objective_values is None:
+        return record
+    if is_first_seed:
+        record["solution"] = {solution_record.name: solution_record.value for solution_record in records}
+    elif path_prefix is not None:
+        solution = utils.load_solution("{0}/seed_{1}".format(path_prefix, seed), condensed=True)
+        if solution is not None:
+            record["solution"] = solution.to_dict()
+    return record
 
 
 def __read_graph(graphml_path):
@@ -143,7 +459,10 @@ def __read_graph(graphml_path):
 def solve_graphml_model(graphml_path, vnf_description_path, chain_description_path,
                         vnf_request_description_path,
                         output_path, hierarchy_path, max_timeout_delay=-1, solution_path=None, seed=0,
-                        use_exact_placements=-1, path_aggregation="full_expansion"):
+                        use_exact_placements=-1, path_aggregation="full_expansion", profile_build=False,
+                        warm_start=None, solvers=None, solve_policies=None, model_cache=None, seeds=None,
+                        incremental_models=None, yaml_output=True, workers=None, num_threads=None,
+                        paths_per_pair=None):
     """
     Solves the vnf chaining and placement problem recursively for the given graph-ml graph.
     :param graphml_path: the graphml graph, it needs to be a directed graph, the edges need to be
@@ -152,25 +471,68 @@ def solve_graphml_model(graphml_path, vnf_description_path, chain_description_pa
     :param chain_description_path: a yaml description of all chains used
     :param vnf_request_description_path: a yaml description of all vnf requests used
     :param output_path: an absolute or relative path for the output files, folders will be created if not existant
-     (i.e. network descriptions, subproblems, ...)
+     (i.e. network descriptions, subproblems, ...), None if the hierarchy is solved in memory without writing them,
+     the parameters of the coordinators are passed on in memory either way
     :param hierarchy_path: a yaml description of a hierarchy instantiation
     :param max_timeout_delay: maximal timeout for the solving (deprecated and currently not supported)
     :param solution_path: an absolute or relative path for the solution files (i.e. overlay graph, solving times,...)
     :param seed: the gurobi seed to use
     :param use_exact_placements: can be used the set the number of placed components (only useful for flat hierarchies)
-    :param path_aggregation: describes how many paths between each border nodes are advertised "full_expansion", "one_path" or "two_paths"
-    :return:
+    :param path_aggregation: describes how many paths between each border nodes are advertised "full_expansion", "one_path",
+     "two_paths" or "k_paths"
+    :param profile_build: True, if the build time and size of the constraint families of each model should be recorded
+    :param warm_start: the output path of a previous run (may be the same as output_path), each coordinator uses the
+     solution saved in its folder as MIP start if it exists, alternatively a solution dict used for the root
+     coordinator only
+    :param solvers: the solver used by the coordinators of each hierarchy level, starting at the root, e.g.
+     ["mip", "heuristic"] solves the root coordinator exactly and all lower coordinators with the greedy heuristic (the
+     last entry applies to all deeper levels), by default all coordinators solve the MIP
+    :param solve_policies: the SolvePolicy used by the MIPs of each hierarchy level, starting at the root, the last
+     entry applies to all deeper levels, by default all objectives are optimized hierarchically without limits
+    :param model_cache: an optional ModelCache, coordinators whose inputs did not change since an earlier run reuse the
+     built model
+    :param seeds: a list of seeds, if given each model is built once and solved with every seed in parallel (instead of
+     using seed), the hierarchy continues with the solution of the first seed, the results and solutions of all seeds
+     are saved to seed_results.yaml in the solution folder (the solutions of the other seeds only with an output_path)
+    :param incremental_models: a dict holding the model of each coordinator between calls, pass the same dict again
+     (with the same output_path) after the requests changed: coordinators whose inputs did not change keep their
+     solution and are not solved again, the others update their model to the changed requests instead of building it
+     anew (only for coordinators solving the MIP with a single seed and without use_exact_placements)
+    :param yaml_output: True, if the solutions of the coordinators and the overlay solution are saved as YAML files
+     next to their columnar solution stores (see utils.load_solution), writing and reading these files takes longer
+     than the stores for large solutions
+    :param workers: the number of worker processes computing the advertised paths and solving the coordinators, if
+     given independent subtrees of the hierarchy compute their paths in parallel and all child coordinators with
+     requests are solved in parallel as soon as their parent is solved, by default they are solved one after another
+     (not together with incremental_models)
+    :param num_threads: the number of threads of each Gurobi solve (i.e. per worker), by default the default of the
+     solver is used
+    :param paths_per_pair: the number of paths between each pair of border nodes advertised by the coordinators of each
+     hierarchy level with the "k_paths" aggregation, starting at the root (which advertises no paths), the last entry
+     applies to all deeper levels, e.g. [3, 3, 2], the paths with the highest jointly usable rate are advertised
+    :return: the measured wall-clock time of solving the hierarchy in ms, it is saved to makespan.yaml in the solution
+     folder next to the solving time of each coordinator
     """
-    valid_aggregations = ["full_expansion", "one_path", "two_paths"]
+    valid_aggregations = ["full_expansion", "one_path", "two_paths", "k_paths"]
     if path_aggregation not in valid_aggregations:
         raise AssertionError(
             "Unexpected path aggregation {}, known values are {}".format(path_aggregation, valid_aggregations))
-    if not os.path.exists(output_path):
+    if path_aggregation == "k_paths" and (paths_per_pair is None or len(paths_per_pair) == 0 or
+                                          any(k < 1 for k in paths_per_pair)):
+        raise AssertionError("The k_paths aggregation needs at least one path per pair of border nodes for each level,"
+                             " got {}".format(paths_per_pair))
+    valid_solvers = ["mip", "heuristic"]
+    if solvers is not None and any(solver not in valid_solvers for solver in solvers):
+        raise AssertionError("Unexpected solvers {}, known values are {}".format(solvers, valid_solvers))
+    if workers is not None and incremental_models is not None:
+        raise AssertionError("The incremental models can only be used without worker processes")
+    if output_path is not None and not os.path.exists(output_path):
         os.mkdir(output_path)
 
     graph = __read_graph(graphml_path)
-    # write a dot file for the graph
-    write_dot(graph, output_path + "/fullgraph.dot")
+    if output_path is not None:
+        # write a dot file for the graph
+        write_dot(graph, output_path + "/fullgraph.dot")
 
     root_coordinator = read_hierarchy(hierarchy_path)
 
@@ -186,22 +548,39 @@ def solve_graphml_model(graphml_path, vnf_description_path, chain_description_pa
 
     # build a hierarchy & compute the paths
     root_coordinator.build_hierarchy(network=graph, vnf_ingresses=list(ingresses), vnf_egresses=list(egresses))
-    root_coordinator.compute_advertised_paths(path_aggregation=path_aggregation)
-    root_coordinator.write_network_description(output_path)
-    root_coordinator.write_advertised_restriction(output_path)
-
-    # copy the vnf description etc to the output directory to have it all in one place
-    vnf_description_file = "{0}/vnf_descriptions.yaml".format(output_path)
-    chain_description_file = "{0}/chains.yaml".format(output_path)
-    vnf_request_description_file = "{0}/vnf_requests.yaml".format(output_path)
-
-    copyfile(vnf_description_path, vnf_description_file)
-    copyfile(chain_description_path, chain_description_file)
-    copyfile(vnf_request_description_path, vnf_request_description_file)
-
-    # solve the model
+    root_coordinator.compute_advertised_paths(path_aggregation=path_aggregation, workers=workers,
+                                              paths_per_pair=paths_per_pair)
+    if output_path is not None:
+        root_coordinator.write_network_description(output_path)
+        root_coordinator.write_advertised_restriction(output_path)
+
+        # copy the vnf description etc to the output directory to have it all in one place
+        copyfile(vnf_description_path, "{0}/vnf_descriptions.yaml".format(output_path))
+        copyfile(chain_description_path, "{0}/chains.yaml".format(output_path))
+        copyfile(vnf_request_description_path, "{0}/vnf_requests.yaml".format(output_path))
+
+    with open(vnf_description_path, 'r') as vnf_description_file, open(chain_description_path,
+                                                                        'r') as chain_description_file:
+        vnf_description = yaml.safe_load(vnf_description_file)
+        chains = yaml.load(chain_description_file, Loader=yaml.FullLoader)
+    parameters = Parameters(network_description=root_coordinator.network_description(),
+                            vnf_description=vnf_description, chains=chains, vnf_requests=vnf_requests,
+                            advertised_restrictions=root_coordinator.advertised_restrictions())
+
+    # solve the model, the solutions of the coordinators are collected in memory
+    solutions = {}
+    build_profiles = {}
+    seed_results = {}
+    started = datetime.now()
     recursively_solve_model(output_path, root_coordinator, max_timeout_delay=max_timeout_delay, seed=seed,
-                            use_exact_placements=use_exact_placements)
+                            use_exact_placements=use_exact_placements, profile_build=profile_build,
+                            warm_start=warm_start, solvers=solvers, solve_policies=solve_policies,
+                            model_cache=model_cache, seeds=seeds, incremental_models=incremental_models,
+                            yaml_output=yaml_output, parameters=parameters, solutions=solutions, workers=workers,
+                            num_threads=num_threads, build_profiles=build_profiles, seed_results=seed_results)
+    # in ms, unlike the sum of the deltas along the hierarchy it includes the time spent waiting for workers
+    makespan = (datetime.now() - started).total_seconds() * 1000
+    logger.info("Solved the hierarchy in {0:.1f}ms".format(makespan))
 
     # post process the results
     if solution_path is not None:
@@ -209,13 +588,26 @@ def solve_graphml_model(graphml_path, vnf_description_path, chain_description_pa
         if not os.path.exists(solution_path):
             os.mkdir(path=solution_path)
         # recursively collected solutions
-        overlay_solution = dict(root_coordinator.collect_solutions(output_path))
+        overlay_records = [SolutionRecord(family=family, key=key, name=condensed_solution_name(family, key), value=value)
+                           for (family, key), value in
+                           root_coordinator.collect_solution_records(solutions=solutions).items()]
+        write_solution_store(solution_path + "/" + overlay_solution_store, overlay_records)
+        if yaml_output:
+            with open(solution_path + "/overlay_solution.yaml", 'w') as ofile:
+                yaml.dump({record.name: record.value for record in overlay_records}, ofile)
         # save the collected solutions
-        with open(solution_path + "/overlay_solution.yaml", 'w') as ofile, open(solution_path + "/starting_times.yaml",
-                                                                                'w') as starting_file, open(
+        with open(solution_path + "/starting_times.yaml", 'w') as starting_file, open(
             solution_path + "/ending_times.yaml", 'w') as ending_file, open(solution_path + "/time_delta.yaml",
                                                                             'w') as delta_file:
-            yaml.dump(overlay_solution, ofile)
             yaml.dump(delta, delta_file)
             yaml.dump(starting_timestamps, starting_file)
             yaml.dump(ending_timestamps, ending_file)
+        with open(solution_path + "/makespan.yaml", 'w') as makespan_file:
+            yaml.dump({"makespan": makespan, "workers": workers}, makespan_file)
+        if profile_build:
+            with open(solution_path + "/build_profiles.yaml", 'w') as profile_file:
+                yaml.dump(build_profiles, profile_file)
+        if seeds is not None:
+            with open(solution_path + "/seed_results.yaml", 'w') as seed_file:
+                yaml.dump(seed_results, seed_file)
+    return makespan
@@ -1,3 +1,4 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import hvc.coordinator.path_computing as pc
@@ -8,6 +9,16 @@ logger = logging.getLogger()
 logging.basicConfig(filename='solution_interpreter.log', level=logging.DEBUG)
 
 
+def compute_subtree_paths(coordinator, path_aggregation, paths_per_pair, level):
+    """
+    Computes the advertised paths of the subtree of the coordinator, runs in a worker process.
+    :return: the coordinator with its computed subtree and the result of its compute_advertised_paths
+    """
+    result = coordinator.compute_advertised_paths(path_aggregation=path_aggregation, paths_per_pair=paths_per_pair,
+                                                  level=level)
+    return coordinator, result
+
+
 class Coordinator:
     """
     A coordinator is initialized with a level, the nodes (domains) and the links of its network.
@@ -32,12 +43,20 @@ class Coordinator:
         self.cpu_restrictions = []
         self.routing_restrictions = []
         self.intra_domain_paths = []
+        # the first number and the count of the path identifiers allocated for the advertised paths of this coordinator
+        self.allocated_paths = (0, 0)
+        # the result of compute_advertised_paths if it was computed in a worker process, the identifiers of the paths
+        # of the subtree are shifted to their final numbers when the parent computes its paths
+        self.precomputed_paths = None
+        # the substrate nodes of the subtree and the child coordinators of each node, computed once they are needed
+        self.__subtree_nodes = None
+        self.__children_of_node = None
 
         self.is_root_coordinator = is_root_coordinator
 
     def build_hierarchy(self, network, vnf_ingresses, vnf_egresses):
         if self.is_lowest_hierarchy:
-            self.substrate_subgraph = network.subgraph(self.substrate_nodes).copy()
+            self.substrate_subgraph = pc.index_edges(network.subgraph(self.substrate_nodes).copy())
             logger.debug("this is coordinator with name {0} nodes {1} and edges {2} ".format(self.name,
                                                                                              self.substrate_subgraph.nodes(),
                                                                                              self.substrate_subgraph.edges()))
@@ -46,46 +65,36 @@ class Coordinator:
             for child_coordinator in self.child_coordinators:
                 child_coordinator.build_hierarchy(network, vnf_ingresses, vnf_egresses)
 
-            all_nodes_per_domain = {}
-            for coordinator in self.child_coordinators:
-                all_nodes_per_domain[coordinator] = coordinator.get_substrate_nodes()
-
-            # now build the inter domain links
-            for domain1, domain2 in itertools.combinations(self.child_coordinators, 2):
-                counter_before = len(self.inter_domain_links)
-                logger.debug("This is coordinator {0}, finding all substrate links between domains {1} and {2}."
-                             " Thus, nodes {3} and {4}".format(
-                    self.name, domain1, domain2, all_nodes_per_domain[domain1], all_nodes_per_domain[domain2]))
-
-                for node_domain1, node_domain2 in itertools.product(all_nodes_per_domain[domain1],
-                                                                    all_nodes_per_domain[domain2]):
-
-                    if network.has_edge(node_domain1, node_domain2):
-                        edge_data = network.get_edge_data(node_domain1, node_domain2)
-                        edge_id = edge_data['id']
-                        # create inter domain link
-                        inter_domain_link = InterDomainLink(identifier="edge_{}".format(edge_id),
-                                                            source=node_domain1, destination=node_domain2,
-                                                            rate=edge_data["max_rate"], delay=edge_data["delay"])
-
-                        domain1.set_border_node(node_domain1, domain2)
-                        self.inter_domain_links.append(inter_domain_link)
-
-                    if network.has_edge(node_domain2, node_domain1):
-                        edge_data = network.get_edge_data(node_domain2, node_domain1)
-
-                        edge_id = edge_data['id']
-                        # create inter domain link
-                        inter_domain_link = InterDomainLink(identifier="edge_{}".format(edge_id),
-                                                            source=node_domain2, destination=node_domain1,
-                                                            rate=edge_data["max_rate"], delay=edge_data["delay"])
-
-                        domain2.set_border_node(node_domain2, domain1)
-                        self.inter_domain_links.append(inter_domain_link)
-                logger.debug(
-                    "Found {0} links between domain {1} and {2}".format(len(self.inter_domain_links) - counter_before,
-                                                                        domain1, domain2))
-        substrate_nodes = self.get_substrate_nodes()
+            # the links are appended as if every pair of nodes of every pair of child domains was checked, the order of
+            # the links and the border nodes determines the numbering of the advertised paths
+            links = []
+            positions_of_node = self.__positions_of_nodes()
+            for node, positions in positions_of_node.items():
+                for neighbor in network.adj[node]:
+                    if neighbor not in positions_of_node:
+                        continue
+                    for (domain, position), (other_domain, other_position) in itertools.product(
+                            positions, positions_of_node[neighbor]):
+                        if domain < other_domain:
+                            links.append(((domain, other_domain, position, other_position, 0), node, neighbor))
+                        elif domain > other_domain:
+                            links.append(((other_domain, domain, other_position, position, 1), node, neighbor))
+            links.sort(key=lambda link: link[0])
+
+            for (domain1, domain2, _, _, direction), source, destination in links:
+                edge_data = network.get_edge_data(source, destination)
+                # create inter domain link
+                inter_domain_link = InterDomainLink(identifier="edge_{}".format(edge_data['id']),
+                                                    source=source, destination=destination,
+                                                    rate=edge_data["max_rate"], delay=edge_data["delay"])
+                if direction == 0:
+                    self.child_coordinators[domain1].set_border_node(source, self.child_coordinators[domain2])
+                else:
+                    self.child_coordinators[domain2].set_border_node(source, self.child_coordinators[domain1])
+                self.inter_domain_links.append(inter_domain_link)
+            logger.debug("This is coordinator {0}, found {1} links between its child domains".format(
+                self.name, len(links)))
+        substrate_nodes = set(self.get_substrate_nodes())
         for ingress in vnf_ingresses:
             if ingress in substrate_nodes:
                 self.border_nodes_in_higher_domains["ingress"].add(ingress)
@@ -94,10 +103,25 @@ class Coordinator:
             if egress in substrate_nodes:
                 self.border_nodes_in_higher_domains["egress"].add(egress)
 
-    def compute_advertised_paths(self, counter=0, path_aggregation="full_expansion"):
+    def compute_advertised_paths(self, counter=0, path_aggregation="full_expansion", workers=None, paths_per_pair=None,
+                                 level=0):
+        """
+        Computes the advertised paths and restrictions of this coordinator and all coordinators below it.
+        :param counter: the number of the first path identifier
+        :param workers: the number of worker processes, if given independent subtrees of the hierarchy are computed in
+         parallel, the paths and their identifiers are the same as if they were computed one after another
+        :param paths_per_pair: a list of the number of paths kept for each pair of border nodes by the k_paths
+         aggregation per level of the hierarchy, the last one is used for all deeper levels
+        :param level: the level of this coordinator in the hierarchy, the root coordinator is level 0
+        :return: the advertised paths, cpu restrictions and routing restrictions of this coordinator and the number of
+         the next free path identifier, None for the root coordinator
+        """
+        if workers is not None:
+            self.__compute_subtrees_in_parallel(path_aggregation, workers, paths_per_pair, level)
+
         # top down -> let the child coordinators compute the paths first.
         if not self.is_lowest_hierarchy:
-            counter = self.__compute_paths_child_coordinators(counter, path_aggregation)
+            counter = self.__compute_paths_child_coordinators(counter, path_aggregation, paths_per_pair, level)
 
         if self.is_root_coordinator:
             return
@@ -138,7 +162,9 @@ class Coordinator:
                                                            edge_to_path=edge_to_path,
                                                            substrate_subgraph=self.substrate_subgraph,
                                                            is_lowest_hierarchy=self.is_lowest_hierarchy,
-                                                           path_aggregation=path_aggregation
+                                                           path_aggregation=path_aggregation,
+                                                           paths_per_pair=None if paths_per_pair is None else
+                                                           paths_per_pair[min(level, len(paths_per_pair) - 1)]
                                                            )
                 old_intra_domain_paths = additional_paths
                 additional_paths = [p for p in old_intra_domain_paths if p.identifier in intra_domain_path_ids]
@@ -146,6 +172,7 @@ class Coordinator:
                 intra_domain_paths += additional_paths
 
             i += 1
+        self.allocated_paths = (counter, path_counter - counter)
         intra_domain_path_ids = [p.identifier for p in intra_domain_paths]
         logger.debug(
             "This is coordinator {}, i have found {} paths for {} pairs".format(self.name, len(intra_domain_path_ids),
@@ -172,8 +199,32 @@ class Coordinator:
     def get_substrate_nodes(self):
         if self.is_lowest_hierarchy:
             return self.substrate_nodes
-        else:
-            return [node for coordinator in self.child_coordinators for node in coordinator.get_substrate_nodes()]
+        if self.__subtree_nodes is None:
+            self.__subtree_nodes = [node for coordinator in self.child_coordinators for node in
+                                    coordinator.get_substrate_nodes()]
+        return self.__subtree_nodes
+
+    def get_child_coordinators_of(self, node):
+        """
+        :return: the child coordinators whose substrate nodes contain the node, in the order of the child coordinators
+        """
+        if self.__children_of_node is None:
+            self.__children_of_node = defaultdict(list)
+            for node_of_child, positions in self.__positions_of_nodes().items():
+                for domain in dict.fromkeys(domain for domain, _ in positions):
+                    self.__children_of_node[node_of_child].append(self.child_coordinators[domain])
+        return self.__children_of_node.get(node, [])
+
+    def __positions_of_nodes(self):
+        """
+        :return: a dict mapping each substrate node of the child coordinators to the indices of the child coordinators
+         containing it and its positions in their substrate nodes
+        """
+        positions_of_node = defaultdict(list)
+        for domain, coordinator in enumerate(self.child_coordinators):
+            for position, node in enumerate(coordinator.get_substrate_nodes()):
+                positions_of_node[node].append((domain, position))
+        return positions_of_node
 
     def get_name(self):
         return self.name
@@ -181,14 +232,20 @@ class Coordinator:
     def __hash__(self):
         return self.name.__hash__()
 
+    def __reduce__(self):
+        # coordinators are dict keys of each other, they need their name before their state is restored when unpickled
+        return Coordinator, ([], self.name), self.__dict__
+
     def __str__(self):
         return self.name
 
     def __repr__(self):
         return self.__str__()
 
-    def write_advertised_restriction(self, output_path):
-        Path(output_path).mkdir(parents=True, exist_ok=True)
+    def advertised_restrictions(self):
+        """
+        :return: the advertised restrictions of the child coordinators, as in advertised_restrictions.yaml
+        """
         advertised_restriction = {
             "routing_restrictions": {},
             "cpu_restrictions": {}
@@ -201,15 +258,21 @@ class Coordinator:
 
         for cpu_restriction in self.cpu_restrictions:
             advertised_restriction["cpu_restrictions"][cpu_restriction.identifier] = cpu_restriction.to_yaml_dict()
+        return advertised_restriction
 
+    def write_advertised_restriction(self, output_path):
+        Path(output_path).mkdir(parents=True, exist_ok=True)
         with open(output_path + "/advertised_restrictions.yaml", 'w') as advertised_restriction_file:
-            yaml.dump(advertised_restriction, advertised_restriction_file)
+            yaml.dump(self.advertised_restrictions(), advertised_restriction_file)
 
         for coordinator in self.child_coordinators:
             coordinator.write_advertised_restriction(output_path + "/" + coordinator.name)
 
-    def write_network_description(self, output_path):
-        Path(output_path).mkdir(parents=True, exist_ok=True)
+    def network_description(self):
+        """
+        :return: the network description of this coordinator as in network_description.yaml, the network of a lowest
+         level coordinator is already completed with the temporary nodes and paths (see utils.expand_level1)
+        """
         network_description = {
             "domain_nodes": {},
             key_inter_domain_edges: {},
@@ -227,9 +290,6 @@ class Coordinator:
             for inter_domain_edge in self.inter_domain_links:
                 network_description[key_inter_domain_edges][
                     inter_domain_edge.identifier] = inter_domain_edge.to_yaml_dict()
-
-            for coordinator in self.child_coordinators:
-                coordinator.write_network_description(output_path + "/" + coordinator.name)
         else:
             # each node is its own domain
             for node in self.substrate_nodes:
@@ -247,15 +307,19 @@ class Coordinator:
 
                 network_description[key_inter_domain_edges]["edge_" + str(edge_id)] = inter_domain_link
 
-        with open(output_path + "/network_description.yaml", 'w+') as network_description_file:
-            yaml.dump(network_description, network_description_file)
-
-        if self.is_lowest_hierarchy:
             cpu_def = {}
             for node in self.substrate_nodes:
                 cpu_def[node] = self.substrate_subgraph.nodes[node]["cpu"]
-            level1_expansion(network_description_path=output_path + "/network_description.yaml", cpu_capacities=cpu_def,
-                             with_backward_paths=True, overwrite=True)
+            expand_level1(network_description, cpu_capacities=cpu_def, with_backward_paths=True)
+        return network_description
+
+    def write_network_description(self, output_path):
+        Path(output_path).mkdir(parents=True, exist_ok=True)
+        with open(output_path + "/network_description.yaml", 'w+') as network_description_file:
+            yaml.dump(self.network_description(), network_description_file)
+
+        for coordinator in self.child_coordinators:
+            coordinator.write_network_description(output_path + "/" + coordinator.name)
 
     def set_border_node(self, border_node, higher_domain):
         """
@@ -264,19 +328,24 @@ class Coordinator:
         self.border_nodes_in_higher_domains[higher_domain].add(border_node)
 
         # now find out which domain this node belonged to
-        for coord in self.child_coordinators:
-            if border_node in coord.get_substrate_nodes():
-                coord.set_border_node(border_node, higher_domain)
+        for coord in self.get_child_coordinators_of(border_node):
+            coord.set_border_node(border_node, higher_domain)
 
-    def __compute_paths_child_coordinators(self, counter, aggregation):
+    def __compute_paths_child_coordinators(self, counter, aggregation, paths_per_pair, level):
         """
         Invokes all child coordinators to compute the advertised paths
         :param aggregation: chosses in which way to compute a path subset
+        :param level: the level of this coordinator
         :return:
         """
         for coordinator in self.child_coordinators:
-            intra_domain_paths, cpu_restrictions, routing_restrictions, inner_counter = coordinator.compute_advertised_paths(
-                counter, path_aggregation=aggregation)
+            if coordinator.precomputed_paths is not None:
+                intra_domain_paths, cpu_restrictions, routing_restrictions, inner_counter = \
+                    coordinator.__renumber_precomputed_paths(counter)
+            else:
+                intra_domain_paths, cpu_restrictions, routing_restrictions, inner_counter = \
+                    coordinator.compute_advertised_paths(counter, path_aggregation=aggregation,
+                                                         paths_per_pair=paths_per_pair, level=level + 1)
             counter += inner_counter
             logger.debug("child coordinator {0} yielded {1} paths, {2} rrs and {3} crs".format(coordinator.name,
                                                                                                len(intra_domain_paths),
@@ -288,6 +357,90 @@ class Coordinator:
             self.cpu_restrictions += cpu_restrictions
         return counter
 
+    def __compute_subtrees_in_parallel(self, aggregation, workers, paths_per_pair, level):
+        """
+        Computes the paths of independent subtrees below this coordinator in worker processes. The subtrees are split
+        until there are enough of them to keep the workers busy, their coordinators keep the result as
+        precomputed_paths.
+        """
+        # subtree -> its level
+        subtrees = {child: level + 1 for child in self.child_coordinators}
+        while len(subtrees) < workers and any(not subtree.is_lowest_hierarchy for subtree in subtrees):
+            largest = max((subtree for subtree in subtrees if not subtree.is_lowest_hierarchy),
+                          key=lambda subtree: len(subtree.get_substrate_nodes()))
+            largest_level = subtrees.pop(largest)
+            subtrees.update((child, largest_level + 1) for child in largest.child_coordinators)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(compute_subtree_paths, subtree, aggregation, paths_per_pair, subtree_level)
+                       for subtree, subtree_level in subtrees.items()]
+            for subtree, future in zip(subtrees, futures):
+                computed_subtree, result = future.result()
+                subtree.__adopt_paths(computed_subtree)
+                subtree.precomputed_paths = result
+
+    def __adopt_paths(self, computed_coordinator):
+        """
+        Takes the computed paths and restrictions of the copy of this subtree that was computed in a worker process.
+        """
+        self.intra_domain_paths = computed_coordinator.intra_domain_paths
+        self.cpu_restrictions = computed_coordinator.cpu_restrictions
+        self.routing_restrictions = computed_coordinator.routing_restrictions
+        self.allocated_paths = computed_coordinator.allocated_paths
+        if not self.is_lowest_hierarchy:
+            self.substrate_subgraph = computed_coordinator.substrate_subgraph
+        for child, computed_child in zip(self.child_coordinators, computed_coordinator.child_coordinators):
+            child.__adopt_paths(computed_child)
+
+    def __renumber_precomputed_paths(self, counter):
+        """
+        Shifts the path identifiers of the precomputed subtree to the numbers they get if the subtree is computed
+        starting at counter, see compute_advertised_paths.
+        :return: the precomputed result with the shifted identifiers
+        """
+        renumbering = {}
+        next_counter = self.__allocate_paths(counter, renumbering)
+        intra_domain_paths, cpu_restrictions, routing_restrictions, _ = self.precomputed_paths
+        self.precomputed_paths = None
+
+        # the paths and restrictions are shared between the lists of the coordinators, each is renamed only once
+        paths = {id(path): path for path in intra_domain_paths}
+        restrictions = {id(restriction): restriction for restriction in cpu_restrictions + routing_restrictions}
+        coordinators = [self]
+        while len(coordinators) > 0:
+            coordinator = coordinators.pop()
+            paths.update((id(path), path) for path in coordinator.intra_domain_paths)
+            restrictions.update((id(restriction), restriction) for restriction in
+                                coordinator.cpu_restrictions + coordinator.routing_restrictions)
+            coordinators += coordinator.child_coordinators
+        for path in paths.values():
+            path.identifier = renumbering.get(path.identifier, path.identifier)
+        for restriction in restrictions.values():
+            restriction.paths = type(restriction.paths)(renumbering.get(path, path) for path in restriction.paths)
+
+        # the expanded networks are keyed by the identifiers of the paths of the child coordinators
+        coordinators = [self]
+        while len(coordinators) > 0:
+            coordinator = coordinators.pop()
+            if not coordinator.is_lowest_hierarchy:
+                coordinator.substrate_subgraph = coordinator.__compute_graph_from_paths()
+                coordinators += coordinator.child_coordinators
+        return intra_domain_paths, cpu_restrictions, routing_restrictions, next_counter
+
+    def __allocate_paths(self, counter, renumbering):
+        """
+        Repeats the allocation of the path identifiers of compute_advertised_paths for the already computed subtree.
+        :param renumbering: the dict the previous identifiers are mapped to the identifiers starting at counter in
+        :return: the number of the next free path identifier, as returned by compute_advertised_paths
+        """
+        if not self.is_lowest_hierarchy:
+            for coordinator in self.child_coordinators:
+                counter += coordinator.__allocate_paths(counter, renumbering)
+        start, count = self.allocated_paths
+        for offset in range(count):
+            renumbering["path_{0}".format(start + offset)] = "path_{0}".format(counter + offset)
+        self.allocated_paths = (counter, count)
+        return counter + count
+
     def __compute_graph_from_paths(self):
         """
         Computes an expanded network from the child coordinators paths and border nodes. this graph can, in turn,
@@ -315,79 +468,95 @@ class Coordinator:
                                       delay=edge.delay,
                                       label=edge.identifier)
 
-        return expanded_network
+        return pc.index_edges(expanded_network)
 
     def collect_solutions(self, output_path):
-        if not os.path.isfile(output_path + "/solution.log"):
+        """
+        :return: the overlay solution of the hierarchy below this coordinator, a dict mapping the condensed names of
+         the values to the values
+        """
+        return {condensed_solution_name(family, key): value for (family, key), value in
+                self.collect_solution_records(output_path).items()}
+
+    def collect_solution_records(self, output_path=None, solutions=None):
+        """
+        Merges the condensed solutions of this coordinator and of its child coordinators, the arcs of the children are
+        mapped to the arcs of the requests of this coordinator.
+        :param output_path: the folder the solution of this coordinator was saved to
+        :param solutions: the solutions kept in memory instead, a dict mapping the names of the solved coordinators to
+         the SolutionRecords of their condensed solution ("records") and their request mappings ("request_mappings")
+        :return: a dict mapping (family, key) to the value
+        """
+        if solutions is None:
+            solution = load_solution(output_path, condensed=True)
+            records = None if solution is None else solution.records()
+        else:
+            records = solutions[self.name]["records"] if self.name in solutions else None
+        if records is None:
             return {}
         if self.is_lowest_hierarchy:
-            with open(output_path + "/solution.log", 'r') as solution_file:
-                solution = yaml.load(solution_file)
-                return solution
-        else:
+            return {(record.family, record.key): record.value for record in records}
 
-            solutions = []
-            merged_solution = defaultdict(int)
+        if solutions is None:
+            request_mappings = None
+            if os.path.isfile(output_path + "/request_mappings.yaml"):
+                with open(output_path + "/request_mappings.yaml", 'r') as request_mappings_file:
+                    request_mappings = yaml.load(request_mappings_file, Loader=yaml.FullLoader)
+        else:
+            request_mappings = solutions[self.name]["request_mappings"]
 
-            for coordinator in self.child_coordinators:
-                child_solution = coordinator.collect_solutions(
-                    output_path="{0}/{1}".format(output_path, coordinator.name))
-                solutions.append(coordinator.__map_solutions(child_solution, coordinator.name, output_path))
-
-            for solution in solutions:
-                for k, v in solution.items():
-                    merged_solution[k] += v
-
-            with open(output_path + "/solution.log", 'r') as solution_file:
-                solution = yaml.load(solution_file)
-                for k, v in solution.items():
-                    if "gamma" in k and self.is_root_coordinator:
-                        if "SRC" in k or "DST" in k:
-                            merged_solution[k] += v
-                    else:
-                        if "gamma" in k:
-                            continue
-                        merged_solution[k] += v
-
-            return merged_solution
-
-    def __map_solutions(self, solution, domain_name, output_path):
-        if not os.path.isfile(output_path + "/request_mappings.yaml"):
+        merged_solution = defaultdict(int)
+        for coordinator in self.child_coordinators:
+            child_solution = coordinator.collect_solution_records(
+                output_path=None if output_path is None else "{0}/{1}".format(output_path, coordinator.name),
+                solutions=solutions)
+            for record_key, value in coordinator.__map_solutions(child_solution, coordinator.name,
+                                                                 request_mappings).items():
+                merged_solution[record_key] += value
+
+        for record in records:
+            if record.family == "gamma":
+                # the placements of the children are more detailed, only the root keeps its ingresses and egresses
+                if self.is_root_coordinator and record.key[0] in ["SRC", "DST"]:
+                    merged_solution[record.family, record.key] += record.value
+            else:
+                merged_solution[record.family, record.key] += record.value
+        return merged_solution
+
+    def __map_solutions(self, solution, domain_name, request_mappings):
+        """
+        :param request_mappings: the request mappings of the parent coordinator, None if it did not generate requests
+        """
+        if request_mappings is None:
             return {}
-        with open(output_path + "/request_mappings.yaml", 'r') as request_mappings_file:
-            request_mappings = yaml.load(request_mappings_file, Loader=yaml.FullLoader)
-            mapped_solutions = {}
-            for key, value in solution.items():
-                if "lambda_inter" in key:
-                    # keys look like lambda_inter[(B_request2-request2,DST_request2-request2), path_11, egress_N12, edge_1]
-                    first_vnf = key[key.index('(') + 1:key.index(',')]
-                    second_vnf = key[key.index(',') + 1: key.index(')')]
-
-                    request = get_request_from_arc(first_vnf)
-                    vnf0 = get_vnf_from_arc(first_vnf)
-                    vnf1 = get_vnf_from_arc(second_vnf)
-                    trimmed_request = trim_request(request)
-
-                    if first_vnf == "SRC_" + request:
-                        corrected_first_vnf = request_mappings[domain_name][request][0]
-                        first_vnf = corrected_first_vnf + "_" + trimmed_request
-                    else:
-                        first_vnf = vnf0 + "_" + trimmed_request
-                    if second_vnf == "DST_" + request:
-                        corrected_second_vnf = request_mappings[domain_name][request][1]
-                        second_vnf = corrected_second_vnf + "_" + trimmed_request
-                    else:
-                        second_vnf = vnf1 + "_" + trimmed_request
-                    corrected_key = "lambda_inter[({0},{1}){2}".format(first_vnf, second_vnf,
-                                                                       key[key.index(')') + 1:])
-                    if corrected_key in mapped_solutions:
-                        mapped_solutions[corrected_key] += value
-                    else:
-                        mapped_solutions[corrected_key] = value
-                if "gamma" in key:
-                    if "SRC" in key and not self.is_root_coordinator:
-                        continue
-                    if "DST" in key and not self.is_root_coordinator:
-                        continue
-                    mapped_solutions[key] = value
-            return mapped_solutions
+        mapped_solutions = {}
+        for (family, key), value in solution.items():
+            if family == "lambda_inter":
+                # arcs look like (B_request2-request2, DST_request2-request2)
+                (first_vnf, second_vnf), p, p_prime, e = key
+
+                request = get_request_from_arc(first_vnf)
+                vnf0 = get_vnf_from_arc(first_vnf)
+                vnf1 = get_vnf_from_arc(second_vnf)
+                trimmed_request = trim_request(request)
+
+                if first_vnf == "SRC_" + request:
+                    corrected_first_vnf = request_mappings[domain_name][request][0]
+                    first_vnf = corrected_first_vnf + "_" + trimmed_request
+                else:
+                    first_vnf = vnf0 + "_" + trimmed_request
+                if second_vnf == "DST_" + request:
+                    corrected_second_vnf = request_mappings[domain_name][request][1]
+                    second_vnf = corrected_second_vnf + "_" + trimmed_request
+                else:
+                    second_vnf = vnf1 + "_" + trimmed_request
+                corrected_key = (family, ((first_vnf, second_vnf), p, p_prime, e))
+                if corrected_key in mapped_solutions:
+                    mapped_solutions[corrected_key] += value
+                else:
+                    mapped_solutions[corrected_key] = value
+            if family == "gamma":
+                if key[0] in ["SRC", "DST"] and not self.is_root_coordinator:
+                    continue
+                mapped_solutions[family, key] = value
+        return mapped_solutions
@@ -9,6 +9,34 @@ from hvc.mip.models import RoutingRestriction, CpuRestriction, IntraDomainPath
 logger = utils.setup_logger('pc', 'path_computing.log', logging.DEBUG)
 
 
+def index_edges(graph):
+    """
+    Attaches the index of the edges of a substrate graph or an expanded graph of paths to it. The edges of a substrate
+    graph are indexed by their integer id, the edges of an expanded graph (a multigraph) by their key, i.e. the
+    identifier of the path or inter-domain edge.
+    :return: the graph
+    """
+    edge_index = {}
+    if graph.is_multigraph():
+        for u, v, k in graph.edges:
+            edge_index.setdefault(k, (u, v, k))
+    else:
+        for u, v, edge_id in graph.edges(data="id"):
+            edge_index.setdefault(int(edge_id), (u, v))
+    graph.graph["edge_index"] = edge_index
+    return graph
+
+
+def get_edge(graph, edge_id):
+    """
+    :param edge_id: the id of a substrate edge or the key of an edge of an expanded graph
+    :return: (u, v) of the substrate edge, or (u, v, key) of the edge of the expanded graph, None if there is none
+    """
+    if "edge_index" not in graph.graph:
+        index_edges(graph)
+    return graph.graph["edge_index"].get(edge_id if graph.is_multigraph() else int(edge_id))
+
+
 def __get_G_from_C(C, egresses, ingresses, fixed_edge_directions):
     G = nx.Graph()
     for node in C.nodes():
@@ -252,12 +280,13 @@ def __get_edge_ids(edge_map, u, v):
 
 
 def get_path_subset(intra_domain_paths, node_to_path, edge_to_path, substrate_subgraph, is_lowest_hierarchy,
-                    path_aggregation):
+                    path_aggregation, paths_per_pair=None):
     """
 
     :param intra_domain_paths:
     :param node_to_path:
     :param edge_to_path:
+    :param paths_per_pair: the number of paths kept for each pair of border nodes by the k_paths aggregation
     :return:
     """
     # one_path two_paths full_expansion possible
@@ -282,6 +311,7 @@ def get_path_subset(intra_domain_paths, node_to_path, edge_to_path, substrate_su
     if method == "two_paths":
         conducted_pairs = []
         to_return = []
+        edges_of_path = __edges_of_paths(edge_to_path)
         for intra_domain_path in intra_domain_paths:
             src, dst = intra_domain_path.source, intra_domain_path.destination
             if (src, dst) in conducted_pairs or (dst, src) in conducted_pairs:
@@ -303,18 +333,10 @@ def get_path_subset(intra_domain_paths, node_to_path, edge_to_path, substrate_su
                     continue
                 # find out which edges they share
                 bottleneck_rate = p.rate + p_prime.rate
-                for e, paths in edge_to_path.items():
-                    if p.identifier in paths and p_prime.identifier in paths:
-                        shared_bottleneck = None
-                        if is_lowest_hierarchy:
-                            for u, v in substrate_subgraph.edges:
-                                if substrate_subgraph[u][v]['id'] == e:
-                                    shared_bottleneck = substrate_subgraph[u][v]['max_rate']
-                        else:
-                            for u, v, k in substrate_subgraph.edges:
-                                if k == e:
-                                    shared_bottleneck = substrate_subgraph[u][v][e]["max_rate"]
-                        bottleneck_rate = min(bottleneck_rate, shared_bottleneck)
+                for e in edges_of_path[p.identifier] & edges_of_path[p_prime.identifier]:
+                    edge = get_edge(substrate_subgraph, e)
+                    shared_bottleneck = None if edge is None else substrate_subgraph.edges[edge]["max_rate"]
+                    bottleneck_rate = min(bottleneck_rate, shared_bottleneck)
                 paths_to_rate[(p, p_prime)] = bottleneck_rate
             # get the key with the max val
             (p, p_prime) = max(paths_to_rate.items(), key=operator.itemgetter(1))[0]
@@ -326,6 +348,88 @@ def get_path_subset(intra_domain_paths, node_to_path, edge_to_path, substrate_su
             conducted_pairs.append((src, dst))
         return to_return
 
+    if method == "k_paths":
+        conducted_pairs = set()
+        to_return = []
+        edges_of_path = __edges_of_paths(edge_to_path)
+        for intra_domain_path in intra_domain_paths:
+            src, dst = intra_domain_path.source, intra_domain_path.destination
+            if (src, dst) in conducted_pairs or (dst, src) in conducted_pairs:
+                continue
+            same_paths = [p for p in intra_domain_paths if p.source == src and p.destination == dst]
+            for p in __best_path_subset(same_paths, paths_per_pair, edges_of_path, substrate_subgraph):
+                to_return.append(p.identifier)
+                to_return.append(utils.get_backward_edge_id(p.identifier))
+            conducted_pairs.add((src, dst))
+        return to_return
+
+
+def __edges_of_paths(edge_to_path):
+    """
+    :return: a dict mapping each path to the set of edges it uses, the shared edges of paths are the intersection of
+     their edges
+    """
+    edges_of_path = defaultdict(set)
+    for e, paths in edge_to_path.items():
+        for path in paths:
+            edges_of_path[path].add(e)
+    return edges_of_path
+
+
+def __best_path_subset(paths, k, edges_of_path, substrate_subgraph):
+    """
+    Finds the k paths between the same border nodes with the highest jointly usable rate. The paths that share an edge
+    can use at most its max_rate together, thus the usable rate of a subset is the sum of the rates of its paths, but at
+    most the max_rate of each shared edge plus the rates of the paths of the subset not using the edge. For two paths
+    this is the rate of the two_paths aggregation.
+    The subsets are searched depth first in the order of the paths with the usage of the edges updated as paths are
+    added, branches whose rate cannot exceed the best subset found so far are skipped.
+    :return: the paths of the best subset in the order of the given paths, the first subset of the highest rate
+    """
+    if len(paths) <= k:
+        return paths
+    # the k - i highest rates of the paths from index i on bound the rate the remaining paths can add
+    highest_rates = [sorted((p.rate for p in paths[i:]), reverse=True) for i in range(len(paths))]
+    capacities = {}
+    rate_on_edge = defaultdict(int)
+    paths_on_edge = defaultdict(int)
+    subset = []
+    best = [-1, None]
+
+    def capacity(e):
+        if e not in capacities:
+            capacities[e] = substrate_subgraph.edges[get_edge(substrate_subgraph, e)]["max_rate"]
+        return capacities[e]
+
+    def search(start, rate):
+        if len(subset) == k:
+            usable_rate = rate
+            for e in {e for p in subset for e in edges_of_path[p.identifier] if paths_on_edge[e] > 1}:
+                usable_rate = min(usable_rate, capacity(e) + rate - rate_on_edge[e])
+            if usable_rate > best[0]:
+                best[0], best[1] = usable_rate, list(subset)
+            return
+        missing = k - len(subset)
+        # the slack keeps subsets whose rate only differs by rounding
+        if rate + sum(highest_rates[start][:missing]) < best[0] - 1e-9:
+            return
+        for i in range(start, len(paths) - missing + 1):
+            p = paths[i]
+            # the previous usage is restored afterwards instead of subtracted, rounding errors would add up otherwise
+            previous_rates = {e: rate_on_edge[e] for e in edges_of_path[p.identifier]}
+            for e in edges_of_path[p.identifier]:
+                rate_on_edge[e] += p.rate
+                paths_on_edge[e] += 1
+            subset.append(p)
+            search(i + 1, rate + p.rate)
+            subset.pop()
+            for e, previous_rate in previous_rates.items():
+                rate_on_edge[e] = previous_rate
+                paths_on_edge[e] -= 1
+
+    search(0, 0)
+    return best[1]
+
 
 def compute_cpu_restrictions(substrate_subgraph, node_to_path, intra_domain_path_ids, domain, is_lowest_hierarchy,
                              cpu_restrictions,
@@ -391,9 +495,7 @@ def compute_routing_restrictions(substrate_subgraph, edge_to_path, intra_domain_
             filtered_path_set = frozenset([path for path in path_list if path in intra_domain_paths])
             logger.debug("Filtered paths: {}".format(filtered_path_set))
             if is_lowest_hierarchy:
-                edge = next(((u, v) for (u, v) in substrate_subgraph.edges() if
-                             int(substrate_subgraph[u][v]['id']) == int(edge_id)),
-                            None)
+                edge = get_edge(substrate_subgraph, edge_id)
                 if edge is None:
                     print(edge_id)
                     for edge in substrate_subgraph.edges:
@@ -402,7 +504,7 @@ def compute_routing_restrictions(substrate_subgraph, edge_to_path, intra_domain_
                     print(substrate_subgraph['N5']['N3']['id']=='13')
 
             else:
-                edge = next((u, v) for u, v in substrate_subgraph.edges() if edge_id in substrate_subgraph[u][v])
+                edge = get_edge(substrate_subgraph, edge_id)[:2]
 
             logger.debug("Edge id {} resolves to edge {}".format(edge_id, edge))
 
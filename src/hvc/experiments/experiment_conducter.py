@@ -7,7 +7,7 @@ import hvc.experiments.result_interpreter as ri
 
 def conduct_experiment(seed_id, seed_table, hierarchy_id, hierarchy_table, graphml_id, graphml_table, vnf_request_id,
                        vnf_request_table, results_table, chains_path, vnf_descriptions_path, output_path, conn,
-                       method="full_expansion", use_placements=-1):
+                       method="full_expansion", use_placements=-1, model_cache=None, paths_per_pair=None):
     """
     Starts an experiment run for the given parameters, each parameter is specified by a table and an id
     :param seed_id:
@@ -23,11 +23,17 @@ def conduct_experiment(seed_id, seed_table, hierarchy_id, hierarchy_table, graph
     :param vnf_descriptions_path: the path of the vnf_description file
     :param output_path: the path where the output of this run should be saved to
     :param conn: db connection which has all of the above tables
-    :param method: either "full_expansion", "one_path" or "two_paths"
+    :param method: either "full_expansion", "one_path", "two_paths" or "k_paths"
     :param use_placements: if the amount of placements should be fixed (careful: only makes sense in flat hierarchies!)
+    :param model_cache: an optional ModelCache shared by the runs, runs that only differ in the seed reuse the models
+    :param paths_per_pair: the number of advertised paths per pair of border nodes of each level for "k_paths"
     :return:
     """
     cursor = conn.cursor()
+    path_aggregation = method
+    if paths_per_pair is not None:
+        # the runs of different k are different experiments
+        method = "{0}_{1}".format(method, "_".join(str(k) for k in paths_per_pair))
 
     # obtain the parameters specified by the ids
     cursor.execute("SELECT {} FROM {} WHERE seed_id={}".format("seed", seed_table, seed_id))
@@ -85,7 +91,8 @@ def conduct_experiment(seed_id, seed_table, hierarchy_id, hierarchy_table, graph
                                 output_path="{0}/output".format(output_path),
                                 hierarchy_path=hierarchy_path,
                                 solution_path="{0}/solution".format(output_path),
-                                seed=seed, use_exact_placements=use_placements, path_aggregation=method)
+                                seed=seed, use_exact_placements=use_placements, path_aggregation=path_aggregation,
+                                model_cache=model_cache, paths_per_pair=paths_per_pair)
     except AttributeError:
         insert_results_cmd = "UPDATE {} SET placements='{}' WHERE experiment_id={}".format(
             results_table, "INFEASIBLE", experiment_id)
@@ -1,14 +1,18 @@
 import itertools
 
 import experiments.experiment_conducter as ec
+from hvc.mip.model_cache import ModelCache
 
 
-def conduct_experiments(eval_key, conn, method="full_expansion"):
+def conduct_experiments(eval_key, conn, method="full_expansion", cache_path=None, cache_size=None, paths_per_pair=None):
     """
     Starts conducting experiments until all are done
     :param eval_key: evaluation suffix
     :param conn: db connection containing the tables
-    :param method: either "full_expansion", "one_path" or "two_paths"
+    :param method: either "full_expansion", "one_path", "two_paths" or "k_paths"
+    :param cache_path: a folder where the built models are cached, the models are rebuilt for every run if None
+    :param cache_size: the maximal size of the model cache in bytes, unbounded if None
+    :param paths_per_pair: the number of advertised paths per pair of border nodes of each level for "k_paths"
     :return:
     """
     hierarchy_table = "hierarchies_{}".format(eval_key)
@@ -32,6 +36,7 @@ def conduct_experiments(eval_key, conn, method="full_expansion"):
     seed_ids = [res[0] for res in cursor.fetchall()]
 
     output_path = "/upb/departments/pc2/users/m/mirkoj/{}".format(eval_key)
+    model_cache = None if cache_path is None else ModelCache(cache_path, max_size=cache_size)
 
     for hierarchy_id, request_id, graph_id, seed_id in itertools.product(hierarchy_ids, request_ids, graph_ids,
                                                                          seed_ids):
@@ -39,7 +44,8 @@ def conduct_experiments(eval_key, conn, method="full_expansion"):
                               hierarchy_table=hierarchy_table, vnf_request_id=request_id,
                               vnf_request_table=vnf_requests_table, results_table=results_table,
                               chains_path=chains_path, vnf_descriptions_path=vnf_desc_path, graphml_id=graph_id,
-                              graphml_table=graphs_table, output_path=output_path, conn=conn, method=method)
+                              graphml_table=graphs_table, output_path=output_path, conn=conn, method=method,
+                              model_cache=model_cache, paths_per_pair=paths_per_pair)
         conn.commit()
 
     cursor.close()
@@ -1,8 +1,12 @@
+import os
+
 import networkx as nx
 import yaml
 from networkx.algorithms.dag import dag_longest_path
 
 from hvc.api.graphml import __read_graph, read_hierarchy
+from hvc.mip.solution_store import overlay_solution_store, parse_condensed_solution_name, read_solution_store
+from hvc.mip.utils import get_request_from_arc, get_vnf_from_arc
 
 
 def interpret_results(graphml_path, vnf_requests_path, hierarchy_path, solution_path, chains_path):
@@ -14,11 +18,10 @@ def interpret_results(graphml_path, vnf_requests_path, hierarchy_path, solution_
     :return:
     """
     G = __read_graph(graphml_path)
+    overlay_solution = read_overlay_solution_index(solution_path)
     with open(vnf_requests_path, 'r') as vnf_requests_file, \
-            open(solution_path + "/overlay_solution.yaml", 'r') as overlay_solution_file, \
             open(solution_path + "/time_delta.yaml", 'r') as time_delta_file, \
             open(chains_path, 'r') as chains_file:
-        overlay_solution = yaml.load(overlay_solution_file, Loader=yaml.FullLoader)
         vnf_requests = yaml.load(vnf_requests_file, Loader=yaml.FullLoader)
         time_deltas = yaml.load(time_delta_file, Loader=yaml.FullLoader)
         vnf_chains = yaml.load(chains_file, Loader=yaml.FullLoader)
@@ -29,15 +32,78 @@ def interpret_results(graphml_path, vnf_requests_path, hierarchy_path, solution_
         for request in vnf_requests.keys():
             end2end_delay_map[request] = calculate_end_to_end_delay(G, overlay_solution, vnf_requests, request,
                                                                     vnf_chains)
-            edges = __get_edges_from_solution(request, overlay_solution)
+            edges = overlay_solution.edges_of_request(request)
             total_delay_map[request] = calculate_total_delay(G, edges)
 
         solving_time = calculate_time_recursively(root_coordinator, time_deltas)
-        placements = len([k for k in overlay_solution.keys() if "gamma" in k])
+        placements = len(overlay_solution.placements)
         return placements, total_delay_map, end2end_delay_map, solving_time
 
 
+class OverlaySolutionIndex:
+    """
+    The overlay solution of a run, indexed in a single pass over its values.
+    """
+
+    def __init__(self, records):
+        """
+        :param records: the (family, key, value) of each value of the overlay solution
+        """
+        # request -> arc of VNFs (without the request) -> list of (inter-domain edge, rate)
+        self.edges = {}
+        # (VNF, path) -> placement value
+        self.placements = {}
+        for family, key, value in records:
+            if family == "lambda_inter":
+                (first_vnf, second_vnf), p, p_prime, e = key
+                arc = (get_vnf_from_arc(first_vnf), get_vnf_from_arc(second_vnf))
+                self.edges.setdefault(get_request_from_arc(first_vnf), {}).setdefault(arc, []).append((e, value))
+            elif family == "gamma":
+                self.placements[key] = value
+
+    def edges_of_arc(self, request, arc):
+        """
+        :param arc: the arc of the chain of the request, a pair of VNFs
+        :return: the inter-domain edges the traffic of the arc uses
+        """
+        return [edge for edge, rate in self.edges.get(request, {}).get(tuple(arc), [])]
+
+    def edges_of_request(self, request):
+        """
+        :return: the inter-domain edges used by the traffic of any arc of the request
+        """
+        return [edge for arc_edges in self.edges.get(request, {}).values() for edge, rate in arc_edges]
+
+
+def read_overlay_solution_index(solution_path):
+    """
+    :return: the OverlaySolutionIndex of a run, read from the columnar solution store if there is one and from
+     overlay_solution.yaml otherwise
+    """
+    stored_solution = read_solution_store(solution_path + "/" + overlay_solution_store)
+    if stored_solution is not None:
+        return OverlaySolutionIndex((record.family, record.key, record.value) for record in stored_solution.records())
+    with open(solution_path + "/overlay_solution.yaml", 'r') as overlay_solution_file:
+        overlay_solution = yaml.load(overlay_solution_file, Loader=yaml.FullLoader) or {}
+    return OverlaySolutionIndex(parse_condensed_solution_name(name) + (value,) for name, value in
+                                overlay_solution.items())
+
+
+def read_makespan(solution_path):
+    """
+    :return: the measured wall-clock time of solving the hierarchy in ms, None if the solution was saved without it
+    """
+    if not os.path.isfile(solution_path + "/makespan.yaml"):
+        return None
+    with open(solution_path + "/makespan.yaml", 'r') as makespan_file:
+        return yaml.safe_load(makespan_file)["makespan"]
+
+
 def calculate_time_recursively(coordinator, time_deltas):
+    """
+    :return: the solving time of the hierarchy below the coordinator assuming that siblings are solved in parallel
+     without any overhead, see read_makespan for the measured time
+    """
     if coordinator.name not in time_deltas:
         return 0
     own_time = time_deltas[coordinator.name]
@@ -51,29 +117,30 @@ def calculate_time_recursively(coordinator, time_deltas):
 def calculate_end_to_end_delay(G, overlay_solution, vnf_requests, request, vnf_chains):
     """
     Takes the solution edges and reconstructs a di-graph. Then, calculates the longest path using the networkx lib.
+    :param overlay_solution: the OverlaySolutionIndex of the solution
      """
     chain_key = vnf_requests[request]['vnf_chain']
     arcs = vnf_chains[chain_key]
 
     total_e2e_delay = 0
     for arc in arcs:
-        edges = __get_edges_from_solution_for_arc(request, overlay_solution, arc)
+        edges = overlay_solution.edges_of_arc(request, arc)
         total_e2e_delay += calculate_end_to_end_delay_for_arc(G, edges)
     return total_e2e_delay
 
 
 def calculate_end_to_end_delay_for_arc(G, edges):
-    adjusted_edges = [__get_edge_id_from_label(e) for e in edges]
+    adjusted_edges = set(__get_edge_id_from_label(e) for e in edges)
     dG = nx.DiGraph()
-    added_nodes = []
+    added_nodes = set()
     for u, v in G.edges():
         if G[u][v]['id'] in adjusted_edges:
             if u not in added_nodes:
                 dG.add_node(u, **G.nodes[u])
-                added_nodes.append(u)
+                added_nodes.add(u)
             if v not in added_nodes:
                 dG.add_node(v, **G.nodes[v])
-                added_nodes.append(v)
+                added_nodes.add(v)
             dG.add_edge(u, v, **G[u][v])
 
     longest_path = dag_longest_path(dG, weight="delay")
@@ -90,7 +157,7 @@ def calculate_end_to_end_delay_for_arc(G, edges):
 
 
 def calculate_total_delay(G, edges):
-    adjusted_edges = [__get_edge_id_from_label(e) for e in edges]
+    adjusted_edges = set(__get_edge_id_from_label(e) for e in edges)
     return sum(G[u][v]['delay'] for (u, v) in G.edges() if G[u][v]['id'] in adjusted_edges)
 
 
@@ -99,21 +166,3 @@ def __get_edge_id_from_label(label):
         return int(label[label.index("edge_") + 5:])
     else:
         return int(label)
-
-
-def __get_edges_from_solution_for_arc(request, solution_file, arc):
-    edges = []
-    for k in solution_file.keys():
-        if 'inter' in k and request in k and arc[0] in k and arc[1] in k:
-            edge = k[k.rindex(',') + 2:k.index(']')]
-            edges.append(edge)
-    return edges
-
-
-def __get_edges_from_solution(request, solution_file):
-    edges = []
-    for k in solution_file.keys():
-        if 'inter' in k and request in k:
-            edge = k[k.rindex(',') + 2:k.index(']')]
-            edges.append(edge)
-    return edges
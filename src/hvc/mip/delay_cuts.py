@@ -0,0 +1,177 @@
+"""
+Enforces the max_delay of the requests by lazy cuts instead of the delay block of the model (zeta, indicator and max_
+constraints for every placement and border node). The delay of a request is the longest walk through the routes and
+placements it uses: traffic of an arc placed on (p, p') passes the path p its starting VNF is placed on and one of the
+routes from p to p'. A route is used if the delta_inter/delta_intra variables of its edges and paths are 1, placements
+that need no routing are marked by a binary placement switch. The delay thus only depends on binary variables and a
+violating walk is cut off by requiring that not all of its binaries are 1.
+"""
+import math
+
+from gurobipy import GRB, quicksum
+
+from hvc.mip.utils import get_delay_of_link, get_delay_of_path, key_inter_domain_edges, key_intra_domain_paths, \
+    setup_logger
+
+logger = setup_logger("delay_cuts", "delay_cuts.log")
+
+
+def define_placement_switches(parameters, indices, decision_variables, model):
+    """
+    Adds a binary switch for each placement (arc, p, p') that does not need any routing, its lambda_total can only be
+    non-zero if the switch is 1.
+    :return: the switches keyed like lambda_total
+    """
+    keys = [key for key in indices.sparse.lambda_total if key not in indices.sparse.paths_of]
+    switches = model.addVars(keys, vtype=GRB.BINARY, name="placement_switch")
+    for key in keys:
+        model.addConstr(decision_variables.lambda_total[key] <= indices.bounds.lambda_total[key] * switches[key])
+    return switches
+
+
+class Piece:
+    """
+    A placement (arc, p, p') of an arc with its routing components, i.e. its edges and paths with their delta
+    variables, or its placement switch if it needs no routing.
+    """
+
+    def __init__(self, **kwargs):
+        self.p = kwargs["p"]
+        self.p_prime = kwargs["p_prime"]
+        self.source = kwargs["source"]
+        self.target = kwargs["target"]
+        # (position of the delta variable, source node, destination node, delay) of each routing component
+        self.components = kwargs["components"]
+        self.switch = kwargs["switch"]
+
+
+class LazyDelayCuts:
+    """
+    Gurobi callback adding a cut for every request whose delay exceeds its max_delay in a new incumbent, the model
+    needs the parameter LazyConstraints to be set.
+    """
+
+    def __init__(self, parameters, indices, decision_variables, tolerance=1e-6):
+        intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+        inter_domain_edges = parameters.network_description[key_inter_domain_edges]
+        self.path_delays = {path: float(get_delay_of_path(parameters, path)) for path in indices.paths}
+        self.tolerance = tolerance
+        self.cuts = 0
+
+        # all binaries are fetched with a single call per incumbent
+        self.variables = []
+        self.position = {}
+
+        def position_of(family, key):
+            if (family, key) not in self.position:
+                self.position[family, key] = len(self.variables)
+                self.variables.append(getattr(decision_variables, family)[key])
+            return self.position[family, key]
+
+        # request key -> the arcs of its chain in order, each with the pieces of its placements
+        self.chains = {}
+        self.max_delays = {}
+        for request_key, request in parameters.vnf_requests.items():
+            if request.get("max_delay") is None:
+                continue
+            self.max_delays[request_key] = float(request["max_delay"])
+            chain = [(arc[0] + "_" + request_key, arc[1] + "_" + request_key) for arc in
+                     parameters.chains[request["vnf_chain"]]]
+            self.chains[request_key] = [(arc, []) for arc in chain]
+        pieces_of_arc = {arc: pieces for chain in self.chains.values() for arc, pieces in chain}
+
+        for arc, p, p_prime in indices.sparse.lambda_total:
+            if arc not in pieces_of_arc:
+                continue
+            components = []
+            for p_prime_prime in indices.sparse.paths_of.get((arc, p, p_prime), []):
+                path = intra_domain_paths[p_prime_prime]
+                components.append((position_of("delta_intra", (arc, p, p_prime, p_prime_prime)),
+                                   path["src"], path["dst"], float(get_delay_of_path(parameters, p_prime_prime))))
+            for e in indices.sparse.edges_of.get((arc, p, p_prime), []):
+                edge = inter_domain_edges[e]
+                components.append((position_of("delta_inter", (arc, p, p_prime, e)), edge["src"],
+                                   edge["dst"], float(get_delay_of_link(parameters, e))))
+            switch = None
+            if (arc, p, p_prime) in decision_variables.placement_switches:
+                switch = position_of("placement_switches", (arc, p, p_prime))
+            pieces_of_arc[arc].append(Piece(p=p, p_prime=p_prime, source=intra_domain_paths[p]["dst"],
+                                            target=intra_domain_paths[p_prime]["src"], components=components,
+                                            switch=switch))
+
+    def __call__(self, model, where):
+        if where != GRB.Callback.MIPSOL:
+            return
+        values = model.cbGetSolution(self.variables)
+        used = [value > 0.5 for value in values]
+        for request_key, chain in self.chains.items():
+            delay, binaries = self.__longest_walk(chain, used)
+            if delay > self.max_delays[request_key] + self.tolerance:
+                model.cbLazy(quicksum(self.variables[position] for position in binaries) <= len(binaries) - 1)
+                self.cuts += 1
+                logger.debug("Cut off a walk of request {0} with delay {1} > {2}".format(
+                    request_key, delay, self.max_delays[request_key]))
+
+    def __longest_walk(self, chain, used):
+        """
+        :return: the delay of the longest walk of the request through its used placements and routes and the positions
+         of the binaries of the walk, -inf if the request has no walk
+        """
+        # path of the current VNF -> longest delay to reach it and the binaries on the way
+        walks = {}
+        for index, (arc, pieces) in enumerate(chain):
+            next_walks = {}
+            for piece in pieces:
+                if index == 0:
+                    # SRC is placed on the ingress path of the request
+                    reached = (0.0, [])
+                elif piece.p in walks:
+                    reached = walks[piece.p]
+                else:
+                    continue
+                route = self.__longest_route(piece, used)
+                if route is None:
+                    continue
+                delay = reached[0] + self.path_delays[piece.p] + route[0]
+                if piece.p_prime not in next_walks or delay > next_walks[piece.p_prime][0]:
+                    next_walks[piece.p_prime] = (delay, reached[1] + route[1])
+            walks = next_walks
+        if len(walks) == 0:
+            return -math.inf, []
+        return max(walks.values(), key=lambda walk: walk[0])
+
+    @staticmethod
+    def __longest_route(piece, used):
+        """
+        :return: the delay of the longest route of the placement over used components and the positions of their
+         delta variables, None if the placement is not used
+        """
+        if piece.switch is not None:
+            return (0.0, [piece.switch]) if used[piece.switch] else None
+        outgoing = {}
+        for position, source, destination, delay in piece.components:
+            if used[position]:
+                outgoing.setdefault(source, []).append((position, destination, delay))
+
+        longest = {}
+        on_route = set()
+
+        def longest_from(node):
+            if node == piece.target:
+                return 0.0, []
+            if node in longest:
+                return longest[node]
+            # routes along a cycle are ignored
+            on_route.add(node)
+            best = None
+            for position, destination, delay in outgoing.get(node, []):
+                if destination in on_route:
+                    continue
+                rest = longest_from(destination)
+                if rest is not None and (best is None or delay + rest[0] > best[0]):
+                    best = (delay + rest[0], [position] + rest[1])
+            on_route.discard(node)
+            longest[node] = best
+            return best
+
+        return longest_from(piece.source)
@@ -1,10 +1,23 @@
+import copy
+import math
+import os
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
 # noinspection PyUnresolvedReferences
 from gurobipy import *
 
+from hvc.mip import matrix_mip
+from hvc.mip.delay_cuts import LazyDelayCuts, define_placement_switches
+from hvc.mip.indexing import NetworkIndex, define_sparse_indices, define_variable_bounds, restrict_sparse_indices
+from hvc.mip.model_cache import decision_variable_families
 from hvc.mip.models import *
+from hvc.mip.profiling import BuildProfiler
+from hvc.mip.solution_view import SolutionView
 from hvc.mip.utils import *
 
-bigM = 1e5
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
@@ -118,8 +131,11 @@ def __add_temporary_nodes_and_paths(parameters, indices):
             domain_nodes[egress_domain].append(egress_node_key)
 
 
-def __load_descriptions(network_description_file, vnf_description_file, chain_description_file,
-                        vnf_request_description_file, advertised_restriction_file):
+def load_descriptions(network_description_file, vnf_description_file, chain_description_file,
+                      vnf_request_description_file, advertised_restriction_file):
+    """
+    :return: the parameters as parsed from the given parameter files
+    """
     with open(network_description_file, 'r') as network_description_file, open(vnf_description_file,
                                                                                'r') as vnf_description_file, open(
         chain_description_file, 'r') as chain_description_file, open(
@@ -167,80 +183,133 @@ def __define_indices(parameters):
                    arcs=arcs, routing_restrictions=routing_restrictions)
 
 
-def __define_decision_variables(parameters, indices, model):
-    # A->B,p,p':
-    # A placed on p, B placed on p' then lambda total is the total traffic from A to B
-    lambda_total = model.addVars(itertools.product(indices.arcs, indices.paths, indices.paths), lb=0,
-                                 name="lambda_total")
-    # A->B,p,p',e:
-    # A placed on p, B placed on p' then lambda_inter is the traffic from A->B that is routed over edge e
-    lambda_inter = model.addVars(itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges), lb=0,
-                                 name="lambda_inter")
+def __upper_bounds(bounds, keys):
+    return [bounds[key] for key in keys]
+
+
+def decision_variable_definitions(indices):
+    """
+    :return: the family, the keys and the options of addVars of each decision variable family, in the order the
+     families are added to the model
+    """
+    bounds = indices.bounds
+    vnfs_on_paths = list(itertools.product(indices.vnfs, indices.paths))
+    return [
+        # A->B,p,p':
+        # A placed on p, B placed on p' then lambda total is the total traffic from A to B
+        # combinations that are structurally fixed to zero are left out
+        ("lambda_total", indices.sparse.lambda_total,
+         dict(lb=0, ub=__upper_bounds(bounds.lambda_total, indices.sparse.lambda_total))),
+        # A->B,p,p',e:
+        # A placed on p, B placed on p' then lambda_inter is the traffic from A->B that is routed over edge e
+        ("lambda_inter", indices.sparse.lambda_inter,
+         dict(lb=0, ub=__upper_bounds(bounds.lambda_inter, indices.sparse.lambda_inter))),
+        # A->B,p,p',p'':
+        # A placed on p, B placed on p' then lambda_intra is the traffic from A->B that is routed over path p''
+        ("lambda_intra", indices.sparse.lambda_intra,
+         dict(lb=0, ub=__upper_bounds(bounds.lambda_intra, indices.sparse.lambda_intra))),
+        # total incoming rate of a VNF placed on path
+        ("sigma_in", vnfs_on_paths, dict(lb=0, ub=__upper_bounds(bounds.sigma_in, vnfs_on_paths))),
+        # total outgoing rate of a VNF placed on path
+        ("sigma_out", vnfs_on_paths, dict(lb=0, ub=__upper_bounds(bounds.sigma_out, vnfs_on_paths))),
+        # 0/1 if edge is used
+        ("delta_inter", indices.sparse.lambda_inter, dict(vtype=GRB.BINARY)),
+        # 0/1 if path is used
+        ("delta_intra", indices.sparse.lambda_intra, dict(vtype=GRB.BINARY)),
+        # 0/1 if vnf is placed on path
+        ("gamma", indices.sparse.gamma, dict(vtype=GRB.BINARY)),
+        # Cpu demands
+        ("kappa", vnfs_on_paths, dict(vtype=GRB.INTEGER, lb=0, ub=__upper_bounds(bounds.kappa, vnfs_on_paths))),
+        # rate of the path
+        ("beta", indices.paths, dict(lb=0, ub=__upper_bounds(bounds.beta, indices.paths))),
+        # Denote the shared cpu
+        ("epsilon", list(itertools.product(indices.cpu_restrictions, indices.paths)), dict(lb=0)),
+        # denotes the max delay
+        ("zeta", indices.sparse.zeta, dict(lb=0)),
+    ]
 
-    # A->B,p,p',p'':
-    # A placed on p, B placed on p' then lambda_intra is the traffic from A->B that is routed over path p''
-    lambda_intra = model.addVars(itertools.product(indices.arcs, indices.paths, indices.paths, indices.paths), lb=0,
-                                 name="lambda_intra")
 
-    # total incoming rate of a VNF placed on path
-    sigma_in = model.addVars(itertools.product(indices.vnfs, indices.paths), lb=0, name="sigma_in")
+def __define_decision_variables(parameters, indices, model):
+    return DecisionVariables(**{family: model.addVars(keys, name=family, **options) for family, keys, options in
+                                decision_variable_definitions(indices)})
+
 
-    # total outgoing rate of a VNF placed on path
-    sigma_out = model.addVars(itertools.product(indices.vnfs, indices.paths), lb=0, name="sigma_out")
+def __arcs_by(arcs, key):
+    """
+    :return: a dict mapping each value of the key function to the arcs with this value, in the order of the given arcs
+    """
+    arcs_by = defaultdict(list)
+    for arc in arcs:
+        arcs_by[key(arc)].append(arc)
+    return arcs_by
 
-    # 0/1 if edge is used
-    delta_inter = model.addVars(itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges),
-                                vtype=GRB.BINARY,
-                                name="delta_inter")
 
-    # 0/1 if path is used
-    delta_intra = model.addVars(itertools.product(indices.arcs, indices.paths, indices.paths, indices.paths),
-                                vtype=GRB.BINARY,
-                                name="delta_intra")
+def __routing_variables(indices, decision_variables, placement):
+    """
+    :return: dicts mapping the paths and the edges that can carry the traffic of the placement (arc, p, p_prime) to its
+     lambda_intra and lambda_inter variables, both are empty if the placement needs no routing
+    """
+    arc, p, p_prime = placement
+    return ({p_prime_prime: decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
+             indices.sparse.paths_of.get(placement, [])},
+            {e: decision_variables.lambda_inter[arc, p, p_prime, e] for e in indices.sparse.edges_of.get(placement, [])})
 
-    # 0/1 if vnf is placed on path
-    gamma = model.addVars(itertools.product(indices.vnfs, indices.paths), vtype=GRB.BINARY, name="gamma")
 
-    # Cpu demands
-    kappa = model.addVars(itertools.product(indices.vnfs, indices.paths), vtype=GRB.INTEGER, lb=0, name="kappa")
+def __big_m(bound):
+    """
+    :return: the given upper bound as big-M value, the global bigM if there is no finite bound
+    """
+    return bound if bound < math.inf else bigM
 
-    # rate of the path
-    beta = model.addVars(indices.paths, lb=0, name="beta")
 
-    # Denote the shared cpu
-    epsilon = model.addVars(itertools.product(indices.cpu_restrictions, indices.paths), lb=0, name="epsilon")
+def __on_off_constraint(indices, model, variable, switch, bound, name=""):
+    """
+    Allows the variable to be non-zero only if the binary switch is 1, either as a big-M row using the upper bound of
+    the variable or as an indicator constraint.
+    """
+    if indices.bounds.use_indicators:
+        model.addGenConstrIndicator(switch, False, variable <= 0, name=name)
+    else:
+        model.addConstr(variable <= __big_m(bound) * switch, name=name)
 
-    # denotes the max delay
-    zeta = model.addVars(itertools.product(indices.arcs, indices.paths, indices.paths, indices.border_nodes), lb=0,
-                         name="zeta")
 
-    return DecisionVariables(lambda_total=lambda_total, lambda_inter=lambda_inter, lambda_intra=lambda_intra,
-                             sigma_in=sigma_in, sigma_out=sigma_out,
-                             delta_inter=delta_inter,
-                             delta_intra=delta_intra,
-                             gamma=gamma, kappa=kappa, beta=beta, epsilon=epsilon, zeta=zeta)
+def __function_value(model, function, argument, name):
+    """
+    Applies a VNF function to a variable or an expression. Affine functions are applied directly, for piecewise-linear
+    functions the value (and an argument that is not a single variable) are new variables linked by a PWL constraint.
+    :return: an expression equal to the function value
+    """
+    if function.is_affine:
+        return function(argument)
+    rate = argument
+    if not isinstance(argument, Var):
+        rate = model.addVar(lb=0, name=name + "_rate")
+        model.addConstr(rate == argument)
+    value = model.addVar(lb=0, name=name + "_value")
+    model.addGenConstrPWL(rate, value, *function.pwl_points(), name=name)
+    return value
 
 
 # Restriction rules
 # 1. Outgoing rate depends on incoming rate
 def __outrate_constraint(parameters, indices, decision_variables, model):
+    functions = get_vnf_functions(parameters)
     for vnf, path in itertools.product(indices.vnfs, indices.paths):
         model.addConstr(
-            decision_variables.sigma_out[vnf, path] == evaluate_outgoing_rate(parameters=parameters, vnf=vnf,
-                                                                              ingoing_rate=
-                                                                              decision_variables.sigma_in[
-                                                                                  vnf, path]),
+            decision_variables.sigma_out[vnf, path] == __function_value(model, functions.outgoing_rate[vnf],
+                                                                        decision_variables.sigma_in[vnf, path],
+                                                                        "outrate_" + vnf + "_" + path),
             name="outrate_" + vnf + "_" + path)
 
 
 # 2. cpu demand depends on incoming rate
 def __cpu_consumption_constraint(parameters, indices, decision_variables, model):
+    functions = get_vnf_functions(parameters)
     for vnf, path in itertools.product(indices.vnfs, indices.paths):
         model.addConstr(
-            decision_variables.kappa[vnf, path] >= evaluate_cpu_consumption(parameters=parameters, vnf=vnf,
-                                                                            ingoing_rate=
-                                                                            decision_variables.sigma_in[
-                                                                                vnf, path]),
+            decision_variables.kappa[vnf, path] >= __function_value(model, functions.cpu_consumption[vnf],
+                                                                    decision_variables.sigma_in[vnf, path],
+                                                                    "cpu_consumption_" + vnf + "_" + path),
             name="cpu_consumption_" + vnf + "_" + path)
 
 
@@ -249,59 +318,60 @@ def __inter_domain_edge_capacity_constraint(parameters, indices, decision_variab
     for edge in indices.edges:
         # all routed traffic over a link must not exceed the links capacity
         model.addConstr(quicksum(
-            decision_variables.lambda_inter[alpha, p, p_prime, edge] for alpha in indices.arcs for p in
-            indices.paths
-            for p_prime in indices.paths) <= get_rate_of_link(parameters=parameters, link=edge),
+            decision_variables.lambda_inter[key] for key in indices.sparse.inter_by_edge[edge]) <= get_rate_of_link(
+            parameters=parameters, link=edge),
                         name="inter_domain_capacity_" + edge)
 
 
 # 4. Big-M inter domain edges
 def __bigM_inter_domain_edge_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime, edge in itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges):
-        model.addConstr(
-            decision_variables.lambda_inter[arc, p, p_prime, edge] <= bigM * decision_variables.delta_inter[
-                arc, p, p_prime, edge],
-            name="bigM_interdomain_edges_" + str(arc) + "_" + p + "_" + p_prime + "_" + edge)
+    for key in indices.sparse.lambda_inter:
+        arc, p, p_prime, edge = key
+        __on_off_constraint(indices, model, decision_variables.lambda_inter[key], decision_variables.delta_inter[key],
+                            indices.bounds.lambda_inter[key],
+                            name="bigM_interdomain_edges_" + str(arc) + "_" + p + "_" + p_prime + "_" + edge)
 
 
 # 5. Big-M intra domain edges
 def __bigM_intra_domain_path_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                            indices.paths):
-        model.addConstr(
-            decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] <= bigM *
-            decision_variables.delta_intra[
-                arc, p, p_prime, p_prime_prime],
-            name="bigM_intradomain_paths_" + str(arc) + "_" + p + "_" + p_prime + "_" + p_prime_prime)
+    for key in indices.sparse.lambda_intra:
+        arc, p, p_prime, p_prime_prime = key
+        __on_off_constraint(indices, model, decision_variables.lambda_intra[key], decision_variables.delta_intra[key],
+                            indices.bounds.lambda_intra[key],
+                            name="bigM_intradomain_paths_" + str(arc) + "_" + p + "_" + p_prime + "_" + p_prime_prime)
 
 
 # 6 Big-M placement
 def __bigM_placement_constraint(parameters, indices, decision_variables, model):
-    for vnf, path in itertools.product(indices.vnfs, indices.paths):
-        model.addConstr(decision_variables.sigma_in[vnf, path] <= bigM * decision_variables.gamma[vnf, path])
+    # a VNF that can structurally not be placed on a path has an upper bound of 0 on its incoming rate there
+    for vnf, path in indices.sparse.gamma:
+        __on_off_constraint(indices, model, decision_variables.sigma_in[vnf, path],
+                            decision_variables.gamma[vnf, path], indices.bounds.sigma_in[vnf, path])
 
 
 # 7. outrate of component is distrbuted
 def __outrate_distribution_constraint(parameters, indices, decision_variables, model):
+    arcs_starting_with = __arcs_by(indices.arcs, lambda arc: get_vnf_from_arc(arc[0]))
     for vnf, path in itertools.product(indices.vnfs, indices.paths):
-        arcs_starting_with_vnf = [arc for arc in indices.arcs if vnf == get_vnf_from_arc(arc[0])]
+        arcs_starting_with_vnf = arcs_starting_with[vnf]
         if len(arcs_starting_with_vnf) > 0:
             # all the outgoing traffic of a VNF has to be distributed among requests
             model.addConstr(decision_variables.sigma_out[vnf, path] == quicksum(
-                decision_variables.lambda_total[arc, path, p_prime] for arc in arcs_starting_with_vnf for p_prime in
-                indices.paths),
+                decision_variables.lambda_total[key] for arc in arcs_starting_with_vnf for key in
+                indices.sparse.total_by_start[arc, path]),
                             name="outrate_distribution_" + vnf + "_" + path)
 
 
 # 8. Inrate distribution
 def __inrate_distribution_constraint(parameters, indices, decision_variables, model):
+    arcs_ending_with = __arcs_by(indices.arcs, lambda arc: get_vnf_from_arc(arc[1]))
     for vnf, path in itertools.product(indices.vnfs, indices.paths):
-        arcs_ending_with_vnf = [arc for arc in indices.arcs if vnf == get_vnf_from_arc(arc[1])]
+        arcs_ending_with_vnf = arcs_ending_with[vnf]
         if len(arcs_ending_with_vnf) > 0:
             # all incoming traffic of a VNF has to come from requests
             model.addConstr(decision_variables.sigma_in[vnf, path] == quicksum(
-                decision_variables.lambda_total[arc, p_prime, path] for arc in arcs_ending_with_vnf for p_prime in
-                indices.paths),
+                decision_variables.lambda_total[key] for arc in arcs_ending_with_vnf for key in
+                indices.sparse.total_by_end[arc, path]),
                             name="inrate_distribution" + vnf + "_" + path)
 
 
@@ -344,7 +414,8 @@ def __max_delay_request_constraint(parameters, indices, decision_variables, mode
         print(request["max_delay"])
         egress = request["egress"]
         for p in indices.paths:
-            if "ingress" not in p and "egress" not in p:
+            if "ingress" not in p and "egress" not in p and (final_arc, p, "egress_" + egress, egress) in \
+                    decision_variables.zeta:
                 model.addConstr(decision_variables.zeta[final_arc, p, "egress_" + egress, egress] <= request[
                     "max_delay"])
     #  all_zetas = [decision_variables.zeta[final_arc, p, "egress_"+request["egress"], request["egress"]] for p in indices.paths]
@@ -360,22 +431,23 @@ def __ingress_placement_constraint(parameters, indices, decision_variables, mode
         ingress_node = request["ingress"]
         # place SRC into the v_ingress -> v_path and DST into v -> v_egress
         # search for path with v_ingress as source and v as dst
-        for path_key, path_value in intra_domain_paths.items():
-            if path_value["src"] == "ingress_" + str(ingress_node) and path_value["dst"] == ingress_node:
+        for path_key in indices.network.paths_starting_at["ingress_" + str(ingress_node)]:
+            if intra_domain_paths[path_key]["dst"] == ingress_node:
                 model.addConstr(decision_variables.gamma["SRC", path_key] == 1,
                                 name="ingress_placement_" + request_key)
 
 
 # 13. flow conservation at sources, sources have initial rate
 def __ingress_initial_rate_constraint(parameters, indices, decision_variables, model):
+    arcs_of_request = __arcs_by(indices.arcs, lambda arc: get_request_from_arc(arc[0]))
     for request_key, request in parameters.vnf_requests.items():
         initial_rate = request['initial_rate']
         ingress = request['ingress']
         ingress_path = "ingress_" + str(ingress)
         model.addConstr(quicksum(
-            decision_variables.lambda_total[arc, ingress_path, p] for arc in indices.arcs for p in
-            indices.paths if get_request_from_arc(arc[0]) == request_key and get_vnf_from_arc(
-                arc[0]) == "SRC" and p != ingress_path) == initial_rate,
+            decision_variables.lambda_total[key] for arc in arcs_of_request[request_key] if
+            get_vnf_from_arc(arc[0]) == "SRC" for key in indices.sparse.total_by_start[arc, ingress_path] if
+            key[2] != ingress_path) == initial_rate,
                         name="ingress_initial_rate_{}".format(request_key))
 
 
@@ -386,238 +458,188 @@ def __egress_placement_constraint(parameters, indices, decision_variables, model
         egress_node = request["egress"]
         # place SRC into the v_ingress -> v_path and DST into v -> v_egress
         # search for path with v_ingress as source and v as dst
-        for path_key, path_value in intra_domain_paths.items():
-            if path_value["dst"] == "egress_" + str(egress_node) and path_value["src"] == egress_node:
+        for path_key in indices.network.paths_ending_at["egress_" + str(egress_node)]:
+            if intra_domain_paths[path_key]["src"] == egress_node:
                 model.addConstr(decision_variables.gamma["DST", path_key] == 1,
                                 name="egress_placement_" + request_key)
 
 
 # 15. flow conservation at egress: DST has total rate as receiving
 def __egress_final_rate_constraint(parameters, indices, decision_variables, model):
+    arcs_of_request = __arcs_by(indices.arcs, lambda arc: get_request_from_arc(arc[0]))
     for request_key, request in parameters.vnf_requests.items():
         egress = request['egress']
-        # first compute the final rate
-        ingoing_rate = request["initial_rate"]
         egress_path = "egress_" + str(egress)
-        # calculate outgoing rate
-        outgoing_rate = ingoing_rate
-        for tup in parameters.chains[request["vnf_chain"]]:
-            outgoing_rate = evaluate_outgoing_rate(parameters=parameters, vnf=tup[1],
-                                                   ingoing_rate=outgoing_rate)
+        # the final rate at the end of the chain
+        outgoing_rate = get_chain_rates(parameters, request_key)[-1]
 
         model.addConstr(quicksum(
-            decision_variables.lambda_total[arc, p, egress_path] for arc in indices.arcs for p in indices.paths if
-            get_request_from_arc(arc[0]) == request_key and get_vnf_from_arc(
-                arc[1]) == "DST" and p != egress_path) == outgoing_rate, name="egress_final_rate_" + request_key)
+            decision_variables.lambda_total[key] for arc in arcs_of_request[request_key] if
+            get_vnf_from_arc(arc[1]) == "DST" for key in indices.sparse.total_by_end[arc, egress_path] if
+            key[1] != egress_path) == outgoing_rate, name="egress_final_rate_" + request_key)
 
 
 # 16. flow conservation at border nodes
 def __flow_conservation_border_nodes_constraint(parameters, indices, decision_variables, model):
-    for border_node, arc, p, p_prime in itertools.product(indices.border_nodes, indices.arcs, indices.paths,
-                                                          indices.paths):
-        # some restriction filtering
-        #   if ("SRC" in arc[0] and "ingress" not in p) or ("DST" in arc[1] and "egress" not in p_prime):
-        #       continue
-
-        intra_domain_paths = parameters.network_description[key_intra_domain_paths]
-        inter_domain_edges = parameters.network_description[key_inter_domain_edges]
-        # do not route traffic if p = p_prime (there is no such traffic),
-        # do not bother with border nodes
-        # do not route traffic if we are the intial source of the traffic or the destination of the traffic
-        if p != p_prime and "ingress" not in border_node and "egress" not in border_node and border_node != \
-                intra_domain_paths[p]["dst"] and border_node != intra_domain_paths[p_prime]["src"]:
-            paths_starting_at_border_node = [path_key for path_key, path_value in intra_domain_paths.items() if
-                                             path_value["src"] == border_node]
-            paths_ending_at_border_node = [path_key for path_key, path_value in intra_domain_paths.items() if
-                                           path_value["dst"] == border_node]
-            edges_starting_at_border_node = [edge_key for edge_key, edge_value in inter_domain_edges.items() if
-                                             edge_value["src"] == border_node]
-            edges_ending_at_border_node = [edge_key for edge_key, edge_value in inter_domain_edges.items() if
-                                           edge_value["dst"] == border_node]
+    intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+    # only (arc, p, p_prime) combinations that can route traffic have routing variables
+    for (arc, p, p_prime), nodes in indices.sparse.nodes_of.items():
+        intra, inter = __routing_variables(indices, decision_variables, (arc, p, p_prime))
+        for border_node in nodes:
+            # do not bother with border nodes
+            # do not route traffic if we are the intial source of the traffic or the destination of the traffic
+            if "ingress" in border_node or "egress" in border_node or border_node == intra_domain_paths[p]["dst"] \
+                    or border_node == intra_domain_paths[p_prime]["src"]:
+                continue
+            paths_starting_at_border_node = indices.network.paths_starting_at[border_node]
+            paths_ending_at_border_node = indices.network.paths_ending_at[border_node]
+            edges_starting_at_border_node = indices.network.edges_starting_at[border_node]
+            edges_ending_at_border_node = indices.network.edges_ending_at[border_node]
             model.addConstr(
-                quicksum(
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                    paths_ending_at_border_node if p_prime_prime != p and p_prime_prime != p_prime)
+                quicksum(intra[p_prime_prime] for p_prime_prime in paths_ending_at_border_node if
+                         p_prime_prime in intra and p_prime_prime != p and p_prime_prime != p_prime)
                 +
-                quicksum(decision_variables.lambda_inter[arc, p, p_prime, e] for e in
-                         edges_ending_at_border_node)
+                quicksum(inter[e] for e in edges_ending_at_border_node if e in inter)
                 ==
-                quicksum(
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                    paths_starting_at_border_node if p_prime_prime != p and p_prime_prime != p_prime)
+                quicksum(intra[p_prime_prime] for p_prime_prime in paths_starting_at_border_node if
+                         p_prime_prime in intra and p_prime_prime != p and p_prime_prime != p_prime)
                 +
-                quicksum(decision_variables.lambda_inter[arc, p, p_prime, e] for e in
-                         edges_starting_at_border_node),
+                quicksum(inter[e] for e in edges_starting_at_border_node if e in inter),
                 name="flow_conservation_" + border_node + "_" + str(arc) + "_" + p + "_" + p_prime)
 
 
 # 17. beta definition for paths
 def __max_rate_def_constraint(parameters, indices, decision_variables, model):
     for p in indices.paths:
-        intra_domain_paths = parameters.network_description[key_intra_domain_paths]
-        decision_vars = []
-        paths_different_from_p = [path for path in intra_domain_paths if path != p]
-        for request_key, request in parameters.vnf_requests.items():
-            vnf_chain = [(arc[0] + "_" + request_key, arc[1] + "_" + request_key) for arc in
-                         parameters.chains[request["vnf_chain"]]]
-            boxes = []
-            for index, pair in enumerate(vnf_chain):
-                first_sum = quicksum(
-                    decision_variables.lambda_total[arc, p, p_prime] for arc in vnf_chain[1:index + 1] for p_prime in
-                    paths_different_from_p)
-                second_sumand = decision_variables.lambda_total[pair, p, p]
-                third_sum = quicksum(
-                    decision_variables.lambda_total[arc, p_prime, p] for arc in vnf_chain[index:] for p_prime in
-                    paths_different_from_p)
-
-                inner_sums = model.addVar(lb=0)
-                model.addConstr(inner_sums == first_sum + second_sumand + third_sum)
-                boxes.append(inner_sums)
-
-            dec_var = model.addVar(name=request_key + "_" + p, lb=0)
-            model.addConstr(dec_var == max_(boxes))
-            decision_vars.append(dec_var)
-
-        model.addConstr(quicksum(decision_vars) + quicksum(
-            decision_variables.lambda_intra[arc, p_prime, p_prime_prime, p] for arc in indices.arcs for p_prime in
-            paths_different_from_p
-            for p_prime_prime in paths_different_from_p) == decision_variables.beta[p])
+        request_rates = [define_request_rate(parameters, indices, decision_variables, model, request_key, p) for
+                         request_key in parameters.vnf_requests]
+        __path_rate_definition(indices, decision_variables, model, p, request_rates)
+
+
+def define_request_rate(parameters, indices, decision_variables, model, request_key, p):
+    """
+    :return: a variable holding the rate the request occupies on path p, the maximum of the rates of its chain
+    """
+    request = parameters.vnf_requests[request_key]
+    vnf_chain = [(arc[0] + "_" + request_key, arc[1] + "_" + request_key) for arc in
+                 parameters.chains[request["vnf_chain"]]]
+    boxes = []
+    for index, pair in enumerate(vnf_chain):
+        first_sum = quicksum(decision_variables.lambda_total[key] for arc in vnf_chain[1:index + 1] for key in
+                             indices.sparse.total_by_start[arc, p] if key[2] != p)
+        second_sumand = quicksum(decision_variables.lambda_total[key] for key in indices.sparse.total_by_start[pair, p]
+                                 if key[2] == p)
+        third_sum = quicksum(decision_variables.lambda_total[key] for arc in vnf_chain[index:] for key in
+                             indices.sparse.total_by_end[arc, p] if key[1] != p)
+
+        inner_sums = model.addVar(lb=0)
+        model.addConstr(inner_sums == first_sum + second_sumand + third_sum)
+        boxes.append(inner_sums)
+
+    dec_var = model.addVar(name=request_key + "_" + p, lb=0)
+    model.addConstr(dec_var == max_(boxes))
+    return dec_var
+
+
+def __path_rate_definition(indices, decision_variables, model, p, request_rates):
+    model.addConstr(quicksum(request_rates) + quicksum(
+        decision_variables.lambda_intra[key] for key in indices.sparse.intra_by_path[p] if
+        key[1] != p and key[2] != p) == decision_variables.beta[p])
 
 
 # 18. can only route to existing vnfs with intra domain paths
 def __route_from_existing_vnfs_intra_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                            indices.paths):
+    for key in indices.sparse.lambda_intra:
+        arc, p, p_prime, p_prime_prime = key
         starting_vnf = get_vnf_from_arc(arc[0])
-        model.addConstr(
-            decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] <= bigM * decision_variables.gamma[
-                starting_vnf, p])
+        __on_off_constraint(indices, model, decision_variables.lambda_intra[key],
+                            decision_variables.gamma[starting_vnf, p], indices.bounds.lambda_intra[key])
 
 
 # 19. only route to exisiting vnfs with intra domain paths
 def __route_to_existing_vnfs_intra_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                            indices.paths):
+    for key in indices.sparse.lambda_intra:
+        arc, p, p_prime, p_prime_prime = key
         ending_vnf = get_vnf_from_arc(arc[1])
-        model.addConstr(
-            decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] <= bigM * decision_variables.gamma[
-                ending_vnf, p_prime])
+        __on_off_constraint(indices, model, decision_variables.lambda_intra[key],
+                            decision_variables.gamma[ending_vnf, p_prime], indices.bounds.lambda_intra[key])
 
 
 # 20. only route from exsiting vnfs on inter domain edges
 def __route_from_existing_vnfs_inter_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime, e in itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges):
+    for arc, p, p_prime, e in indices.sparse.lambda_inter:
         model.addConstr(
             decision_variables.lambda_inter[arc, p, p_prime, e] <= decision_variables.lambda_total[arc, p, p_prime])
 
 
 # 21. only route to exisiting vnfs with inter domain edges
 def __route_to_existing_vnfs_inter_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime, e in itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges):
+    for arc, p, p_prime, e in indices.sparse.lambda_inter:
         model.addConstr(
             decision_variables.lambda_inter[arc, p, p_prime, e] <= decision_variables.lambda_total[arc, p, p_prime])
 
 
 # 22. Flow conservation at ending paths
 def __lambda_total_matches_incoming_rates_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime in itertools.product(indices.arcs, indices.paths, indices.paths):
-        intra_domain_paths = parameters.network_description[key_intra_domain_paths]
-        inter_domain_edges = parameters.network_description[key_inter_domain_edges]
+    intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+    # left out combinations neither have a total rate nor any routing variables
+    for arc, p, p_prime in indices.sparse.lambda_total:
+        intra, inter = __routing_variables(indices, decision_variables, (arc, p, p_prime))
         border_node = intra_domain_paths[p_prime]["src"]
-        paths_ending_at_border_node = [path_key for path_key, path_value in intra_domain_paths.items() if
-                                       path_value["dst"] == border_node]
-        edges_ending_at_border_node = [edge_key for edge_key, edge_value in inter_domain_edges.items() if
-                                       edge_value["dst"] == border_node]
+        paths_ending_at_border_node = indices.network.paths_ending_at[border_node]
+        edges_ending_at_border_node = indices.network.edges_ending_at[border_node]
 
-        paths_starting_at_border_node = [path_key for path_key, path_value in intra_domain_paths.items() if
-                                         path_value["src"] == border_node]
-        edges_starting_at_border_node = [edge_key for edge_key, edge_value in inter_domain_edges.items() if
-                                         edge_value["src"] == border_node]
+        paths_starting_at_border_node = indices.network.paths_starting_at[border_node]
+        edges_starting_at_border_node = indices.network.edges_starting_at[border_node]
+
+        outgoing_traffic = quicksum(intra[p_prime_prime] for p_prime_prime in paths_starting_at_border_node if
+                                    p_prime_prime in intra and p_prime != p_prime_prime) + \
+            quicksum(inter[edge] for edge in edges_starting_at_border_node if edge in inter)
+        incoming_traffic = quicksum(intra[p_prime_prime] for p_prime_prime in paths_ending_at_border_node if
+                                    p_prime_prime in intra and p_prime != p_prime_prime) + \
+            quicksum(inter[edge] for edge in edges_ending_at_border_node if edge in inter)
 
         # this traffic was routed by the placement decision
         if p != p_prime and p not in paths_ending_at_border_node:
-            model.addConstr(
-                quicksum(
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                    paths_starting_at_border_node if p_prime != p_prime_prime) + quicksum(
-                    decision_variables.lambda_inter[arc, p, p_prime, edge] for edge in
-                    edges_starting_at_border_node) +
-                decision_variables.lambda_total[arc, p, p_prime] == quicksum(
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                    paths_ending_at_border_node if p_prime != p_prime_prime) + quicksum(
-                    decision_variables.lambda_inter[arc, p, p_prime, edge] for edge in
-                    edges_ending_at_border_node)
-            )
+            model.addConstr(outgoing_traffic + decision_variables.lambda_total[arc, p, p_prime] == incoming_traffic)
         if p in paths_ending_at_border_node:
-            model.addConstr(
-                quicksum(
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                    paths_starting_at_border_node if p_prime != p_prime_prime) + quicksum(
-                    decision_variables.lambda_inter[arc, p, p_prime, edge] for edge in
-                    edges_starting_at_border_node) == quicksum(
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                    paths_ending_at_border_node if p_prime != p_prime_prime) + quicksum(
-                    decision_variables.lambda_inter[arc, p, p_prime, edge] for edge in
-                    edges_ending_at_border_node))
+            model.addConstr(outgoing_traffic == incoming_traffic)
 
 
 # 23. flow conservation at starting paths
 def __lambda_total_outgoing_rates_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime in itertools.product(indices.arcs, indices.paths, indices.paths):
-        inter_domain_edges = parameters.network_description[key_inter_domain_edges]
-        intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+    intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+    for arc, p, p_prime in indices.sparse.lambda_total:
+        intra, inter = __routing_variables(indices, decision_variables, (arc, p, p_prime))
         # starting VNF was placed in p hence the destination has to get rid of the traffic
         border_node = intra_domain_paths[p]["dst"]
-        paths_starting_at_border_node = [path_key for path_key, path_value in intra_domain_paths.items() if
-                                         path_value["src"] == border_node]
-        edges_starting_at_border_node = [edge_key for edge_key, edge_value in inter_domain_edges.items() if
-                                         edge_value["src"] == border_node]
+        paths_starting_at_border_node = indices.network.paths_starting_at[border_node]
+        edges_starting_at_border_node = indices.network.edges_starting_at[border_node]
+
+        paths_ending_at_border_node = indices.network.paths_ending_at[border_node]
 
-        paths_ending_at_border_node = [path_key for path_key, path_value in intra_domain_paths.items() if
-                                       path_value["dst"] == border_node]
+        edges_ending_at_border_node = indices.network.edges_ending_at[border_node]
+
+        outgoing_traffic = quicksum(intra[p_prime_prime] for p_prime_prime in paths_starting_at_border_node if
+                                    p_prime_prime in intra and p_prime != p_prime_prime) + \
+            quicksum(inter[edge] for edge in edges_starting_at_border_node if edge in inter)
+        incoming_traffic = quicksum(intra[p_prime_prime] for p_prime_prime in paths_ending_at_border_node if
+                                    p_prime_prime in intra and p_prime != p_prime_prime) + \
+            quicksum(inter[edge] for edge in edges_ending_at_border_node if edge in inter)
 
-        edges_ending_at_border_node = [edge_key for edge_key, edge_value in inter_domain_edges.items() if
-                                       edge_value["dst"] == border_node]
         if p != p_prime and p_prime not in paths_starting_at_border_node:
             # get rid of all traffic
-            model.addConstr(
-                quicksum(
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                    paths_ending_at_border_node if p_prime != p_prime_prime) + quicksum(
-                    decision_variables.lambda_inter[arc, p, p_prime, edge] for edge in
-                    edges_ending_at_border_node) + \
-                decision_variables.lambda_total[arc, p, p_prime] == quicksum(
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                    paths_starting_at_border_node if p_prime != p_prime_prime) + quicksum(
-                    decision_variables.lambda_inter[arc, p, p_prime, edge] for edge in
-                    edges_starting_at_border_node))
+            model.addConstr(incoming_traffic + decision_variables.lambda_total[arc, p, p_prime] == outgoing_traffic)
         if p_prime in paths_starting_at_border_node:
-            model.addConstr(quicksum(
-                decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                paths_starting_at_border_node if p_prime != p_prime_prime) + quicksum(
-                decision_variables.lambda_inter[arc, p, p_prime, edge] for edge in
-                edges_starting_at_border_node) == quicksum(
-                decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] for p_prime_prime in
-                paths_ending_at_border_node if p_prime != p_prime_prime) + quicksum(
-                decision_variables.lambda_inter[arc, p, p_prime, edge] for edge in
-                edges_ending_at_border_node))
+            model.addConstr(outgoing_traffic == incoming_traffic)
 
 
 # 24. no SRC or DST placement
 def __no_src_dst_placement_constraint(parameters, indices, decision_variables, model):
     for path in indices.paths:
+        # on all other paths SRC and DST are not part of the model
         if "ingress" in path or "egress" in path:
             model.addConstr(decision_variables.gamma["SRC", path] + decision_variables.gamma["DST", path] == 1)
-        else:
-            model.addConstr(decision_variables.gamma["SRC", path] + decision_variables.gamma["DST", path] == 0)
-
-
-# 25. restrict the network from routing over intermediate paths
-def __no_flow_over_intermediate_paths_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                            indices.paths):
-        if "ingress" in p_prime_prime or "egress" in p_prime_prime:
-            model.addConstr(decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime] == 0)
 
 
 # 26. total flow has to match the initial flow
@@ -628,30 +650,20 @@ def __total_flow_matches_expected_flow_constraint(parameters, indices, decision_
         ingress = request["ingress"]
         egress = request["egress"]
         initial_rate = request["initial_rate"]
-        outgoing_rate = initial_rate
-
-        for tup in parameters.chains[request["vnf_chain"]]:
-            if tup[1] == get_vnf_from_arc(arc[1]):
-                break
-            outgoing_rate = evaluate_outgoing_rate(parameters=parameters, vnf=tup[1], ingoing_rate=outgoing_rate)
+        outgoing_rate = get_rate_of_arc(parameters, arc)
 
+        # SRC arcs that do not start at the ingress are not part of the model
         if "SRC" in arc[0]:
-            model.addConstr(quicksum(
-                decision_variables.lambda_total[arc, "ingress_" + ingress, p_prime] for p_prime in
-                indices.paths) == initial_rate)
-            model.addConstr(quicksum(
-                decision_variables.lambda_total[arc, p, p_prime] for p in indices.paths for p_prime in
-                indices.paths if p != "ingress_" + ingress) == 0)
+            model.addConstr(quicksum(decision_variables.lambda_total[key] for key in
+                                     indices.sparse.total_by_start[arc, "ingress_" + ingress]) == initial_rate)
         elif "DST" in arc[1]:
-            model.addConstr(quicksum(
-                decision_variables.lambda_total[arc, p_prime, "egress_" + egress] for p_prime in
-                indices.paths) == outgoing_rate)
+            model.addConstr(quicksum(decision_variables.lambda_total[key] for key in
+                                     indices.sparse.total_by_end[arc, "egress_" + egress]) == outgoing_rate)
         else:
             # pass
             # this constraint can be left out but enabling it speeds up the optimization
-            model.addConstr(quicksum(
-                decision_variables.lambda_total[arc, p, p_prime] for p in indices.paths for p_prime in
-                indices.paths) == outgoing_rate)
+            model.addConstr(quicksum(decision_variables.lambda_total[key] for key in
+                                     indices.sparse.total_by_arc[arc]) == outgoing_rate)
 
 
 # 27. paths that are not a part of a shared cpu constraint cannot use its cpu
@@ -686,47 +698,48 @@ def __backward_edge_constraint(parameters, indices, decision_variables, model):
             shared_rate = routing_restriction_edge["shared_bottleneck"]
             edges = routing_restriction_edge["edges"]
             model.addConstr(quicksum(
-                decision_variables.lambda_inter[arc, p, p_prime, e] for arc in indices.arcs for p in indices.paths for
-                p_prime in indices.paths for e in edges) <= shared_rate,
+                decision_variables.lambda_inter[key] for e in edges for key in indices.sparse.inter_by_edge[e]) <=
+                            shared_rate,
                             name="shared_edge_bottleneck_" + routing_restriciton_edge_key)
 
 
 # 31
 def __lambda_distribution_constraint(parameters, indices, decision_variables, model):
+    functions = get_vnf_functions(parameters)
+    # (vnf, request) -> the first arc of the request ending respectively starting with the vnf
+    arcs_ending_with = {}
+    arcs_starting_with = {}
+    for arc in indices.arcs:
+        arcs_ending_with.setdefault((get_vnf_from_arc(arc[1]), get_request_from_arc(arc[1])), arc)
+        arcs_starting_with.setdefault((get_vnf_from_arc(arc[0]), get_request_from_arc(arc[0])), arc)
     for vnf, path in itertools.product(indices.vnfs, indices.paths):
         if "SRC" in vnf or "DST" in vnf or "ingress" in path or "egress" in path:
             continue
         for request in parameters.vnf_requests.keys():
-            arc_ending_with_vnf = next((arc for arc in indices.arcs if
-                                        vnf == get_vnf_from_arc(arc[1]) and request == get_request_from_arc(arc[1])),
-                                       None)
-            arc_starting_with_vnf = next((arc for arc in indices.arcs if
-                                          vnf == get_vnf_from_arc(arc[0]) and request == get_request_from_arc(arc[0])),
-                                         None)
+            arc_ending_with_vnf = arcs_ending_with.get((vnf, request))
+            arc_starting_with_vnf = arcs_starting_with.get((vnf, request))
             if arc_ending_with_vnf is not None and arc_starting_with_vnf is not None:
                 # all the outgoing traffic of a VNF has to be distributed among requests
-                model.addConstr(evaluate_outgoing_rate(parameters=parameters, vnf=vnf, ingoing_rate=
-                quicksum(decision_variables.lambda_total[arc_ending_with_vnf, p_prime, path] for p_prime in
-                         indices.paths)) == quicksum(
-                    decision_variables.lambda_total[arc_starting_with_vnf, path, p_prime] for p_prime in
-                    indices.paths),
+                model.addConstr(__function_value(model, functions.outgoing_rate[vnf], quicksum(
+                    decision_variables.lambda_total[key] for key in
+                    indices.sparse.total_by_end[arc_ending_with_vnf, path]),
+                    "lambda_distribution_" + vnf + "_" + path + "_" + request) == quicksum(
+                    decision_variables.lambda_total[key] for key in
+                    indices.sparse.total_by_start[arc_starting_with_vnf, path]),
                                 name="lambda_distribution_" + vnf + "_" + path)
 
 
 def __delay_definition(parameters, indices, decision_variables, model):
-    inter_domain_edges = parameters.network_description[key_inter_domain_edges]
-    intra_domain_paths = parameters.network_description[key_intra_domain_paths]
-    for arc, p, p_prime, border_node in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                          indices.border_nodes):
-        paths_ending_at_border_node = [path_key for path_key, path_value in intra_domain_paths.items() if
-                                       path_value["dst"] == border_node]
-        edges_ending_at_border_node = [edge_key for edge_key, edge_value in inter_domain_edges.items() if
-                                       edge_value["dst"] == border_node]
+    for arc, p, p_prime, border_node in indices.sparse.zeta:
+        paths_ending_at_border_node = indices.network.paths_ending_at[border_node]
+        edges_ending_at_border_node = indices.network.edges_ending_at[border_node]
         # check if b is the destination of p (i.e. a new placement situation)
         if parameters.network_description[key_intra_domain_paths][p]["dst"] != border_node:
             all_paths_or_edges = []
 
             for p_prime_prime in paths_ending_at_border_node:
+                if (arc, p, p_prime, p_prime_prime) not in decision_variables.delta_intra:
+                    continue
                 delay_of_path = parameters.network_description[key_intra_domain_paths][p_prime_prime]["delay"]
                 source_of_path = parameters.network_description[key_intra_domain_paths][p_prime_prime]["src"]
                 intra_path = model.addVar(lb=0, name="{3}_max_of_{0}_node_{1}_via_path_{2}".format(border_node,
@@ -741,6 +754,8 @@ def __delay_definition(parameters, indices, decision_variables, model):
                 all_paths_or_edges.append(intra_path)
 
             for e in edges_ending_at_border_node:
+                if (arc, p, p_prime, e) not in decision_variables.delta_inter:
+                    continue
                 inter_edge = model.addVar(lb=0)
                 delay_of_edge = parameters.network_description[key_inter_domain_edges][e]["delay"]
                 source_of_edge = parameters.network_description[key_inter_domain_edges][e]["src"]
@@ -767,7 +782,7 @@ def __delay_definition(parameters, indices, decision_variables, model):
 
                 for p_prime_prime in indices.paths:
 
-                    if p == p_prime_prime:
+                    if p == p_prime_prime or (preceding_arc, p_prime_prime, p, b_prime) not in decision_variables.zeta:
                         continue
 
                     placement = model.addVar(lb=0)
@@ -778,7 +793,8 @@ def __delay_definition(parameters, indices, decision_variables, model):
                     other_placements.append(placement)
 
                 max_over_other_paths = model.addVar(lb=0)
-                model.addConstr(max_over_other_paths == max_(other_placements))
+                if len(other_placements) > 0:
+                    model.addConstr(max_over_other_paths == max_(other_placements))
                 model.addGenConstrIndicator(decision_variables.gamma[get_vnf_from_arc(arc[0]), p], False,
                                             decision_variables.zeta[arc, p, p_prime, border_node] == 0)
                 model.addGenConstrIndicator(decision_variables.gamma[get_vnf_from_arc(arc[0]), p], True,
@@ -791,98 +807,205 @@ def __delay_definition(parameters, indices, decision_variables, model):
 
 
 def __route_between_exisitng_instances_constraint(parameters, indices, decision_variables, model):
-    for arc, p, p_prime in itertools.product(indices.arcs, indices.paths, indices.paths):
-        model.addConstr(decision_variables.lambda_total[arc, p, p_prime] <= bigM * decision_variables.gamma[
-            get_vnf_from_arc(arc[0]), p])
-        model.addConstr(decision_variables.lambda_total[arc, p, p_prime] <= bigM * decision_variables.gamma[
-            get_vnf_from_arc(arc[1]), p_prime])
-
-
-def __define_restrictions(parameters, indices, decision_variables, model, with_delay_constraints):
-    # 1.
-    __outrate_constraint(parameters, indices, decision_variables, model)
-    # 2.
-    __cpu_consumption_constraint(parameters, indices, decision_variables, model)
-    # 3.
-    __inter_domain_edge_capacity_constraint(parameters, indices, decision_variables, model)
-    # 4.
-    __bigM_inter_domain_edge_constraint(parameters, indices, decision_variables, model)
-    # 5.
-    __bigM_intra_domain_path_constraint(parameters, indices, decision_variables, model)
-    # 6.
-    __bigM_placement_constraint(parameters, indices, decision_variables, model)
-    # 7.
-    __outrate_distribution_constraint(parameters, indices, decision_variables, model)
-    # 8.
-    __inrate_distribution_constraint(parameters, indices, decision_variables, model)
-    # 9.
-    __cpu_capacity_constraint(parameters, indices, decision_variables, model)
-    # 10.
-    __advertised_cpu_capacity_constraint(parameters, indices, decision_variables, model)
-    # 11.
+    for key in indices.sparse.lambda_total:
+        arc, p, p_prime = key
+        __on_off_constraint(indices, model, decision_variables.lambda_total[key],
+                            decision_variables.gamma[get_vnf_from_arc(arc[0]), p], indices.bounds.lambda_total[key])
+        __on_off_constraint(indices, model, decision_variables.lambda_total[key],
+                            decision_variables.gamma[get_vnf_from_arc(arc[1]), p_prime],
+                            indices.bounds.lambda_total[key])
+
+
+# the families of the rows of a single placement (arc, p, p') of an arc, of the rows of a single request and of the
+# rows combining several requests, used to add and remove requests of an existing model (see hvc.mip.incremental), the
+# delay constraints are left out
+placement_restrictions = [
+    __bigM_inter_domain_edge_constraint,
+    __bigM_intra_domain_path_constraint,
+    __flow_conservation_border_nodes_constraint,
+    __route_from_existing_vnfs_intra_constraint,
+    __route_to_existing_vnfs_intra_constraint,
+    __route_from_existing_vnfs_inter_constraint,
+    __route_to_existing_vnfs_inter_constraint,
+    __lambda_total_matches_incoming_rates_constraint,
+    __lambda_total_outgoing_rates_constraint,
+    __route_between_exisitng_instances_constraint
+]
+request_restrictions = [
+    __ingress_placement_constraint,
+    __ingress_initial_rate_constraint,
+    __egress_placement_constraint,
+    __egress_final_rate_constraint,
+    __total_flow_matches_expected_flow_constraint
+]
+shared_restrictions = [
+    __outrate_constraint,
+    __cpu_consumption_constraint,
+    __inter_domain_edge_capacity_constraint,
+    __bigM_placement_constraint,
+    __outrate_distribution_constraint,
+    __inrate_distribution_constraint,
+    __cpu_capacity_constraint,
+    __advertised_cpu_capacity_constraint,
+    __no_src_dst_placement_constraint,
+    __shared_cpu_for_unrelated_paths_constraint,
+    __path_capacity_constraint,
+    __advertised_path_capacity_constraint,
+    __backward_edge_constraint,
+    __lambda_distribution_constraint
+]
+
+
+def define_placement_restrictions(parameters, indices, decision_variables, model, placements):
+    """
+    Adds the rows of the placement restrictions for the given placements.
+    :param placements: a set of (arc, p, p') placements of the sparse indices
+    """
+    placement_indices = copy.copy(indices)
+    placement_indices.sparse = restrict_sparse_indices(indices.sparse, placements)
+    for restriction in placement_restrictions:
+        restriction(parameters, placement_indices, decision_variables, model)
+
+
+def define_request_restrictions(parameters, indices, decision_variables, model, request_key):
+    """
+    Adds the rows of the request restrictions for a single request. Together with the rows of the placements of its
+    arcs and the rates of the request on the paths (see define_request_rate) these are all rows of the request.
+    """
+    # compile the VNF functions once, the restricted copy shares them
+    get_vnf_functions(parameters)
+    request_parameters = copy.copy(parameters)
+    request_parameters.vnf_requests = {request_key: parameters.vnf_requests[request_key]}
+    request_indices = copy.copy(indices)
+    request_indices.arcs = [arc for arc in indices.arcs if get_request_from_arc(arc[0]) == request_key]
+    for restriction in request_restrictions:
+        restriction(request_parameters, request_indices, decision_variables, model)
+
+
+def define_shared_restrictions(parameters, indices, decision_variables, model, request_rates):
+    """
+    Adds the rows combining the variables of several requests.
+    :param request_rates: a dict mapping each request to a dict mapping each path to the rate of the request on it, as
+     defined by define_request_rate
+    """
+    for restriction in shared_restrictions:
+        restriction(parameters, indices, decision_variables, model)
+    for p in indices.paths:
+        __path_rate_definition(indices, decision_variables, model, p, [rates[p] for rates in request_rates.values()])
+
+
+def __define_restrictions(parameters, indices, decision_variables, model, with_delay_constraints, profiler=None):
+    restrictions = [
+        # 1.
+        __outrate_constraint,
+        # 2.
+        __cpu_consumption_constraint,
+        # 3.
+        __inter_domain_edge_capacity_constraint,
+        # 4.
+        __bigM_inter_domain_edge_constraint,
+        # 5.
+        __bigM_intra_domain_path_constraint,
+        # 6.
+        __bigM_placement_constraint,
+        # 7.
+        __outrate_distribution_constraint,
+        # 8.
+        __inrate_distribution_constraint,
+        # 9.
+        __cpu_capacity_constraint,
+        # 10.
+        __advertised_cpu_capacity_constraint
+    ]
     if with_delay_constraints:
-        __max_delay_request_constraint(parameters, indices, decision_variables, model)
-    # 12.
-    __ingress_placement_constraint(parameters, indices, decision_variables, model)
-    # 13.
-    __ingress_initial_rate_constraint(parameters, indices, decision_variables, model)
-    # 14.
-    __egress_placement_constraint(parameters, indices, decision_variables, model)
-    # 15.
-    __egress_final_rate_constraint(parameters, indices, decision_variables, model)
-    # 16.
-    __flow_conservation_border_nodes_constraint(parameters, indices, decision_variables, model)
-    # 17.
-    __max_rate_def_constraint(parameters, indices, decision_variables, model)
-    # 18.
-    __route_from_existing_vnfs_intra_constraint(parameters, indices, decision_variables, model)
-    # 19.
-    __route_to_existing_vnfs_intra_constraint(parameters, indices, decision_variables, model)
-    # 20.
-    __route_from_existing_vnfs_inter_constraint(parameters, indices, decision_variables, model)
-    # 21.
-    __route_to_existing_vnfs_inter_constraint(parameters, indices, decision_variables, model)
-    # 22.
-    __lambda_total_matches_incoming_rates_constraint(parameters, indices, decision_variables, model)
-    # 23.
-    __lambda_total_outgoing_rates_constraint(parameters, indices, decision_variables, model)
-    # 24.
-    __no_src_dst_placement_constraint(parameters, indices, decision_variables, model)
-    # 25.
-    __no_flow_over_intermediate_paths_constraint(parameters, indices, decision_variables, model)
-    # 26.
-    __total_flow_matches_expected_flow_constraint(parameters, indices, decision_variables, model)
-    # 27.
-    __shared_cpu_for_unrelated_paths_constraint(parameters, indices, decision_variables, model)
-    # 28.
-    __path_capacity_constraint(parameters, indices, decision_variables, model)
-    # 29.
-    __advertised_path_capacity_constraint(parameters, indices, decision_variables, model)
-    # 30.
-    __backward_edge_constraint(parameters, indices, decision_variables, model)
-    # 31.
-    __lambda_distribution_constraint(parameters, indices, decision_variables, model)
-    # 32.
+        # 11.
+        restrictions.append(__max_delay_request_constraint)
+    restrictions += [
+        # 12.
+        __ingress_placement_constraint,
+        # 13.
+        __ingress_initial_rate_constraint,
+        # 14.
+        __egress_placement_constraint,
+        # 15.
+        __egress_final_rate_constraint,
+        # 16.
+        __flow_conservation_border_nodes_constraint,
+        # 17.
+        __max_rate_def_constraint,
+        # 18.
+        __route_from_existing_vnfs_intra_constraint,
+        # 19.
+        __route_to_existing_vnfs_intra_constraint,
+        # 20.
+        __route_from_existing_vnfs_inter_constraint,
+        # 21.
+        __route_to_existing_vnfs_inter_constraint,
+        # 22.
+        __lambda_total_matches_incoming_rates_constraint,
+        # 23.
+        __lambda_total_outgoing_rates_constraint,
+        # 24.
+        __no_src_dst_placement_constraint,
+        # 25. no flow over the intermediate ingress/egress paths, they have no lambda_intra variables
+        # 26.
+        __total_flow_matches_expected_flow_constraint,
+        # 27.
+        __shared_cpu_for_unrelated_paths_constraint,
+        # 28.
+        __path_capacity_constraint,
+        # 29.
+        __advertised_path_capacity_constraint,
+        # 30.
+        __backward_edge_constraint,
+        # 31.
+        __lambda_distribution_constraint
+    ]
     if with_delay_constraints:
-        __delay_definition(parameters, indices, decision_variables, model)
-    __route_between_exisitng_instances_constraint(parameters, indices, decision_variables, model)
+        # 32.
+        restrictions.append(__delay_definition)
+    restrictions.append(__route_between_exisitng_instances_constraint)
+
+    for restriction in restrictions:
+        with __measure(profiler, model, restriction.__name__.strip("_")):
+            restriction(parameters, indices, decision_variables, model)
 
 
-def get_model(network_description_file, vnf_description_file, chain_description_file,
-              vnf_request_description_file, advertised_restriction_file, generate_backward_paths=True,
-              with_delay_constraints=False):
+def __measure(profiler, model, family):
     """
-    Defines the gurobipy model from the given parameter files, however it does not solve model.
-    :param network_description_file: a yaml file specifying the network structure
-    :param vnf_description_file:  a yaml file describing the vnfs
-    :param chain_description_file: a yaml file describing all used vnf chains
-    :param vnf_request_description_file: a yaml file describing all vnf requests
-    :param advertised_restriction_file:  a yaml file describing all advertised restrictions from the child coordinators
-    :return: the parsed parameters, the used indices, the defined decision variables and the filled gurobipy model
+    :return: a context measuring the given family if a profiler is given, otherwise a context doing nothing
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.measure(model, family)
+
+
+def define_parameters_and_indices(network_description_file=None, vnf_description_file=None,
+                                  chain_description_file=None, vnf_request_description_file=None,
+                                  advertised_restriction_file=None, generate_backward_paths=True, use_indicators=False,
+                                  parameters=None):
     """
-    parameters = __load_descriptions(network_description_file, vnf_description_file, chain_description_file,
-                                     vnf_request_description_file, advertised_restriction_file)
+    Parses the parameter files and computes the indices of the model, including the temporary ingress/egress paths.
+    Shared by the model definition and the placement heuristic.
+    :param parameters: the Parameters to use instead of the parameter files, they are copied as the network
+     description is completed by the indices
+    :return: the parsed parameters and the indices
+    """
+    if parameters is None:
+        parameters = load_descriptions(network_description_file, vnf_description_file, chain_description_file,
+                                       vnf_request_description_file, advertised_restriction_file)
+    else:
+        parameters = copy.deepcopy(parameters)
+    return parameters, define_indices(parameters, generate_backward_paths=generate_backward_paths,
+                                      use_indicators=use_indicators)
 
+
+def define_indices(parameters, generate_backward_paths=True, use_indicators=False):
+    """
+    Computes the indices of the model for the parsed parameters. The backward edges and paths and the temporary
+    ingress/egress paths are added to the network description of the parameters.
+    :return: the indices
+    """
     indices = __define_indices(parameters)
 
     if generate_backward_paths:
@@ -890,52 +1013,166 @@ def get_model(network_description_file, vnf_description_file, chain_description_
 
     # add the temporary nodes for the ingresses/egresses where the SRC and DST VNFs will be placed on
     __add_temporary_nodes_and_paths(parameters, indices)
+    # border node adjacency shared by the index computation and the constraint builders
+    indices.network = NetworkIndex(parameters)
+    # only generate the routing variables that can structurally carry traffic
+    indices.sparse = define_sparse_indices(parameters, indices)
+    # upper bounds of the variables, also used as the big-M values
+    indices.bounds = define_variable_bounds(parameters, indices, use_indicators=use_indicators)
+    return indices
+
+
+def get_model(network_description_file=None, vnf_description_file=None, chain_description_file=None,
+              vnf_request_description_file=None, advertised_restriction_file=None, generate_backward_paths=True,
+              with_delay_constraints=False, builder="quicksum", profiler=None, use_indicators=False,
+              model_cache=None, lazy_delay_constraints=False, parameters=None):
+    """
+    Defines the gurobipy model from the given parameter files, however it does not solve model.
+    :param network_description_file: a yaml file specifying the network structure
+    :param vnf_description_file:  a yaml file describing the vnfs
+    :param chain_description_file: a yaml file describing all used vnf chains
+    :param vnf_request_description_file: a yaml file describing all vnf requests
+    :param advertised_restriction_file:  a yaml file describing all advertised restrictions from the child coordinators
+    :param builder: "quicksum" to add the constraints one by one, "matrix" to assemble them as sparse matrices and add
+     them via the matrix API, both result in the same model
+    :param profiler: an optional BuildProfiler recording the build time and size of each constraint family
+    :param use_indicators: True, if variables that can only be non-zero for a used path, edge or placement shall be
+     switched off by indicator constraints instead of big-M constraints
+    :param model_cache: an optional ModelCache, the model is loaded from it if the same input files were built with
+     the same options before and stored in it otherwise, not used while profiling the build
+    :param lazy_delay_constraints: True, if the delay block is left out and the placement switches needed by the lazy
+     delay cuts (see delay_cuts.LazyDelayCuts) are added instead, not used together with with_delay_constraints
+    :param parameters: Parameters used instead of the parameter files, e.g. the descriptions a parent coordinator
+     generated in memory, they are not changed
+    :return: the parsed parameters, the used indices, the defined decision variables and the filled gurobipy model
+    """
+    if builder not in ["quicksum", "matrix"]:
+        raise ValueError("Unknown model builder {}".format(builder))
+    if with_delay_constraints and lazy_delay_constraints:
+        raise ValueError("The delay constraints are either defined in the model or added lazily")
+    cache_key = None
+    # the cache only restores the decision variable families, the placement switches are not part of them
+    if model_cache is not None and profiler is None and not lazy_delay_constraints:
+        inputs = [network_description_file, vnf_description_file, chain_description_file,
+                  vnf_request_description_file, advertised_restriction_file] if parameters is None else \
+            parameters.descriptions()
+        cache_key = model_cache.key(inputs,
+                                    dict(generate_backward_paths=generate_backward_paths,
+                                         with_delay_constraints=with_delay_constraints, builder=builder,
+                                         use_indicators=use_indicators))
+        cached_model = model_cache.load(cache_key)
+        if cached_model is not None:
+            return cached_model
+
+    parameters, indices = define_parameters_and_indices(network_description_file, vnf_description_file,
+                                                        chain_description_file, vnf_request_description_file,
+                                                        advertised_restriction_file,
+                                                        generate_backward_paths=generate_backward_paths,
+                                                        use_indicators=use_indicators, parameters=parameters)
 
     model = Model("gurobipy_mip")
-    decision_variables = __define_decision_variables(parameters=parameters, indices=indices, model=model)
-    __define_restrictions(parameters, indices, decision_variables, model, with_delay_constraints)
+    if builder == "matrix":
+        # variables, linear constraints and objectives are added at once and can only be measured together
+        with __measure(profiler, model, "matrix_model"):
+            decision_variables = matrix_mip.define_model(parameters, indices, model)
+        # the delay constraints consist of general constraints only, these are added through the standard API
+        if with_delay_constraints:
+            for restriction in [__max_delay_request_constraint, __delay_definition]:
+                with __measure(profiler, model, restriction.__name__.strip("_")):
+                    restriction(parameters, indices, decision_variables, model)
+    else:
+        with __measure(profiler, model, "decision_variables"):
+            decision_variables = __define_decision_variables(parameters=parameters, indices=indices, model=model)
+        __define_restrictions(parameters, indices, decision_variables, model, with_delay_constraints, profiler)
+        with __measure(profiler, model, "objectives"):
+            define_objectives(parameters, indices, decision_variables, model)
+
+    if lazy_delay_constraints:
+        with __measure(profiler, model, "placement_switches"):
+            decision_variables.placement_switches = define_placement_switches(parameters, indices, decision_variables,
+                                                                              model)
+
+    if profiler is not None:
+        profiler.record_variables(decision_variables)
+    if cache_key is not None:
+        model_cache.store(cache_key, parameters, indices, decision_variables, model)
+    return parameters, indices, decision_variables, model
 
+
+def define_objectives(parameters, indices, decision_variables, model):
     model.setObjectiveN(
-        quicksum(decision_variables.gamma[vnf, path] for vnf, path in
-                 itertools.product(indices.vnfs, indices.paths)) + quicksum(
+        quicksum(decision_variables.gamma.values()) + quicksum(
             decision_variables.delta_inter[arc, p, p_prime, e] * get_delay_of_link(parameters, e) for arc, p, p_prime, e
-            in
-            itertools.product(indices.arcs, indices.paths, indices.paths,
-                              indices.edges)) + quicksum(
+            in indices.sparse.lambda_inter) + quicksum(
             decision_variables.delta_intra[arc, p, p_prime, p_prime_prime] * get_delay_of_path(parameters,
                                                                                                p_prime_prime)
-            for arc, p, p_prime, p_prime_prime in
-            itertools.product(indices.arcs, indices.paths, indices.paths,
-                              indices.paths)),
+            for arc, p, p_prime, p_prime_prime in indices.sparse.lambda_intra),
         index=0, priority=3, weight=1.0)
 
     model.setObjectiveN(quicksum(
         decision_variables.delta_inter[arc, p, p_prime, e] * get_delay_of_link(parameters, e) for arc, p, p_prime, e in
-        itertools.product(indices.arcs, indices.paths, indices.paths,
-                          indices.edges)) + quicksum(
+        indices.sparse.lambda_inter) + quicksum(
         decision_variables.delta_intra[arc, p, p_prime, p_prime_prime] * get_delay_of_path(parameters, p_prime_prime)
-        for arc, p, p_prime, p_prime_prime in
-        itertools.product(indices.arcs, indices.paths, indices.paths,
-                          indices.paths)), index=1,
+        for arc, p, p_prime, p_prime_prime in indices.sparse.lambda_intra), index=1,
                         priority=2, weight=1.0)
 
-    model.setObjectiveN(quicksum(
-        decision_variables.delta_inter[arc, p, p_prime, e] for arc, p, p_prime, e in
-        itertools.product(indices.arcs, indices.paths, indices.paths,
-                          indices.edges)) + quicksum(
-        decision_variables.delta_intra[arc, p, p_prime, p_prime_prime]
-        for arc, p, p_prime, p_prime_prime in
-        itertools.product(indices.arcs, indices.paths, indices.paths,
-                          indices.paths)), index=2,
+    model.setObjectiveN(quicksum(decision_variables.delta_inter.values()) + quicksum(
+        decision_variables.delta_intra.values()), index=2,
                         priority=1, weight=1.0)
 
-    return parameters, indices, decision_variables, model
-
 
-def solve_model(network_description_file, vnf_description_file, chain_description_file,
-                vnf_request_description_file, advertised_restriction_file, pretty_print=False, output_file=None,
+def apply_solve_policy(model, policy, seed, num_threads):
+    """
+    Sets up the objectives and the parameters of each optimization pass according to the solve policy.
+    """
+    model.update()
+    if policy.mode == "primary":
+        model.NumObj = 1
+    for objective in range(model.NumObj):
+        model.params.ObjNumber = objective
+        if policy.mode == "blended":
+            # objectives of the same priority are blended into a single one
+            model.ObjNPriority = 0
+            model.ObjNWeight = policy.weights[objective]
+        if policy.relative_tolerances[objective] is not None:
+            model.ObjNRelTol = policy.relative_tolerances[objective]
+
+    passes = model.NumObj if policy.mode == "hierarchical" else 1
+    for index in range(passes):
+        env = model.getMultiobjEnv(index)
+        env.setParam(GRB.Param.Seed, int(seed))
+        env.setParam(GRB.Param.Threads, num_threads)
+        if policy.time_limits[index] is not None:
+            env.setParam(GRB.Param.TimeLimit, policy.time_limits[index])
+        if policy.mip_gaps[index] is not None:
+            env.setParam(GRB.Param.MIPGap, policy.mip_gaps[index])
+
+
+def __set_start_values(model, solution):
+    """
+    Uses the given solution as MIP start. Variables that do not exist in the model anymore are ignored, variables that
+    are not part of the solution are left to Gurobi, which completes the partial start.
+    :param solution: a dict mapping normalized variable names to their values, see utils.read_solution
+    :return: the number of variables a start value was set for
+    """
+    model.update()
+    started = 0
+    for variable in model.getVars():
+        name = normalize_variable_name(variable.VarName)
+        if name in solution:
+            variable.Start = solution[name]
+            started += 1
+    logger.info("Warm started {0} of {1} variables".format(started, model.NumVars))
+    return started
+
+
+def solve_model(network_description_file=None, vnf_description_file=None, chain_description_file=None,
+                vnf_request_description_file=None, advertised_restriction_file=None, pretty_print=False,
+                output_file=None,
                 generate_backward_paths=True, with_delay_constraints=False, max_timeout_delay=-1,
-                graph_output_path=None, seed=0, use_exact_placements=-1, num_threads=6):
+                graph_output_path=None, seed=0, use_exact_placements=-1, num_threads=6, builder="quicksum",
+                profile_build=False, use_indicators=False, warm_start=None, solve_policy=None, model_cache=None,
+                lazy_delay_constraints=False, yaml_output=True, parameters=None):
     """
     Defines the gurobipy model from the given parameter files, solves it, and prints the solution (if specified).
     :param network_description_file: a yaml file specifying the network structure
@@ -949,37 +1186,164 @@ def solve_model(network_description_file, vnf_description_file, chain_descriptio
     :param with_delay_constraints: True, if the delay of a request should be bounded (impacts runtime)
     :param max_timeout_delay: the maximal timeout the optimizing system should take to minimize the delay,
      -1 if unbounded
+    :param builder: "quicksum" or "matrix", the way the constraints are added to the model
+    :param profile_build: True, if the build time and size of each constraint family should be recorded, the figures
+     are saved to build_profile.yaml next to the solution and returned as an additional fifth value
+    :param use_indicators: True, if indicator constraints shall be used instead of big-M constraints
+    :param warm_start: a previous solution used as MIP start, either a full_solution.log file, the folder it was saved
+     to or a dict mapping variable names to values (e.g. an overlay solution)
+    :param solve_policy: a SolvePolicy with the time and gap budgets of the objectives, by default all objectives are
+     optimized hierarchically without limits
+    :param model_cache: an optional ModelCache the built model is reused from
+    :param lazy_delay_constraints: True, if the max_delay of the requests is enforced by lazy cuts added in a callback
+     instead of the delay constraints of the model (scales to larger models, with_delay_constraints has to be False)
+    :param yaml_output: True, if the solution is saved to solution.log and full_solution.log next to the columnar
+     solution store (see utils.save_solution)
+    :param parameters: Parameters used instead of the parameter files, see get_model
     :return: the parsed parameters, the used indices, the defined decision variables and the filled gurobipy model
+    (and the build profile if profile_build is set)
     """
+    profiler = BuildProfiler() if profile_build else None
     parameters, indices, decision_variables, model = get_model(network_description_file, vnf_description_file,
                                                                chain_description_file,
                                                                vnf_request_description_file,
                                                                advertised_restriction_file,
                                                                generate_backward_paths=generate_backward_paths,
-                                                               with_delay_constraints=with_delay_constraints)
+                                                               with_delay_constraints=with_delay_constraints,
+                                                               builder=builder, profiler=profiler,
+                                                               use_indicators=use_indicators,
+                                                               model_cache=model_cache,
+                                                               lazy_delay_constraints=lazy_delay_constraints,
+                                                               parameters=parameters)
 
     if graph_output_path is not None:
         plot_network(parameters, graph_output_path)
 
     ## set gurobi vars ##
-    env1 = model.getMultiobjEnv(1)
-    env1.setParam(GRB.Param.Seed, int(seed))
-    env1.setParam(GRB.Param.Threads, num_threads)
-    env2 = model.getMultiobjEnv(0)
-    env2.setParam(GRB.Param.Seed, int(seed))
-    env2.setParam(GRB.Param.Threads, num_threads)
+    if lazy_delay_constraints:
+        # set before the environments of the optimization passes are created, they copy the parameters of the model
+        model.Params.LazyConstraints = 1
+    apply_solve_policy(model, SolvePolicy() if solve_policy is None else solve_policy, seed, num_threads)
 
     ## set placements ##
     if use_exact_placements != -1:
-        model.addConstr(quicksum(decision_variables.gamma[j, p] for j in indices.vnfs for p in
-                        indices.paths) == use_exact_placements)
+        model.addConstr(quicksum(decision_variables.gamma.values()) == use_exact_placements)
 
-    model.optimize()
+    if warm_start is not None:
+        __set_start_values(model, read_solution(warm_start))
+
+    if lazy_delay_constraints:
+        delay_cuts = LazyDelayCuts(parameters, indices, decision_variables)
+        model.optimize(delay_cuts)
+        logger.info("Added {} lazy delay cuts".format(delay_cuts.cuts))
+    else:
+        model.optimize()
+    if model.SolCount > 0:
+        # the values are fetched once, saving, printing and the generation of child requests read from the view
+        model._solution_view = SolutionView(decision_variables, model)
 
     if pretty_print:
         pretty_print_solution(indices=indices, decision_variables=decision_variables, model=model)
 
     if output_file is not None:
-        save_solution(indices=indices, decision_variables=decision_variables, model=model, output_path=output_file)
+        save_solution(indices=indices, decision_variables=decision_variables, model=model, output_path=output_file,
+                      yaml_output=yaml_output)
+        if profiler is not None:
+            profiler.save(output_file)
 
+    if profiler is not None:
+        return parameters, indices, decision_variables, model, profiler.to_dict()
     return parameters, indices, decision_variables, model
+
+
+def __solve_with_seed(model_file, variable_names, seed, num_threads, solve_policy, start_values):
+    """
+    Solves a written model with the given seed, runs in a worker process.
+    :return: the SeedResult and the values of all variables in the order of the model, None if there is no solution
+    """
+    model = read(model_file)
+    model.setAttr("VarName", model.getVars(), variable_names)
+    model.Params.OutputFlag = 0
+    apply_solve_policy(model, solve_policy, seed, num_threads)
+    if start_values is not None:
+        __set_start_values(model, start_values)
+    model.optimize()
+    values = None
+    objective_values = None
+    if model.SolCount > 0:
+        values = model.getAttr("X", model.getVars())
+        objective_values = [model.getObjective(objective).getValue() for objective in range(model.NumObj)]
+    return SeedResult(seed=seed, status=model.Status, runtime=model.Runtime, objective_values=objective_values), values
+
+
+def __solved_decision_variables(decision_variables, values):
+    return DecisionVariables(**{
+        family: {key: SolvedVariable(name=variable.VarName, value=values[variable.index]) for key, variable in
+                 getattr(decision_variables, family).items()} for family in decision_variable_families})
+
+
+def solve_model_with_seeds(network_description_file=None, vnf_description_file=None, chain_description_file=None,
+                           vnf_request_description_file=None, advertised_restriction_file=None, seeds=None,
+                           pretty_print=False, output_file=None, generate_backward_paths=True, with_delay_constraints=False,
+                           graph_output_path=None, use_exact_placements=-1, num_threads=1, workers=None,
+                           builder="quicksum",
+                           use_indicators=False, warm_start=None, solve_policy=None, model_cache=None,
+                           yaml_output=True, parameters=None):
+    """
+    Builds the model once and solves it with each of the seeds in parallel worker processes. The solution of the first
+    seed is the solution of the model, the solutions of the other seeds are saved to seed_<seed> folders next to it.
+    The remaining parameters are the same as for solve_model.
+    :param seeds: the Gurobi seeds to solve the model with
+    :param num_threads: the number of threads of each seed
+    :param workers: the number of worker processes, by default one per seed up to the number of cpus
+    :return: the parsed parameters, the used indices, the decision variables holding the solution of the first seed
+     and a dict with the SeedResult of each seed
+    """
+    parameters, indices, decision_variables, model = get_model(network_description_file, vnf_description_file,
+                                                               chain_description_file,
+                                                               vnf_request_description_file,
+                                                               advertised_restriction_file,
+                                                               generate_backward_paths=generate_backward_paths,
+                                                               with_delay_constraints=with_delay_constraints,
+                                                               builder=builder, use_indicators=use_indicators,
+                                                               model_cache=model_cache, parameters=parameters)
+    if graph_output_path is not None:
+        plot_network(parameters, graph_output_path)
+
+    if use_exact_placements != -1:
+        model.addConstr(quicksum(decision_variables.gamma.values()) == use_exact_placements)
+    model.update()
+    variable_names = model.getAttr("VarName", model.getVars())
+    start_values = None if warm_start is None else read_solution(warm_start)
+    solve_policy = SolvePolicy() if solve_policy is None else solve_policy
+
+    if workers is None:
+        workers = min(len(seeds), os.cpu_count())
+    with tempfile.TemporaryDirectory() as folder:
+        model_file = os.path.join(folder, "model.mps")
+        model.write(model_file)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(__solve_with_seed, model_file, variable_names, seed, num_threads, solve_policy,
+                                       start_values) for seed in seeds]
+            outcomes = [future.result() for future in futures]
+
+    results = {}
+    solutions = {}
+    for seed, (result, values) in zip(seeds, outcomes):
+        results[seed] = result
+        if values is not None:
+            solutions[seed] = __solved_decision_variables(decision_variables, values)
+        logger.info("Seed {0} finished with status {1} after {2:.3f}s".format(seed, result.status, result.runtime))
+
+    if output_file is not None:
+        for seed, solution in solutions.items():
+            seed_output = output_file if seed == seeds[0] else "{0}/seed_{1}".format(output_file, seed)
+            os.makedirs(seed_output, exist_ok=True)
+            save_solution(indices=indices, decision_variables=solution, model=None, output_path=seed_output,
+                          yaml_output=yaml_output)
+
+    # without a solution of the first seed the unsolved variables are returned, just like solve_model does
+    decision_variables = solutions.get(seeds[0], decision_variables)
+    if pretty_print and seeds[0] in solutions:
+        pretty_print_solution(indices=indices, decision_variables=decision_variables, model=None)
+    return parameters, indices, decision_variables, results
@@ -0,0 +1,575 @@
+"""
+Greedy placement heuristic, an alternative to solving the MIP of a coordinator. The requests are inserted one after
+another, largest initial rate first: every VNF of a chain is placed on the path with the lowest additional cost, i.e.
+one for a new placement plus the delay of the route leading to it. Routes are shortest delay routes over the edges
+and paths that still have enough capacity. If a request gets stuck, the next best candidates of its previous VNFs are
+tried. A local search then rips up and re-inserts every request, which lets it share placements made by later
+requests.
+
+The solution respects the cpu and rate capacities of the paths and edges as well as the advertised restrictions and is
+returned as decision variables with the keys and names of the MIP variables, so it can be saved, interpreted and used
+as warm start just like a solution of the MIP.
+"""
+import heapq
+import math
+import time
+
+import numpy as np
+
+from hvc.mip.gurobipy_mip import define_parameters_and_indices
+from hvc.mip.models import DecisionVariables, SolvedVariable
+from hvc.mip.utils import *
+
+logger = setup_logger("heuristic", "heuristic.log")
+
+# absolute tolerance of the capacity checks
+tolerance = 1e-6
+
+
+class HeuristicResult:
+    def __init__(self, **kwargs):
+        # the values of the three hierarchical objectives of the MIP
+        self.objective_values = kwargs["objective_values"]
+        self.runtime = kwargs["runtime"]
+        self.unplaced_requests = kwargs["unplaced_requests"]
+
+    @property
+    def feasible(self):
+        return len(self.unplaced_requests) == 0
+
+
+class Segment:
+    """
+    A single arc of a request: its starting VNF placed on path p, its ending VNF placed on path p_prime and the route in
+    between, given by the indices of the used paths and edges.
+    """
+
+    def __init__(self, **kwargs):
+        self.arc = kwargs["arc"]
+        self.p = kwargs["p"]
+        self.p_prime = kwargs["p_prime"]
+        self.rate = kwargs["rate"]
+        self.route_paths = kwargs["route_paths"]
+        self.route_edges = kwargs["route_edges"]
+
+
+class Assignment:
+    def __init__(self, **kwargs):
+        self.segments = kwargs["segments"]
+        # the rate the request adds to each path it is placed on, see __max_rate_def_constraint
+        self.placement_rates = kwargs["placement_rates"]
+
+
+class PlacementState:
+    """
+    The residual capacities of a partial solution. Rates and cpu demands are kept in numpy arrays indexed by the
+    position of a path, edge or VNF, the restrictions as index arrays into them.
+    """
+
+    def __init__(self, parameters, indices):
+        self.parameters = parameters
+        self.functions = get_vnf_functions(parameters)
+        intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+        inter_domain_edges = parameters.network_description[key_inter_domain_edges]
+        advertised_restrictions = parameters.advertised_restrictions
+
+        self.paths = list(indices.paths)
+        self.edges = list(indices.edges)
+        self.vnfs = list(indices.vnfs)
+        self.path_index = {path: index for index, path in enumerate(self.paths)}
+        self.edge_index = {edge: index for index, edge in enumerate(self.edges)}
+        self.vnf_index = {vnf: index for index, vnf in enumerate(self.vnfs)}
+        self.network = indices.network
+        self.path_source = [intra_domain_paths[path]["src"] for path in self.paths]
+        self.path_destination = [intra_domain_paths[path]["dst"] for path in self.paths]
+        self.edge_destination = [inter_domain_edges[edge]["dst"] for edge in self.edges]
+        self.temporary = np.array(["ingress" in path or "egress" in path for path in self.paths], dtype=bool)
+
+        self.path_delay = np.array([float(get_delay_of_path(parameters, path)) for path in self.paths])
+        self.edge_delay = np.array([float(get_delay_of_link(parameters, edge)) for edge in self.edges])
+        self.path_capacity = np.array([float(get_rate_of_path(parameters, path)) for path in self.paths])
+        self.edge_capacity = np.array([float(get_rate_of_link(parameters, edge)) for edge in self.edges])
+
+        cpu_restrictions = advertised_restrictions[key_cpu_restrictions] or {}
+        self.cpu_restrictions = list(indices.cpu_restrictions)
+        self.cpu_pool_paths = [np.array([self.path_index[path] for path in cpu_restrictions[restriction]["paths"]],
+                                        dtype=int) for restriction in self.cpu_restrictions]
+        self.cpu_pool = np.array([float(cpu_restrictions[restriction]["shared_cpu"]) for restriction in
+                                  self.cpu_restrictions])
+        # the cpu of a path that is not shared with other paths, see __cpu_capacity_constraint
+        self.exclusive_cpu = np.array([float(get_cpu_of_path(parameters, path)) for path in self.paths])
+        for paths, shared_cpu in zip(self.cpu_pool_paths, self.cpu_pool):
+            self.exclusive_cpu[paths] -= shared_cpu
+        self.pools_of_path = [[restriction for restriction, paths in enumerate(self.cpu_pool_paths) if
+                               index in paths] for index in range(len(self.paths))]
+
+        routing_restrictions = advertised_restrictions[key_routing_restrictions] or {}
+        self.routing_paths = [np.array([self.path_index[path] for path in routing_restrictions[restriction]["paths"]],
+                                       dtype=int) for restriction in indices.routing_restrictions]
+        self.routing_bottleneck = np.array([float(routing_restrictions[restriction]["shared_bottleneck"]) for
+                                            restriction in indices.routing_restrictions])
+        self.routing_of_path = [[restriction for restriction, paths in enumerate(self.routing_paths) if
+                                 index in paths] for index in range(len(self.paths))]
+        edge_restrictions = advertised_restrictions.get("routing_restriction_edges", {})
+        self.shared_edges = [np.array([self.edge_index[edge] for edge in restriction["edges"]], dtype=int) for
+                             restriction in edge_restrictions.values()]
+        self.shared_edge_rate = np.array([float(restriction["shared_bottleneck"]) for restriction in
+                                          edge_restrictions.values()])
+        self.shared_of_edge = [[restriction for restriction, edges in enumerate(self.shared_edges) if
+                                index in edges] for index in range(len(self.edges))]
+
+        self.sigma_in = np.zeros((len(self.vnfs), len(self.paths)))
+        self.sigma_out = np.zeros((len(self.vnfs), len(self.paths)))
+        self.kappa = np.zeros((len(self.vnfs), len(self.paths)))
+        # number of segments using a placement, the SRC and DST placements on the temporary paths are always in use
+        self.placements = np.zeros((len(self.vnfs), len(self.paths)), dtype=int)
+        for index, path in enumerate(self.paths):
+            if path.startswith("ingress"):
+                self.placements[self.vnf_index["SRC"], index] += 1
+            elif path.startswith("egress"):
+                self.placements[self.vnf_index["DST"], index] += 1
+        for vnf, vnf_index in self.vnf_index.items():
+            self.kappa[vnf_index] = self.__minimal_kappa(vnf, 0.0)
+        self.routed_rate = np.zeros(len(self.paths))
+        self.placement_rate = np.zeros(len(self.paths))
+        self.edge_rate = np.zeros(len(self.edges))
+        self.delay = 0.0
+        self.hops = 0
+        self.__distances_to = {}
+
+    def __minimal_kappa(self, vnf, rate):
+        return max(0.0, math.ceil(self.functions.cpu_consumption[vnf](rate) - tolerance))
+
+    @property
+    def beta(self):
+        return self.routed_rate + self.placement_rate
+
+    def objective_values(self):
+        return [float(np.count_nonzero(self.placements) + self.delay), float(self.delay), float(self.hops)]
+
+    def cpu_epsilon(self, cpu_demand):
+        """
+        Covers the cpu demand exceeding the exclusive cpu of each path by the shared cpu of its restrictions. The
+        restrictions overlap (e.g. an advertised one and the one of a backward path), thus the shared cpu is assigned
+        along augmenting paths, which finds an assignment whenever there is one.
+        :return: the cpu drawn from each restriction by each path, None if the shared cpu does not suffice
+        """
+        remaining = self.cpu_pool.copy()
+        epsilon = np.zeros((len(self.cpu_restrictions), len(self.paths)))
+        excess = cpu_demand - self.exclusive_cpu
+        for path in np.flatnonzero(excess > tolerance):
+            needed = excess[path]
+            while needed > tolerance:
+                shifts = self.__augmenting_path(path, remaining, epsilon)
+                if shifts is None:
+                    return None
+                amount = min([needed, remaining[shifts[-1][0]]] +
+                             [epsilon[restriction, shifted_path] for restriction, shifted_path, sign in shifts if
+                              sign < 0])
+                for restriction, shifted_path, sign in shifts:
+                    epsilon[restriction, shifted_path] += sign * amount
+                remaining[shifts[-1][0]] -= amount
+                needed -= amount
+        return epsilon
+
+    def __augmenting_path(self, path, remaining, epsilon):
+        """
+        Breadth first search from the restrictions of the path to a restriction with remaining cpu. A restriction
+        without remaining cpu is passed if one of the paths drawing from it can draw from another restriction instead.
+        :return: the (restriction, path, sign) changes of the draws, the last one is from the restriction with
+         remaining cpu, None if there is no such restriction
+        """
+        parents = {restriction: None for restriction in self.pools_of_path[path]}
+        queue = list(self.pools_of_path[path])
+        while len(queue) > 0:
+            restriction = queue.pop(0)
+            if remaining[restriction] > tolerance:
+                shifts = []
+                while parents[restriction] is not None:
+                    previous_restriction, shifted_path = parents[restriction]
+                    shifts[:0] = [(previous_restriction, shifted_path, -1), (restriction, shifted_path, 1)]
+                    restriction = previous_restriction
+                return [(restriction, path, 1)] + shifts
+            for other_path in np.flatnonzero(epsilon[restriction] > tolerance):
+                for other_restriction in self.pools_of_path[other_path]:
+                    if other_restriction not in parents:
+                        parents[other_restriction] = (restriction, other_path)
+                        queue.append(other_restriction)
+        return None
+
+    def can_place(self, vnf, path, rate):
+        """
+        :return: True, if the VNF can receive the additional rate on the path without exceeding the cpu capacities
+        """
+        vnf_index = self.vnf_index[vnf]
+        path_index = self.path_index[path]
+        # an instance has a single rate function, sharing it between requests only works if the function is linear
+        outgoing_rate = self.functions.outgoing_rate[vnf]
+        if self.placements[vnf_index, path_index] > 0 and vnf not in ["SRC", "DST"] and not (
+                outgoing_rate.is_affine and outgoing_rate.intercept == 0):
+            return False
+        kappa = self.__minimal_kappa(vnf, self.sigma_in[vnf_index, path_index] + rate)
+        cpu_demand = self.kappa.sum(axis=0)
+        cpu_demand[path_index] += kappa - self.kappa[vnf_index, path_index]
+        if cpu_demand[path_index] <= self.exclusive_cpu[path_index] + tolerance and kappa <= self.kappa[
+                vnf_index, path_index]:
+            return True
+        return self.cpu_epsilon(cpu_demand) is not None
+
+    def __path_has_room(self, beta, path_index, rate):
+        if beta[path_index] + rate > self.path_capacity[path_index] + tolerance:
+            return False
+        return all(beta[self.routing_paths[restriction]].sum() + rate <= self.routing_bottleneck[restriction] +
+                   tolerance for restriction in self.routing_of_path[path_index])
+
+    def __edge_has_room(self, edge_index, rate):
+        if self.edge_rate[edge_index] + rate > self.edge_capacity[edge_index] + tolerance:
+            return False
+        return all(self.edge_rate[self.shared_edges[restriction]].sum() + rate <= self.shared_edge_rate[restriction] +
+                   tolerance for restriction in self.shared_of_edge[edge_index])
+
+    def distance_to(self, target):
+        """
+        The delay of the shortest route from each node to the target, regardless of the capacities. It is a lower
+        bound of the routing delay still to come when the chain has to end at the target.
+        :return: a dict from node to delay, nodes that cannot reach the target are left out
+        """
+        if target not in self.__distances_to:
+            distances = {target: 0.0}
+            queue = [(0.0, target)]
+            while len(queue) > 0:
+                delay, node = heapq.heappop(queue)
+                if delay > distances[node]:
+                    continue
+                predecessors = [(self.path_source[self.path_index[path]], self.path_delay[self.path_index[path]]) for
+                                path in self.network.paths_ending_at[node] if not self.temporary[self.path_index[path]]]
+                predecessors += [(self.parameters.network_description[key_inter_domain_edges][edge]["src"],
+                                  self.edge_delay[self.edge_index[edge]]) for edge in
+                                 self.network.edges_ending_at[node]]
+                for predecessor, link_delay in predecessors:
+                    if predecessor not in distances or delay + link_delay < distances[predecessor]:
+                        distances[predecessor] = delay + link_delay
+                        heapq.heappush(queue, (delay + link_delay, predecessor))
+            self.__distances_to[target] = distances
+        return self.__distances_to[target]
+
+    def route(self, p, p_prime, rate):
+        """
+        Computes the shortest delay route carrying the rate from the destination of p to the source of p_prime.
+        :return: the indices of the used paths, the indices of the used edges and the delay of the route, None if
+         there is no route with enough capacity
+        """
+        source = self.path_destination[self.path_index[p]]
+        target = self.path_source[self.path_index[p_prime]]
+        if p == p_prime or source == target:
+            return [], [], 0.0
+        beta = self.beta
+        excluded = {self.path_index[p], self.path_index[p_prime]}
+        # (delay, hops, node, predecessor node, used path or edge)
+        queue = [(0.0, 0, source)]
+        distances = {source: (0.0, 0)}
+        predecessors = {}
+        while len(queue) > 0:
+            delay, hops, node = heapq.heappop(queue)
+            if (delay, hops) > distances[node]:
+                continue
+            if node == target:
+                break
+            neighbours = []
+            for path in self.network.paths_starting_at[node]:
+                index = self.path_index[path]
+                if not self.temporary[index] and index not in excluded and self.__path_has_room(beta, index, rate):
+                    neighbours.append((self.path_destination[index], self.path_delay[index], ("path", index)))
+            for edge in self.network.edges_starting_at[node]:
+                index = self.edge_index[edge]
+                if self.__edge_has_room(index, rate):
+                    neighbours.append((self.edge_destination[index], self.edge_delay[index], ("edge", index)))
+            for neighbour, link_delay, link in neighbours:
+                distance = (delay + link_delay, hops + 1)
+                if neighbour not in distances or distance < distances[neighbour]:
+                    distances[neighbour] = distance
+                    predecessors[neighbour] = (node, link)
+                    heapq.heappush(queue, (distance[0], distance[1], neighbour))
+        if target not in predecessors:
+            return None
+
+        route_paths = []
+        route_edges = []
+        node = target
+        while node != source:
+            node, (kind, index) = predecessors[node]
+            if kind == "path":
+                route_paths.append(index)
+            else:
+                route_edges.append(index)
+        return route_paths, route_edges, distances[target][0]
+
+    def apply(self, segment, sign=1):
+        """
+        Adds (sign 1) or removes (sign -1) the rates and placements of a segment.
+        """
+        rate = sign * segment.rate
+        starting_vnf = self.vnf_index[get_vnf_from_arc(segment.arc[0])]
+        ending_vnf = self.vnf_index[get_vnf_from_arc(segment.arc[1])]
+        p = self.path_index[segment.p]
+        p_prime = self.path_index[segment.p_prime]
+        self.sigma_out[starting_vnf, p] += rate
+        self.sigma_in[ending_vnf, p_prime] += rate
+        self.kappa[ending_vnf, p_prime] = self.__minimal_kappa(self.vnfs[ending_vnf],
+                                                               self.sigma_in[ending_vnf, p_prime])
+        self.placements[starting_vnf, p] += sign
+        self.placements[ending_vnf, p_prime] += sign
+        self.routed_rate[segment.route_paths] += rate
+        self.edge_rate[segment.route_edges] += rate
+        self.delay += sign * (self.path_delay[segment.route_paths].sum() + self.edge_delay[segment.route_edges].sum())
+        self.hops += sign * (len(segment.route_paths) + len(segment.route_edges))
+
+    def placement_rates(self, request_key, segments):
+        """
+        The rate a request adds to the paths it is placed on: the maximum over the boxes of its chain, as in
+        __max_rate_def_constraint of the MIP.
+        :return: a dict from path index to rate
+        """
+        vnf_chain = [(arc[0] + "_" + request_key, arc[1] + "_" + request_key) for arc in
+                     self.parameters.chains[self.parameters.vnf_requests[request_key]["vnf_chain"]]]
+        lambda_total = {(segment.arc, segment.p, segment.p_prime): segment.rate for segment in segments}
+        rates = {}
+        for path in set(segment.p for segment in segments) | set(segment.p_prime for segment in segments):
+            boxes = []
+            for index, pair in enumerate(vnf_chain):
+                first_sum = sum(rate for (arc, p, p_prime), rate in lambda_total.items() if
+                                arc in vnf_chain[1:index + 1] and p == path and p_prime != path)
+                second_sumand = lambda_total.get((pair, path, path), 0.0)
+                third_sum = sum(rate for (arc, p, p_prime), rate in lambda_total.items() if
+                                arc in vnf_chain[index:] and p != path and p_prime == path)
+                boxes.append(first_sum + second_sumand + third_sum)
+            rates[self.path_index[path]] = max(boxes)
+        return rates
+
+    def fits(self, placement_rates):
+        """
+        :return: True, if the placement rates of a request fit onto the paths next to the routed traffic
+        """
+        beta = self.beta
+        for index, rate in placement_rates.items():
+            beta[index] += rate
+        if np.any(beta > self.path_capacity + tolerance):
+            return False
+        return all(beta[paths].sum() <= bottleneck + tolerance for paths, bottleneck in
+                   zip(self.routing_paths, self.routing_bottleneck))
+
+    def add(self, assignment, sign=1):
+        for segment in assignment.segments:
+            self.apply(segment, sign)
+        for index, rate in assignment.placement_rates.items():
+            self.placement_rate[index] += sign * rate
+
+
+def __insert_request(state, request_key, branching, budget):
+    """
+    Places the chain of a request VNF by VNF. The candidate paths of a VNF are ordered by their additional cost, the
+    best ones are tried in turn until the rest of the chain can be placed as well.
+    :param branching: the number of candidates tried per VNF
+    :param budget: the maximal number of tried candidates
+    :return: the applied assignment of the request, None if no feasible one was found
+    """
+    parameters = state.parameters
+    request = parameters.vnf_requests[request_key]
+    vnf_chain = [(arc[0] + "_" + request_key, arc[1] + "_" + request_key) for arc in
+                 parameters.chains[request["vnf_chain"]]]
+    rates = get_chain_rates(parameters, request_key)
+    ingress_path = "ingress_" + str(request["ingress"])
+    egress_path = "egress_" + str(request["egress"])
+    placement_paths = [path for index, path in enumerate(state.paths) if not state.temporary[index]]
+    remaining_delay = state.distance_to(str(request["egress"]))
+    segments = []
+    tries = [0]
+
+    def extend(position, p):
+        arc = vnf_chain[position]
+        rate = float(rates[position])
+        vnf = get_vnf_from_arc(arc[1])
+        candidates = []
+        for p_prime in ([egress_path] if vnf == "DST" else placement_paths):
+            if not state.can_place(vnf, p_prime, rate):
+                continue
+            route = state.route(p, p_prime, rate)
+            if route is None:
+                continue
+            route_paths, route_edges, delay = route
+            is_new = state.placements[state.vnf_index[vnf], state.path_index[p_prime]] == 0
+            # the rest of the chain has to be routed to the egress, prefer paths close to it
+            lookahead = remaining_delay.get(state.path_destination[state.path_index[p_prime]], math.inf)
+            if vnf == "DST":
+                lookahead = 0.0
+            if math.isinf(lookahead):
+                continue
+            candidates.append((int(is_new) + delay + lookahead, len(route_paths) + len(route_edges),
+                               state.path_index[p_prime], p_prime, route_paths, route_edges))
+        candidates.sort(key=lambda candidate: candidate[:3])
+
+        for _, _, _, p_prime, route_paths, route_edges in candidates[:branching]:
+            if tries[0] >= budget:
+                return False
+            tries[0] += 1
+            segment = Segment(arc=arc, p=p, p_prime=p_prime, rate=rate, route_paths=route_paths,
+                              route_edges=route_edges)
+            state.apply(segment)
+            segments.append(segment)
+            if position + 1 < len(vnf_chain):
+                if extend(position + 1, p_prime):
+                    return True
+            elif state.fits(state.placement_rates(request_key, segments)):
+                return True
+            state.apply(segment, -1)
+            segments.pop()
+        return False
+
+    if not extend(0, ingress_path):
+        return None
+    assignment = Assignment(segments=list(segments), placement_rates=state.placement_rates(request_key, segments))
+    for index, rate in assignment.placement_rates.items():
+        state.placement_rate[index] += rate
+    return assignment
+
+
+def __improve(state, assignments, passes, branching, budget):
+    """
+    Rips up and re-inserts one request at a time, keeps the new assignment if it improves the objectives.
+    """
+    for _ in range(passes):
+        improved = False
+        for request_key, assignment in assignments.items():
+            objective_values = state.objective_values()
+            state.add(assignment, -1)
+            new_assignment = __insert_request(state, request_key, branching, budget)
+            if new_assignment is not None and state.objective_values() < objective_values:
+                assignments[request_key] = new_assignment
+                improved = True
+                continue
+            if new_assignment is not None:
+                state.add(new_assignment, -1)
+            state.add(assignment)
+        if not improved:
+            break
+
+
+def __decision_variables(parameters, indices, state, assignments):
+    """
+    Translates the placement state into decision variables with the keys and names of the MIP variables. Routing
+    variables are only given for the used routes.
+    """
+
+    def solved(family, values):
+        return {key: SolvedVariable(name=variable_name(family, key), value=value) for key, value in
+                values.items()}
+
+    lambda_total = {}
+    lambda_inter = {}
+    lambda_intra = {}
+    for assignment in assignments.values():
+        for segment in assignment.segments:
+            key = (segment.arc, segment.p, segment.p_prime)
+            lambda_total[key] = segment.rate
+            for index in segment.route_paths:
+                lambda_intra[key + (state.paths[index],)] = segment.rate
+            for index in segment.route_edges:
+                lambda_inter[key + (state.edges[index],)] = segment.rate
+
+    starting_vnfs = set(get_vnf_from_arc(arc[0]) for arc in indices.arcs)
+    ending_vnfs = set(get_vnf_from_arc(arc[1]) for arc in indices.arcs)
+    sigma_in = {}
+    sigma_out = {}
+    kappa = {}
+    for vnf, vnf_index in state.vnf_index.items():
+        rate_function = state.functions.outgoing_rate[vnf]
+        for path, path_index in state.path_index.items():
+            in_rate = state.sigma_in[vnf_index, path_index]
+            out_rate = state.sigma_out[vnf_index, path_index]
+            # VNFs without incoming arcs (SRC) receive what they emit, VNFs without outgoing arcs (DST) emit according
+            # to their rate function
+            if vnf not in ending_vnfs and out_rate > 0:
+                in_rate = rate_function.inverse(out_rate)
+                in_rate = out_rate if in_rate is None else in_rate
+            if vnf not in starting_vnfs:
+                out_rate = rate_function(in_rate)
+            sigma_in[vnf, path] = in_rate
+            sigma_out[vnf, path] = out_rate
+            kappa[vnf, path] = state.kappa[vnf_index, path_index]
+
+    gamma = {(vnf, path): float(state.placements[state.vnf_index[vnf], state.path_index[path]] > 0) for vnf, path in
+             indices.sparse.gamma}
+    beta = dict(zip(state.paths, state.beta))
+    epsilon_values = state.cpu_epsilon(state.kappa.sum(axis=0))
+    epsilon = {(restriction, path): epsilon_values[restriction_index, path_index] for
+               restriction_index, restriction in enumerate(state.cpu_restrictions) for
+               path_index, path in enumerate(state.paths)}
+
+    return DecisionVariables(lambda_total=solved("lambda_total", lambda_total),
+                             lambda_inter=solved("lambda_inter", lambda_inter),
+                             lambda_intra=solved("lambda_intra", lambda_intra),
+                             sigma_in=solved("sigma_in", sigma_in), sigma_out=solved("sigma_out", sigma_out),
+                             delta_inter=solved("delta_inter", {key: 1.0 for key in lambda_inter}),
+                             delta_intra=solved("delta_intra", {key: 1.0 for key in lambda_intra}),
+                             gamma=solved("gamma", gamma), kappa=solved("kappa", kappa), beta=solved("beta", beta),
+                             epsilon=solved("epsilon", epsilon), zeta={})
+
+
+def solve_model(network_description_file=None, vnf_description_file=None, chain_description_file=None,
+                vnf_request_description_file=None, advertised_restriction_file=None, pretty_print=False,
+                output_file=None, generate_backward_paths=True, graph_output_path=None, branching=10, budget=2000,
+                local_search_passes=2, yaml_output=True, parameters=None):
+    """
+    Places the requests with the greedy heuristic instead of solving the MIP. Takes the same parameter files as
+    gurobipy_mip.solve_model.
+    :param pretty_print: whether or not the solution shall be printed to stdout
+    :param output_file: a path to a file where the solution shall be dumped to, only if all requests were placed
+    :param generate_backward_paths: True, if the provided graph only contains forward paths
+    :param graph_output_path: a folder the network is plotted to
+    :param branching: the number of candidate paths tried per VNF when a request gets stuck
+    :param budget: the maximal number of candidates tried per request
+    :param local_search_passes: the maximal number of rip-up and re-insert passes over all requests
+    :param yaml_output: True, if the solution is saved to YAML files next to the columnar solution store
+    :param parameters: Parameters used instead of the parameter files, see gurobipy_mip.get_model
+    :return: the parsed parameters, the used indices, the decision variables and the result of the heuristic
+    """
+    start = time.time()
+    parameters, indices = define_parameters_and_indices(network_description_file, vnf_description_file,
+                                                        chain_description_file, vnf_request_description_file,
+                                                        advertised_restriction_file,
+                                                        generate_backward_paths=generate_backward_paths,
+                                                        parameters=parameters)
+    if graph_output_path is not None:
+        plot_network(parameters, graph_output_path)
+
+    state = PlacementState(parameters, indices)
+
+    assignments = {}
+    unplaced_requests = []
+    for request_key in sorted(parameters.vnf_requests,
+                              key=lambda key: -float(parameters.vnf_requests[key]["initial_rate"])):
+        assignment = __insert_request(state, request_key, branching, budget)
+        if assignment is None:
+            unplaced_requests.append(request_key)
+        else:
+            assignments[request_key] = assignment
+    if len(unplaced_requests) == 0:
+        __improve(state, assignments, local_search_passes, branching, budget)
+
+    decision_variables = __decision_variables(parameters, indices, state, assignments)
+    result = HeuristicResult(objective_values=state.objective_values(), runtime=time.time() - start,
+                             unplaced_requests=unplaced_requests)
+    if result.feasible:
+        logger.info("Placed {0} requests in {1:.3f}s, objectives {2}".format(len(assignments), result.runtime,
+                                                                             result.objective_values))
+    else:
+        logger.info("Could not place the requests {}".format(", ".join(unplaced_requests)))
+
+    if pretty_print:
+        pretty_print_solution(indices=indices, decision_variables=decision_variables, model=None)
+
+    if output_file is not None and result.feasible:
+        save_solution(indices=indices, decision_variables=decision_variables, model=None, output_path=output_file,
+                      yaml_output=yaml_output)
+
+    return parameters, indices, decision_variables, result
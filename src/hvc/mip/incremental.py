@@ -0,0 +1,273 @@
+"""
+Keeps the model of a coordinator alive while its requests change. Adding or removing a request only adds or removes
+the variables and rows of the arcs of that request, the rows combining several requests are defined anew and the
+placements of the untouched requests are used as MIP start (or fixed). The arcs of a request can be placed on the
+temporary ingress/egress paths of the other requests, the rows of these placements are added or removed with the paths.
+"""
+import copy
+import itertools
+from collections import defaultdict
+
+from gurobipy import GRB, Model, tupledict
+
+import hvc.mip.gurobipy_mip as gmip
+from hvc.mip.model_cache import decision_variable_families
+from hvc.mip.models import DecisionVariables, SolvePolicy
+from hvc.mip.solution_view import SolutionView, solution_view
+from hvc.mip.utils import get_request_from_arc, plot_network, pretty_print_solution, save_solution, setup_logger
+
+logger = setup_logger("incremental", "incremental.log")
+
+# the families keyed by an arc, their values are kept for the untouched requests
+arc_variable_families = ["lambda_total", "lambda_inter", "lambda_intra", "delta_inter", "delta_intra", "zeta"]
+
+
+class ModelRecorder:
+    """
+    Passes the calls of the constraint builders on to the model and records the variables and constraints they add.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.added = []
+
+    def __record(self, added):
+        self.added.append(added)
+        return added
+
+    def addVar(self, *args, **kwargs):
+        return self.__record(self.model.addVar(*args, **kwargs))
+
+    def addConstr(self, *args, **kwargs):
+        return self.__record(self.model.addConstr(*args, **kwargs))
+
+    def addGenConstrIndicator(self, *args, **kwargs):
+        return self.__record(self.model.addGenConstrIndicator(*args, **kwargs))
+
+    def addGenConstrPWL(self, *args, **kwargs):
+        return self.__record(self.model.addGenConstrPWL(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class IncrementalModel:
+    def __init__(self, network_description_file=None, vnf_description_file=None, chain_description_file=None,
+                 vnf_request_description_file=None, advertised_restriction_file=None, generate_backward_paths=True,
+                 use_indicators=False, fix_untouched=False, solve_policy=None, seed=0, num_threads=6,
+                 parameters=None):
+        """
+        Builds the model of the given parameter files, the delay constraints are not supported.
+        :param fix_untouched: True, if the lambda_total values of the requests that did not change are fixed to the
+         previous solution, otherwise the previous solution is only used as MIP start
+        :param solve_policy: the SolvePolicy of each optimization, by default all objectives are optimized
+         hierarchically without limits
+        :param parameters: Parameters used instead of the parameter files, they are copied
+        """
+        if parameters is None:
+            self.descriptions = gmip.load_descriptions(network_description_file, vnf_description_file,
+                                                       chain_description_file, vnf_request_description_file,
+                                                       advertised_restriction_file)
+        else:
+            self.descriptions = copy.deepcopy(parameters)
+        self.generate_backward_paths = generate_backward_paths
+        self.use_indicators = use_indicators
+        self.fix_untouched = fix_untouched
+        self.solve_policy = SolvePolicy() if solve_policy is None else solve_policy
+        self.seed = seed
+        self.num_threads = num_threads
+
+        self.model = Model("gurobipy_mip")
+        self.parameters = None
+        self.indices = None
+        self.decision_variables = DecisionVariables(
+            **{family: tupledict() for family in decision_variable_families})
+        # request key -> group -> the placements of the group and the variables and constraints of their rows
+        self.placement_rows = {}
+        # request key -> variables and constraints of the rows of the request itself
+        self.request_rows = {}
+        # request key -> path -> variable holding the rate of the request on the path
+        self.request_rates = {}
+        # request key -> path -> variables and constraints defining the rate
+        self.rate_rows = {}
+        self.shared_rows = []
+        self.fixed_variables = []
+        self.set_requests(self.descriptions.vnf_requests)
+
+    def add_request(self, request_key, request):
+        """
+        Adds a request (or replaces the request of the same key).
+        """
+        vnf_requests = dict(self.parameters.vnf_requests)
+        vnf_requests[request_key] = request
+        self.set_requests(vnf_requests)
+
+    def remove_request(self, request_key):
+        vnf_requests = dict(self.parameters.vnf_requests)
+        del vnf_requests[request_key]
+        self.set_requests(vnf_requests)
+
+    def set_requests(self, vnf_requests):
+        """
+        Updates the model to the given requests. Requests that did not change keep their rows, departed requests are
+        removed and new or changed requests are added.
+        :param vnf_requests: a dict of all requests, as in the vnf request description file
+        """
+        previous_values = self.__previous_values()
+        # release the values fixed for the previous requests, their upper bounds are reset with all other bounds
+        for variable in self.fixed_variables:
+            variable.LB = 0
+        self.fixed_variables = []
+        parameters = copy.deepcopy(self.descriptions)
+        parameters.vnf_requests = copy.deepcopy(vnf_requests)
+        indices = gmip.define_indices(parameters, generate_backward_paths=self.generate_backward_paths,
+                                      use_indicators=self.use_indicators)
+        placement_groups = self.__placement_groups(parameters, indices)
+        previous_requests = {} if self.parameters is None else self.parameters.vnf_requests
+
+        # drop the groups of departed and changed requests and the groups whose placements changed, the rows of a
+        # request and its rates are redefined whenever any of its groups changed
+        outdated = []
+        for request_key, groups in self.placement_rows.items():
+            if parameters.vnf_requests.get(request_key) != previous_requests[request_key]:
+                vanished_groups = list(groups)
+            else:
+                vanished_groups = [group for group, (placements, rows) in groups.items() if
+                                   placement_groups[request_key].get(group) != placements]
+            for group in vanished_groups:
+                self.model.remove(groups.pop(group)[1])
+            if len(vanished_groups) > 0 or len(groups) != len(placement_groups.get(request_key, {})):
+                outdated.append(request_key)
+        for request_key in outdated:
+            self.model.remove(self.request_rows.pop(request_key))
+            self.model.remove([row for rows in self.rate_rows.pop(request_key).values() for row in rows])
+            del self.request_rates[request_key]
+            if request_key not in parameters.vnf_requests:
+                del self.placement_rows[request_key]
+        self.model.remove(self.shared_rows)
+        self.__synchronize_variables(indices)
+
+        for request_key, groups in placement_groups.items():
+            defined_groups = self.placement_rows.setdefault(request_key, {})
+            for group, placements in groups.items():
+                if group not in defined_groups:
+                    recorder = ModelRecorder(self.model)
+                    gmip.define_placement_restrictions(parameters, indices, self.decision_variables, recorder,
+                                                       placements)
+                    defined_groups[group] = (placements, recorder.added)
+        redefined = [request_key for request_key in parameters.vnf_requests if request_key not in self.request_rows]
+        for request_key in redefined:
+            recorder = ModelRecorder(self.model)
+            gmip.define_request_restrictions(parameters, indices, self.decision_variables, recorder, request_key)
+            self.request_rows[request_key] = recorder.added
+            self.request_rates[request_key] = {}
+            self.rate_rows[request_key] = {}
+            for p in indices.paths:
+                recorder = ModelRecorder(self.model)
+                self.request_rates[request_key][p] = gmip.define_request_rate(parameters, indices,
+                                                                              self.decision_variables, recorder,
+                                                                              request_key, p)
+                self.rate_rows[request_key][p] = recorder.added
+        recorder = ModelRecorder(self.model)
+        gmip.define_shared_restrictions(parameters, indices, self.decision_variables, recorder, self.request_rates)
+        self.shared_rows = recorder.added
+        gmip.define_objectives(parameters, indices, self.decision_variables, self.model)
+
+        untouched = [request_key for request_key, request in parameters.vnf_requests.items() if
+                     previous_requests.get(request_key) == request]
+        self.parameters = parameters
+        self.indices = indices
+        self.model.update()
+        if previous_values is not None:
+            self.__use_previous_values(previous_values, untouched)
+        logger.info("Updated the model to {0} requests, {1} of them unchanged, redefined the rows of {2}".format(
+            len(parameters.vnf_requests), len(untouched), len(redefined)))
+
+    def solve(self, pretty_print=False, output_file=None, graph_output_path=None, yaml_output=True):
+        """
+        Optimizes the model for the current requests.
+        :return: the parameters, the indices, the decision variables and the model, just like gurobipy_mip.solve_model
+        """
+        if graph_output_path is not None:
+            plot_network(self.parameters, graph_output_path)
+        gmip.apply_solve_policy(self.model, self.solve_policy, self.seed, self.num_threads)
+        self.model.optimize()
+        if self.model.SolCount > 0:
+            self.model._solution_view = SolutionView(self.decision_variables, self.model)
+
+        if pretty_print:
+            pretty_print_solution(indices=self.indices, decision_variables=self.decision_variables, model=self.model)
+        if output_file is not None:
+            save_solution(indices=self.indices, decision_variables=self.decision_variables, model=self.model,
+                          output_path=output_file, yaml_output=yaml_output)
+        return self.parameters, self.indices, self.decision_variables, self.model
+
+    def __previous_values(self):
+        """
+        :return: the SolutionView of the current solution, None if there is none
+        """
+        if self.model.SolCount == 0:
+            return None
+        return solution_view(self.decision_variables, self.model)
+
+    @staticmethod
+    def __placement_groups(parameters, indices):
+        """
+        Groups the placements (arc, p, p') of each request by the temporary ingress/egress paths of other requests
+        among p and p'. The placements of a group only change if one of these paths is added or removed, the rows of
+        the other groups are kept.
+        :return: a dict mapping each request to a dict mapping each group to its set of placements
+        """
+        groups = {request_key: defaultdict(set) for request_key in parameters.vnf_requests}
+        for arc, p, p_prime in itertools.chain(indices.sparse.placements, indices.sparse.lambda_total):
+            request = parameters.vnf_requests[get_request_from_arc(arc[0])]
+            own_paths = ["ingress_" + str(request["ingress"]), "egress_" + str(request["egress"])]
+            group = frozenset(path for path in [p, p_prime] if
+                              ("ingress" in path or "egress" in path) and path not in own_paths)
+            groups[get_request_from_arc(arc[0])][group].add((arc, p, p_prime))
+        return {request_key: dict(request_groups) for request_key, request_groups in groups.items()}
+
+    def __synchronize_variables(self, indices):
+        """
+        Removes the decision variables whose keys vanished, adds the ones of new keys and updates the bounds of all.
+        """
+        families = {}
+        for family, keys, options in gmip.decision_variable_definitions(indices):
+            variables = getattr(self.decision_variables, family)
+            keys = list(keys)
+            key_set = set(keys)
+            self.model.remove([variable for key, variable in variables.items() if key not in key_set])
+
+            upper_bounds = dict(zip(keys, options.pop("ub"))) if "ub" in options else None
+            new_keys = [key for key in keys if key not in variables]
+            if upper_bounds is not None:
+                options["ub"] = [upper_bounds[key] for key in new_keys]
+            new_variables = self.model.addVars(new_keys, name=family, **options)
+            families[family] = tupledict(
+                {key: variables[key] if key in variables else new_variables[key] for key in keys})
+            if upper_bounds is not None:
+                kept_keys = [key for key in keys if key in variables]
+                self.model.setAttr("UB", [variables[key] for key in kept_keys],
+                                   [upper_bounds[key] for key in kept_keys])
+        self.decision_variables = DecisionVariables(**families)
+        self.model.update()
+        self.model.setAttr("Start", self.model.getVars(), [GRB.UNDEFINED] * self.model.NumVars)
+
+    def __use_previous_values(self, previous_values, untouched):
+        """
+        Starts (or fixes) the variables of the untouched requests with their previous values.
+        """
+        untouched = set(untouched)
+        for family in arc_variable_families:
+            values = getattr(previous_values, family)
+            for key, variable in getattr(self.decision_variables, family).items():
+                if key not in values or get_request_from_arc(key[0][0]) not in untouched:
+                    continue
+                variable.Start = values[key]
+                if self.fix_untouched and family == "lambda_total":
+                    variable.LB = values[key]
+                    variable.UB = values[key]
+                    self.fixed_variables.append(variable)
+        for key, variable in self.decision_variables.gamma.items():
+            if previous_values.gamma[key] > 0.5:
+                variable.Start = 1
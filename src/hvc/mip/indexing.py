@@ -0,0 +1,276 @@
+import math
+from collections import defaultdict
+
+from hvc.mip.models import SparseIndices, VariableBounds
+from hvc.mip.utils import *
+
+
+class NetworkIndex:
+    """
+    Maps each border node to the intra-domain paths and inter-domain edges starting or ending at it. Built once per
+    model after the temporary ingress/egress paths have been added, so that the constraint builders do not have to
+    scan the network description for every index combination.
+    """
+
+    def __init__(self, parameters):
+        self.paths_starting_at = defaultdict(list)
+        self.paths_ending_at = defaultdict(list)
+        self.edges_starting_at = defaultdict(list)
+        self.edges_ending_at = defaultdict(list)
+        # nodes reachable by a single path or edge, respectively nodes from which a node is reachable that way
+        self.successors = defaultdict(set)
+        self.predecessors = defaultdict(set)
+
+        for path_key, path in parameters.network_description[key_intra_domain_paths].items():
+            self.paths_starting_at[path["src"]].append(path_key)
+            self.paths_ending_at[path["dst"]].append(path_key)
+            self.successors[path["src"]].add(path["dst"])
+            self.predecessors[path["dst"]].add(path["src"])
+
+        for edge_key, edge in parameters.network_description[key_inter_domain_edges].items():
+            self.edges_starting_at[edge["src"]].append(edge_key)
+            self.edges_ending_at[edge["dst"]].append(edge_key)
+            self.successors[edge["src"]].add(edge["dst"])
+            self.predecessors[edge["dst"]].add(edge["src"])
+
+
+def __placement_paths_of_arc(parameters, indices, arc):
+    """
+    Returns the paths on which the two VNFs of an arc can structurally be placed. SRC can only be placed on the
+    ingress path of its request and DST only on the egress path of its request.
+    :param arc: a request arc of the form (A_request, B_request)
+    :return: the candidate paths for the starting VNF and the candidate paths for the ending VNF
+    """
+    request = parameters.vnf_requests[get_request_from_arc(arc[0])]
+    if get_vnf_from_arc(arc[0]) == "SRC":
+        starting_paths = ["ingress_" + str(request["ingress"])]
+    else:
+        starting_paths = list(indices.paths)
+
+    if get_vnf_from_arc(arc[1]) == "DST":
+        ending_paths = ["egress_" + str(request["egress"])]
+    else:
+        ending_paths = list(indices.paths)
+    return starting_paths, ending_paths
+
+
+def __is_temporary_path(path):
+    return "ingress" in path or "egress" in path
+
+
+def __structurally_free_variables(parameters, indices):
+    """
+    Works out which lambda_total and gamma variables are not fixed to zero by the structure of the model alone:
+    SRC and DST can only be placed on the temporary ingress/egress paths (no_src_dst_placement), SRC arcs only carry
+    traffic from the ingress path of their request (total_flow_matches_expected_flow) and DST arcs only carry traffic
+    to placed DST instances (route_between_existing_instances).
+    :return: the keys of the lambda_total variables and the keys of the gamma variables
+    """
+    paths = list(indices.paths)
+    temporary_paths = [path for path in paths if __is_temporary_path(path)]
+    lambda_total = []
+    for arc in indices.arcs:
+        request = parameters.vnf_requests[get_request_from_arc(arc[0])]
+        starting_paths = ["ingress_" + str(request["ingress"])] if get_vnf_from_arc(arc[0]) == "SRC" else paths
+        ending_paths = temporary_paths if get_vnf_from_arc(arc[1]) == "DST" else paths
+        lambda_total.extend((arc, p, p_prime) for p in starting_paths for p_prime in ending_paths)
+
+    gamma = [(vnf, path) for vnf in indices.vnfs for path in paths if
+             vnf not in ["SRC", "DST"] or __is_temporary_path(path)]
+    return lambda_total, gamma
+
+
+def __reachable_nodes(neighbours, start):
+    visited = {start}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        for successor in neighbours[node]:
+            if successor not in visited:
+                visited.add(successor)
+                stack.append(successor)
+    return visited
+
+
+def __group_totals(lambda_total):
+    """
+    :return: the keys of the lambda_total variables grouped by the arc and the path of the starting VNF, by the arc and
+     the path of the ending VNF and by the arc, each in the order of the given keys
+    """
+    total_by_start = defaultdict(list)
+    total_by_end = defaultdict(list)
+    total_by_arc = defaultdict(list)
+    for arc, p, p_prime in lambda_total:
+        total_by_start[arc, p].append((arc, p, p_prime))
+        total_by_end[arc, p_prime].append((arc, p, p_prime))
+        total_by_arc[arc].append((arc, p, p_prime))
+    return total_by_start, total_by_end, total_by_arc
+
+
+def define_sparse_indices(parameters, indices):
+    """
+    Computes the index sets of the routing variables (lambda_inter, delta_inter, lambda_intra, delta_intra), of zeta,
+    lambda_total and gamma that can carry a non-zero value. Traffic of an arc whose VNFs are placed on p and p' leaves
+    at the destination of p and arrives at the source of p', thus only paths and edges lying on a walk between these
+    two nodes have to be modelled. Needs the network index of the model, i.e. is called after the temporary
+    ingress/egress paths have been added.
+    :param parameters: the parameters of the model
+    :param indices: the dense indices of the model
+    :return: the sparse indices
+    """
+    intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+    inter_domain_edges = parameters.network_description[key_inter_domain_edges]
+    border_nodes = set(indices.border_nodes)
+    network_index = indices.network
+
+    reachable = {}
+    co_reachable = {}
+    # paths, edges and nodes that can be used to route from a node s to a node t, computed once per node pair
+    routes = {}
+
+    def route_between(source, target):
+        if (source, target) not in routes:
+            if source not in reachable:
+                reachable[source] = __reachable_nodes(network_index.successors, source)
+            if target not in co_reachable:
+                co_reachable[target] = __reachable_nodes(network_index.predecessors, target)
+            if target not in reachable[source]:
+                routes[source, target] = ([], [], [])
+            else:
+                nodes = reachable[source] & co_reachable[target]
+                paths = [path_key for node in nodes for path_key in network_index.paths_starting_at[node] if
+                         intra_domain_paths[path_key]["dst"] in nodes]
+                edges = [edge_key for node in nodes for edge_key in network_index.edges_starting_at[node] if
+                         inter_domain_edges[edge_key]["dst"] in nodes]
+                routes[source, target] = (paths, edges, [node for node in nodes if node in border_nodes])
+        return routes[source, target]
+
+    lambda_total, gamma = __structurally_free_variables(parameters, indices)
+    placements = []
+    lambda_inter = []
+    lambda_intra = []
+    zeta = []
+    paths_of = {}
+    edges_of = {}
+    nodes_of = {}
+    inter_by_edge = defaultdict(list)
+    intra_by_path = defaultdict(list)
+
+    for arc in indices.arcs:
+        starting_paths, ending_paths = __placement_paths_of_arc(parameters, indices, arc)
+        for p in starting_paths:
+            source = intra_domain_paths[p]["dst"]
+            for p_prime in ending_paths:
+                placements.append((arc, p, p_prime))
+                target = intra_domain_paths[p_prime]["src"]
+                # chaining on the same path or adjacent paths do not need any routing
+                if p == p_prime or source == target:
+                    paths, edges, nodes = [], [], []
+                else:
+                    paths, edges, nodes = route_between(source, target)
+                    # routing over the placement path of the receiving VNF is never restricted, leave it out, the
+                    # temporary ingress/egress paths never route traffic, thus they have no routing variables
+                    paths = [p_prime_prime for p_prime_prime in paths if
+                             p_prime_prime != p_prime and not __is_temporary_path(p_prime_prime)]
+
+                if len(paths) > 0 or len(edges) > 0:
+                    paths_of[arc, p, p_prime] = paths
+                    edges_of[arc, p, p_prime] = edges
+                    nodes_of[arc, p, p_prime] = nodes
+                    for p_prime_prime in paths:
+                        lambda_intra.append((arc, p, p_prime, p_prime_prime))
+                        intra_by_path[p_prime_prime].append((arc, p, p_prime, p_prime_prime))
+                    for e in edges:
+                        lambda_inter.append((arc, p, p_prime, e))
+                        inter_by_edge[e].append((arc, p, p_prime, e))
+
+                zeta_nodes = set(nodes)
+                if source in border_nodes:
+                    zeta_nodes.add(source)
+                for b in zeta_nodes:
+                    zeta.append((arc, p, p_prime, b))
+
+    total_by_start, total_by_end, total_by_arc = __group_totals(lambda_total)
+    return SparseIndices(lambda_total=lambda_total, gamma=gamma, placements=placements, lambda_inter=lambda_inter,
+                         lambda_intra=lambda_intra, zeta=zeta,
+                         paths_of=paths_of, edges_of=edges_of, nodes_of=nodes_of, inter_by_edge=inter_by_edge,
+                         intra_by_path=intra_by_path, total_by_start=total_by_start, total_by_end=total_by_end,
+                         total_by_arc=total_by_arc)
+
+
+def restrict_sparse_indices(sparse, placements):
+    """
+    :param sparse: the sparse indices of a model
+    :param placements: a set of (arc, p, p') placements of the sparse indices
+    :return: the sparse indices of the variables of the given placements, the placement variables gamma are not bound
+     to an arc and remain unchanged
+    """
+    inter_by_edge = defaultdict(list)
+    for edge, keys in sparse.inter_by_edge.items():
+        inter_by_edge[edge] = [key for key in keys if key[:3] in placements]
+    intra_by_path = defaultdict(list)
+    for path, keys in sparse.intra_by_path.items():
+        intra_by_path[path] = [key for key in keys if key[:3] in placements]
+    lambda_total = [key for key in sparse.lambda_total if key in placements]
+    total_by_start, total_by_end, total_by_arc = __group_totals(lambda_total)
+    return SparseIndices(lambda_total=lambda_total, gamma=sparse.gamma,
+                         placements=[key for key in sparse.placements if key in placements],
+                         lambda_inter=[key for key in sparse.lambda_inter if key[:3] in placements],
+                         lambda_intra=[key for key in sparse.lambda_intra if key[:3] in placements],
+                         zeta=[key for key in sparse.zeta if key[:3] in placements],
+                         paths_of={key: value for key, value in sparse.paths_of.items() if key in placements},
+                         edges_of={key: value for key, value in sparse.edges_of.items() if key in placements},
+                         nodes_of={key: value for key, value in sparse.nodes_of.items() if key in placements},
+                         inter_by_edge=inter_by_edge, intra_by_path=intra_by_path, total_by_start=total_by_start,
+                         total_by_end=total_by_end, total_by_arc=total_by_arc)
+
+
+def define_variable_bounds(parameters, indices, use_indicators=False):
+    """
+    Derives upper bounds of the rate and cpu variables that hold in every feasible solution. They serve as variable
+    bounds and as the big-M values of the on/off constraints, which keeps the LP relaxation much tighter than a global
+    big-M. An arc never carries more than the rate of its request, routed traffic never more than the capacity of the
+    edge or path, a VNF never receives or emits more than the sum of its arcs and never demands more cpu than its path
+    offers. Needs the sparse indices of the model.
+    :param parameters: the parameters of the model
+    :param indices: the indices of the model
+    :param use_indicators: True, if the on/off constraints are to be modelled as indicator constraints
+    :return: the variable bounds
+    """
+    intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+    arc_rates = {arc: float(get_rate_of_arc(parameters, arc)) for arc in indices.arcs}
+    path_rates = {path: float(get_rate_of_path(parameters=parameters, path=path)) for path in indices.paths}
+    edge_rates = {edge: float(get_rate_of_link(parameters=parameters, link=edge)) for edge in indices.edges}
+
+    lambda_total = {key: arc_rates[key[0]] for key in indices.sparse.lambda_total}
+    lambda_inter = {key: min(arc_rates[key[0]], edge_rates[key[3]]) for key in indices.sparse.lambda_inter}
+    lambda_intra = {key: min(arc_rates[key[0]], path_rates[key[3]]) for key in indices.sparse.lambda_intra}
+
+    incoming_rates = defaultdict(float)
+    outgoing_rates = defaultdict(float)
+    for arc, rate in arc_rates.items():
+        outgoing_rates[get_vnf_from_arc(arc[0])] += rate
+        incoming_rates[get_vnf_from_arc(arc[1])] += rate
+
+    # a VNF that can structurally not be placed on a path does not receive any rate there
+    placeable = set(indices.sparse.gamma)
+    sigma_in = {}
+    sigma_out = {}
+    kappa = {}
+    for vnf in indices.vnfs:
+        cpu_consumption = get_vnf_functions(parameters).cpu_consumption[vnf]
+        for path in indices.paths:
+            cpu = float(intra_domain_paths[path]["cpu"])
+            # the cpu of a path is split into an exclusive and a shared part, kappa never exceeds their sum
+            kappa[vnf, path] = max(0.0, math.floor(cpu))
+            sigma_in[vnf, path] = incoming_rates[vnf] if vnf in incoming_rates else math.inf
+            if (vnf, path) not in placeable:
+                sigma_in[vnf, path] = 0.0
+            elif cpu_consumption.is_affine and cpu_consumption.slope > 0:
+                sigma_in[vnf, path] = min(sigma_in[vnf, path],
+                                          max(0.0, (cpu - cpu_consumption.intercept) / cpu_consumption.slope))
+            sigma_out[vnf, path] = outgoing_rates[vnf] if vnf in outgoing_rates else math.inf
+
+    return VariableBounds(lambda_total=lambda_total, lambda_inter=lambda_inter, lambda_intra=lambda_intra,
+                          sigma_in=sigma_in, sigma_out=sigma_out, kappa=kappa, beta=path_rates,
+                          use_indicators=use_indicators)
@@ -0,0 +1,555 @@
+"""
+Alternative construction of the gurobipy model using Gurobi's matrix API. All decision variables live in one MVar,
+all linear constraints are assembled as a sparse coefficient matrix with NumPy index arithmetic and handed to Gurobi
+with a single addMConstr call. Only the general (max/indicator/PWL) constraints are added through the standard API.
+The resulting model is equivalent to the one defined in gurobipy_mip, the decision variables are exposed as tupledicts
+of the same keys so that all solution handling code can be reused.
+"""
+from collections import defaultdict
+
+import numpy as np
+import scipy.sparse as sp
+# noinspection PyUnresolvedReferences
+from gurobipy import *
+
+from hvc.mip.models import *
+from hvc.mip.utils import *
+
+
+class ConstraintRows:
+    """
+    Collects linear constraints in coordinate format. Rows are either added one by one or as blocks of rows with the
+    same number of non-zeros and are turned into a single sparse matrix once the model is complete. Negative columns
+    denote variables that were left out of the model, their entries are dropped.
+    """
+
+    def __init__(self):
+        self.num_rows = 0
+        # coordinates of the rows added one by one, blocks are stored as arrays
+        self.__rows = []
+        self.__columns = []
+        self.__values = []
+        self.__senses = []
+        self.__rhs = []
+        self.__blocks = []
+
+    def add_row(self, columns, values, sense, rhs):
+        """
+        :param columns: the variable columns of the row
+        :param values: the coefficients of the columns
+        :param sense: one of GRB.LESS_EQUAL, GRB.EQUAL, GRB.GREATER_EQUAL
+        :param rhs: the constant right hand side
+        """
+        entries = [(column, value) for column, value in zip(columns, values) if column >= 0]
+        self.__rows.extend([self.num_rows] * len(entries))
+        self.__columns.extend(column for column, _ in entries)
+        self.__values.extend(value for _, value in entries)
+        self.__senses.append(sense)
+        self.__rhs.append(rhs)
+        self.num_rows += 1
+
+    def add_block(self, columns, values, sense, rhs):
+        """
+        Adds one row per line of columns.
+        :param columns: an integer array of shape (rows, non-zeros per row)
+        :param values: the coefficients, broadcastable to the shape of columns
+        :param sense: the sense shared by all rows
+        :param rhs: the right hand side, a scalar or one value per row
+        """
+        columns = np.asarray(columns, dtype=np.int64)
+        if columns.size == 0:
+            return
+        num_rows, num_entries = columns.shape
+        self.__flush()
+        rows = np.repeat(np.arange(self.num_rows, self.num_rows + num_rows), num_entries)
+        values = np.broadcast_to(np.asarray(values, dtype=float), columns.shape).ravel()
+        rhs = np.broadcast_to(np.asarray(rhs, dtype=float), (num_rows,))
+        columns = columns.ravel()
+        existing = columns >= 0
+        self.__blocks.append((rows[existing], columns[existing], values[existing], np.full(num_rows, sense), rhs))
+        self.num_rows += num_rows
+
+    def __flush(self):
+        if len(self.__senses) == 0:
+            return
+        self.__blocks.append((np.asarray(self.__rows, dtype=np.int64), np.asarray(self.__columns, dtype=np.int64),
+                              np.asarray(self.__values, dtype=float), np.asarray(self.__senses),
+                              np.asarray(self.__rhs, dtype=float)))
+        self.__rows, self.__columns, self.__values, self.__senses, self.__rhs = [], [], [], [], []
+
+    def to_matrix(self, num_columns):
+        """
+        :return: the constraint matrix in CSR format, the senses and the right hand sides of all rows
+        """
+        self.__flush()
+        if len(self.__blocks) == 0:
+            return sp.csr_matrix((0, num_columns)), np.empty(0, dtype="<U1"), np.empty(0)
+        rows, columns, values, senses, rhs = (np.concatenate(part) for part in zip(*self.__blocks))
+        # duplicate coordinates are summed up, just like repeated variables in a quicksum
+        matrix = sp.coo_matrix((values, (rows, columns)), shape=(self.num_rows, num_columns)).tocsr()
+        matrix.eliminate_zeros()
+        return matrix, senses, rhs
+
+
+class VariableLayout:
+    """
+    Assigns every decision variable a column of the single MVar of the model. Each family of variables occupies a
+    contiguous range of columns in the order of its keys.
+    """
+
+    def __init__(self):
+        self.num_columns = 0
+        self.columns = {}
+        self.__starts = {}
+        self.__vtypes = []
+        self.__upper_bounds = []
+        self.__names = []
+
+    def allocate(self, family, keys, vtype=GRB.CONTINUOUS, names=None, upper_bounds=None):
+        """
+        :param family: the name of the variable family, also used as variable name if no names are given
+        :param keys: the keys of the variables
+        :param names: optional explicit names of the variables
+        :param upper_bounds: optional dict mapping the keys to their upper bounds
+        :return: the first column of the family
+        """
+        keys = list(keys)
+        start = self.num_columns
+        self.__starts[family] = start
+        self.columns[family] = {key: start + index for index, key in enumerate(keys)}
+        self.__vtypes.extend([vtype] * len(keys))
+        if upper_bounds is not None:
+            self.__upper_bounds.extend(min(upper_bounds[key], GRB.INFINITY) for key in keys)
+        else:
+            self.__upper_bounds.extend([1.0 if vtype == GRB.BINARY else GRB.INFINITY] * len(keys))
+        if names is None:
+            names = [variable_name(family, key) for key in keys]
+        self.__names.extend(names)
+        self.num_columns += len(keys)
+        return start
+
+    def block(self, family):
+        """
+        :return: the columns of a family as an integer array, in the order of its keys
+        """
+        return np.arange(self.__starts[family], self.__starts[family] + len(self.columns[family]))
+
+    def dense_block(self, family, *positions):
+        """
+        Arranges the columns of a family whose keys are tuples in an array with one axis per key element.
+        :param positions: for each key element a dict mapping the element to its position on the axis
+        :return: the array of columns, -1 for keys that are not part of the family
+        """
+        columns = np.full(tuple(len(position) for position in positions), -1, dtype=np.int64)
+        for key, column in self.columns[family].items():
+            columns[tuple(position[element] for position, element in zip(positions, key))] = column
+        return columns
+
+    def add_to_model(self, model):
+        """
+        Adds all allocated columns as a single MVar to the model.
+        :return: the Var objects of all columns
+        """
+        variables = model.addMVar(self.num_columns, lb=0.0, ub=np.asarray(self.__upper_bounds),
+                                  vtype=np.asarray(self.__vtypes), name=self.__names)
+        return variables, variables.tolist()
+
+    def tupledict_of(self, family, variables):
+        return tupledict({key: variables[column] for key, column in self.columns[family].items()})
+
+
+def __define_columns(indices, layout):
+    bounds = indices.bounds
+    layout.allocate("lambda_total", indices.sparse.lambda_total, upper_bounds=bounds.lambda_total)
+    layout.allocate("lambda_inter", indices.sparse.lambda_inter, upper_bounds=bounds.lambda_inter)
+    layout.allocate("lambda_intra", indices.sparse.lambda_intra, upper_bounds=bounds.lambda_intra)
+    layout.allocate("sigma_in", itertools.product(indices.vnfs, indices.paths), upper_bounds=bounds.sigma_in)
+    layout.allocate("sigma_out", itertools.product(indices.vnfs, indices.paths), upper_bounds=bounds.sigma_out)
+    layout.allocate("delta_inter", indices.sparse.lambda_inter, vtype=GRB.BINARY)
+    layout.allocate("delta_intra", indices.sparse.lambda_intra, vtype=GRB.BINARY)
+    layout.allocate("gamma", indices.sparse.gamma, vtype=GRB.BINARY)
+    layout.allocate("kappa", itertools.product(indices.vnfs, indices.paths), vtype=GRB.INTEGER,
+                    upper_bounds=bounds.kappa)
+    layout.allocate("beta", indices.paths, upper_bounds=bounds.beta)
+    layout.allocate("epsilon", itertools.product(indices.cpu_restrictions, indices.paths))
+    layout.allocate("zeta", indices.sparse.zeta)
+
+
+def __define_linear_constraints(parameters, indices, layout, rows):
+    """
+    Adds the rows of all linear constraints, numbered as in gurobipy_mip.
+    :return: the (resultant column, argument columns) pairs of the max constraints of the path rate definition, the
+     (variable column, switch column) pairs of the indicator constraints and the (argument column, value column,
+     function) triples of the PWL constraints of piecewise-linear VNF functions
+    """
+    intra_domain_paths = parameters.network_description[key_intra_domain_paths]
+    cpu_restrictions = parameters.advertised_restrictions["cpu_restrictions"]
+    paths = list(indices.paths)
+    arcs = indices.arcs
+    vnfs = indices.vnfs
+    num_paths, num_vnfs = len(paths), len(vnfs)
+    path_position = {path: index for index, path in enumerate(paths)}
+    vnf_position = {vnf: index for index, vnf in enumerate(vnfs)}
+
+    sigma_in = layout.block("sigma_in").reshape(num_vnfs, num_paths)
+    sigma_out = layout.block("sigma_out").reshape(num_vnfs, num_paths)
+    gamma = layout.dense_block("gamma", vnf_position, path_position)
+    kappa = layout.block("kappa").reshape(num_vnfs, num_paths)
+    beta = layout.block("beta")
+    epsilon = layout.block("epsilon").reshape(len(indices.cpu_restrictions), num_paths)
+    lambda_inter = layout.block("lambda_inter")
+    lambda_intra = layout.block("lambda_intra")
+    lambda_inter_columns = layout.columns["lambda_inter"]
+    lambda_intra_columns = layout.columns["lambda_intra"]
+    lambda_total_columns = layout.columns["lambda_total"]
+
+    def total(arc, p, p_prime):
+        # variables that are structurally fixed to zero are not part of the model and have column -1
+        return lambda_total_columns.get((arc, p, p_prime), -1)
+
+    def totals(keys):
+        return [lambda_total_columns[key] for key in keys]
+
+    functions = get_vnf_functions(parameters)
+    indicators = []
+    pwl_constraints = []
+
+    def function_values(function, arguments, names):
+        # value columns of a piecewise-linear function applied to the argument columns, see __function_value
+        start = layout.allocate(names[0] + "_value", range(len(names)), names=[name + "_value" for name in names])
+        values = np.arange(start, start + len(names))
+        pwl_constraints.extend(zip(np.asarray(arguments).tolist(), values.tolist(), [function] * len(names)))
+        return values
+
+    def on_off(variables, switches, upper_bounds):
+        # the variables can only be non-zero if their binary switch is 1, switches with column -1 do not exist
+        variables = np.asarray(variables, dtype=np.int64)
+        switches = np.asarray(switches, dtype=np.int64)
+        if variables.size == 0:
+            return
+        if indices.bounds.use_indicators:
+            missing = switches < 0
+            rows.add_block(variables[missing].reshape(-1, 1), 1.0, GRB.LESS_EQUAL, 0.0)
+            indicators.extend(zip(variables[~missing].tolist(), switches[~missing].tolist()))
+        else:
+            upper_bounds = np.asarray(upper_bounds, dtype=float)
+            big_m = np.where(np.isfinite(upper_bounds), upper_bounds, bigM)
+            rows.add_block(np.column_stack([variables, switches]),
+                           np.column_stack([np.ones(variables.size), -big_m]), GRB.LESS_EQUAL, 0.0)
+
+    def routing_columns(arc, p, p_prime, paths_at_node, edges_at_node):
+        # lambda_intra/lambda_inter columns of the traffic (arc, p, p_prime) routed over the given paths and edges
+        return [lambda_intra_columns[arc, p, p_prime, p_prime_prime] for p_prime_prime in paths_at_node if
+                p_prime_prime != p_prime and (arc, p, p_prime, p_prime_prime) in lambda_intra_columns] + \
+               [lambda_inter_columns[arc, p, p_prime, e] for e in edges_at_node if
+                (arc, p, p_prime, e) in lambda_inter_columns]
+
+    # 1. / 2. outgoing rate and cpu demand depend on incoming rate
+    for vnf in vnfs:
+        position = vnf_position[vnf]
+        function = functions.outgoing_rate[vnf]
+        if function.is_affine:
+            rows.add_block(np.column_stack([sigma_out[position], sigma_in[position]]), [1.0, -function.slope],
+                           GRB.EQUAL, function.intercept)
+        else:
+            values = function_values(function, sigma_in[position], ["outrate_" + vnf + "_" + path for path in paths])
+            rows.add_block(np.column_stack([sigma_out[position], values]), [1.0, -1.0], GRB.EQUAL, 0.0)
+        function = functions.cpu_consumption[vnf]
+        if function.is_affine:
+            rows.add_block(np.column_stack([kappa[position], sigma_in[position]]), [1.0, -function.slope],
+                           GRB.GREATER_EQUAL, function.intercept)
+        else:
+            values = function_values(function, sigma_in[position],
+                                     ["cpu_consumption_" + vnf + "_" + path for path in paths])
+            rows.add_block(np.column_stack([kappa[position], values]), [1.0, -1.0], GRB.GREATER_EQUAL, 0.0)
+
+    # 3. inter domain edges capacity constraint
+    for edge in indices.edges:
+        columns = [lambda_inter_columns[key] for key in indices.sparse.inter_by_edge[edge]]
+        rows.add_row(columns, [1.0] * len(columns), GRB.LESS_EQUAL, float(get_rate_of_link(parameters, edge)))
+
+    # 4. / 5. Big-M inter and intra domain edges
+    inter_bounds = [indices.bounds.lambda_inter[key] for key in indices.sparse.lambda_inter]
+    intra_bounds = [indices.bounds.lambda_intra[key] for key in indices.sparse.lambda_intra]
+    on_off(lambda_inter, layout.block("delta_inter"), inter_bounds)
+    on_off(lambda_intra, layout.block("delta_intra"), intra_bounds)
+
+    # 6. Big-M placement, a VNF that can structurally not be placed on a path has an upper bound of 0 on its incoming
+    # rate there
+    placeable = gamma.ravel() >= 0
+    on_off(sigma_in.ravel()[placeable], gamma.ravel()[placeable],
+           np.asarray([indices.bounds.sigma_in[key] for key in itertools.product(vnfs, paths)])[placeable])
+
+    # 7. / 8. out- and inrate of a component is distributed among the arcs
+    arcs_starting_with = defaultdict(list)
+    arcs_ending_with = defaultdict(list)
+    for arc in arcs:
+        arcs_starting_with[get_vnf_from_arc(arc[0])].append(arc)
+        arcs_ending_with[get_vnf_from_arc(arc[1])].append(arc)
+    for vnf in vnfs:
+        position = vnf_position[vnf]
+        if len(arcs_starting_with[vnf]) > 0:
+            for path_index, path in enumerate(paths):
+                columns = totals(key for arc in arcs_starting_with[vnf] for key in indices.sparse.total_by_start[arc, path])
+                rows.add_row([sigma_out[position, path_index]] + columns, [1.0] + [-1.0] * len(columns), GRB.EQUAL,
+                             0.0)
+        if len(arcs_ending_with[vnf]) > 0:
+            for path_index, path in enumerate(paths):
+                columns = totals(key for arc in arcs_ending_with[vnf] for key in indices.sparse.total_by_end[arc, path])
+                rows.add_row([sigma_in[position, path_index]] + columns, [1.0] + [-1.0] * len(columns), GRB.EQUAL,
+                             0.0)
+
+    # 9. CPU constraint
+    exclusive_cpu = np.array([float(get_cpu_of_path(parameters, path)) - sum(
+        cpu_restrictions[constraint_key]["shared_cpu"] for constraint_key in indices.cpu_restrictions if
+        path in cpu_restrictions[constraint_key]["paths"]) for path in paths])
+    rows.add_block(np.column_stack([kappa.T, epsilon.T]),
+                   np.concatenate([np.ones(num_vnfs), -np.ones(epsilon.shape[0])]), GRB.LESS_EQUAL, exclusive_cpu)
+
+    # 10. advertised cpu constraint
+    for position, cpu_restriction in enumerate(indices.cpu_restrictions):
+        columns = [epsilon[position, path_position[path]] for path in cpu_restrictions[cpu_restriction]["paths"]]
+        rows.add_row(columns, [1.0] * len(columns), GRB.LESS_EQUAL,
+                     float(cpu_restrictions[cpu_restriction]["shared_cpu"]))
+
+    # 12. - 15. flow conservation at ingresses and egresses
+    arcs_of_request = defaultdict(list)
+    for arc in arcs:
+        arcs_of_request[get_request_from_arc(arc[0])].append(arc)
+    for request_key, request in parameters.vnf_requests.items():
+        ingress_path = "ingress_" + str(request["ingress"])
+        egress_path = "egress_" + str(request["egress"])
+        for path_key in indices.network.paths_starting_at[ingress_path]:
+            if intra_domain_paths[path_key]["dst"] == request["ingress"]:
+                rows.add_row([gamma[vnf_position["SRC"], path_position[path_key]]], [1.0], GRB.EQUAL, 1.0)
+        for path_key in indices.network.paths_ending_at[egress_path]:
+            if intra_domain_paths[path_key]["src"] == request["egress"]:
+                rows.add_row([gamma[vnf_position["DST"], path_position[path_key]]], [1.0], GRB.EQUAL, 1.0)
+
+        columns = totals(key for arc in arcs_of_request[request_key] if get_vnf_from_arc(arc[0]) == "SRC" for key in
+                         indices.sparse.total_by_start[arc, ingress_path] if key[2] != ingress_path)
+        rows.add_row(columns, [1.0] * len(columns), GRB.EQUAL, float(request["initial_rate"]))
+
+        outgoing_rate = get_chain_rates(parameters, request_key)[-1]
+        columns = totals(key for arc in arcs_of_request[request_key] if get_vnf_from_arc(arc[1]) == "DST" for key in
+                         indices.sparse.total_by_end[arc, egress_path] if key[1] != egress_path)
+        rows.add_row(columns, [1.0] * len(columns), GRB.EQUAL, float(outgoing_rate))
+
+    # 16. flow conservation at border nodes
+    for (arc, p, p_prime), nodes in indices.sparse.nodes_of.items():
+        for border_node in nodes:
+            if "ingress" in border_node or "egress" in border_node or border_node == intra_domain_paths[p]["dst"] \
+                    or border_node == intra_domain_paths[p_prime]["src"]:
+                continue
+            incoming = routing_columns(arc, p, p_prime, [path for path in indices.network.paths_ending_at[
+                border_node] if path != p], indices.network.edges_ending_at[border_node])
+            outgoing = routing_columns(arc, p, p_prime, [path for path in indices.network.paths_starting_at[
+                border_node] if path != p], indices.network.edges_starting_at[border_node])
+            rows.add_row(incoming + outgoing, [1.0] * len(incoming) + [-1.0] * len(outgoing), GRB.EQUAL, 0.0)
+
+    # 17. beta definition for paths, the maximum over the requests is a general constraint
+    max_constraints = []
+    for p in paths:
+        request_rates = []
+        for request_key, request in parameters.vnf_requests.items():
+            vnf_chain = [(arc[0] + "_" + request_key, arc[1] + "_" + request_key) for arc in
+                         parameters.chains[request["vnf_chain"]]]
+            box_start = layout.allocate("box_" + request_key + "_" + p, range(len(vnf_chain)),
+                                        names=[""] * len(vnf_chain))
+            for index, pair in enumerate(vnf_chain):
+                first_sum = totals(key for arc in vnf_chain[1:index + 1] for key in indices.sparse.total_by_start[arc, p]
+                                   if key[2] != p)
+                third_sum = totals(key for arc in vnf_chain[index:] for key in indices.sparse.total_by_end[arc, p] if
+                                   key[1] != p)
+                columns = [box_start + index, total(pair, p, p)] + first_sum + third_sum
+                rows.add_row(columns, [1.0] + [-1.0] * (len(columns) - 1), GRB.EQUAL, 0.0)
+            request_rate = layout.allocate("rate_" + request_key + "_" + p, [0], names=[request_key + "_" + p])
+            max_constraints.append((request_rate, list(range(box_start, box_start + len(vnf_chain)))))
+            request_rates.append(request_rate)
+        routed = [lambda_intra_columns[key] for key in indices.sparse.intra_by_path[p] if key[1] != p and key[2] != p]
+        rows.add_row(request_rates + routed + [beta[path_position[p]]],
+                     [1.0] * (len(request_rates) + len(routed)) + [-1.0], GRB.EQUAL, 0.0)
+
+    # 18. / 19. can only route from and to existing vnfs with intra domain paths
+    starting_gamma = [gamma[vnf_position[get_vnf_from_arc(arc[0])], path_position[p]] for arc, p, p_prime, _ in
+                      indices.sparse.lambda_intra]
+    ending_gamma = [gamma[vnf_position[get_vnf_from_arc(arc[1])], path_position[p_prime]] for arc, p, p_prime, _ in
+                    indices.sparse.lambda_intra]
+    on_off(lambda_intra, starting_gamma, intra_bounds)
+    on_off(lambda_intra, ending_gamma, intra_bounds)
+
+    # 20. / 21. only route from and to existing vnfs on inter domain edges
+    routed_totals = [total(arc, p, p_prime) for arc, p, p_prime, _ in indices.sparse.lambda_inter]
+    if len(lambda_inter) > 0:
+        rows.add_block(np.column_stack([lambda_inter, routed_totals]), [1.0, -1.0], GRB.LESS_EQUAL, 0.0)
+        rows.add_block(np.column_stack([lambda_inter, routed_totals]), [1.0, -1.0], GRB.LESS_EQUAL, 0.0)
+
+    # 22. / 23. flow conservation at ending and starting paths
+    for arc, p, p_prime in indices.sparse.lambda_total:
+        border_node = intra_domain_paths[p_prime]["src"]
+        paths_ending_at_border_node = indices.network.paths_ending_at[border_node]
+        outgoing = routing_columns(arc, p, p_prime, indices.network.paths_starting_at[border_node],
+                                   indices.network.edges_starting_at[border_node])
+        incoming = routing_columns(arc, p, p_prime, paths_ending_at_border_node,
+                                   indices.network.edges_ending_at[border_node])
+        values = [1.0] * len(outgoing) + [-1.0] * len(incoming)
+        if p != p_prime and p not in paths_ending_at_border_node:
+            rows.add_row(outgoing + incoming + [total(arc, p, p_prime)], values + [1.0], GRB.EQUAL, 0.0)
+        if p in paths_ending_at_border_node:
+            rows.add_row(outgoing + incoming, values, GRB.EQUAL, 0.0)
+
+        border_node = intra_domain_paths[p]["dst"]
+        paths_starting_at_border_node = indices.network.paths_starting_at[border_node]
+        outgoing = routing_columns(arc, p, p_prime, paths_starting_at_border_node,
+                                   indices.network.edges_starting_at[border_node])
+        incoming = routing_columns(arc, p, p_prime, indices.network.paths_ending_at[border_node],
+                                   indices.network.edges_ending_at[border_node])
+        values = [-1.0] * len(outgoing) + [1.0] * len(incoming)
+        if p != p_prime and p_prime not in paths_starting_at_border_node:
+            rows.add_row(outgoing + incoming + [total(arc, p, p_prime)], values + [1.0], GRB.EQUAL, 0.0)
+        if p_prime in paths_starting_at_border_node:
+            rows.add_row(outgoing + incoming, values, GRB.EQUAL, 0.0)
+
+    # 24. SRC or DST placement on the temporary paths, on all other paths they are not part of the model
+    temporary_paths = [index for index, path in enumerate(paths) if "ingress" in path or "egress" in path]
+    rows.add_block(np.column_stack([gamma[vnf_position["SRC"], temporary_paths],
+                                    gamma[vnf_position["DST"], temporary_paths]]), [1.0, 1.0], GRB.EQUAL, 1.0)
+
+    # 25. the temporary ingress/egress paths have no lambda_intra variables, no flow is routed over them
+
+    # 26. total flow has to match the initial flow
+    for arc in arcs:
+        request = parameters.vnf_requests[get_request_from_arc(arc[0])]
+        ingress_path = "ingress_" + request["ingress"]
+        outgoing_rate = get_rate_of_arc(parameters, arc)
+        if "SRC" in arc[0]:
+            columns = totals(indices.sparse.total_by_start[arc, ingress_path])
+            rows.add_row(columns, [1.0] * len(columns), GRB.EQUAL, float(request["initial_rate"]))
+        elif "DST" in arc[1]:
+            columns = totals(indices.sparse.total_by_end[arc, "egress_" + request["egress"]])
+            rows.add_row(columns, [1.0] * len(columns), GRB.EQUAL, float(outgoing_rate))
+        else:
+            columns = totals(indices.sparse.total_by_arc[arc])
+            rows.add_row(columns, [1.0] * len(columns), GRB.EQUAL, float(outgoing_rate))
+
+    # 27. paths that are not a part of a shared cpu constraint cannot use its cpu
+    unrelated = [epsilon[position, path_position[path]] for position, cpu_restriction in
+                 enumerate(indices.cpu_restrictions) for path in paths if
+                 path not in cpu_restrictions[cpu_restriction]["paths"]]
+    rows.add_block(np.asarray(unrelated, dtype=np.int64).reshape(-1, 1), 1.0, GRB.EQUAL, 0.0)
+
+    # 28. path capacity must not be exceeded
+    rows.add_block(beta.reshape(-1, 1), 1.0, GRB.LESS_EQUAL,
+                   np.array([int(get_rate_of_path(parameters, path)) for path in paths], dtype=float))
+
+    # 29. advertised path capacities
+    for routing_restriction in indices.routing_restrictions:
+        restriction = parameters.advertised_restrictions["routing_restrictions"][routing_restriction]
+        columns = [beta[path_position[path]] for path in restriction["paths"]]
+        rows.add_row(columns, [1.0] * len(columns), GRB.LESS_EQUAL, float(restriction["shared_bottleneck"]))
+
+    # 30. shared capacity of forward and backward edges
+    if "routing_restriction_edges" in parameters.advertised_restrictions:
+        for restriction in parameters.advertised_restrictions["routing_restriction_edges"].values():
+            columns = [lambda_inter_columns[key] for e in restriction["edges"] for key in
+                       indices.sparse.inter_by_edge[e]]
+            rows.add_row(columns, [1.0] * len(columns), GRB.LESS_EQUAL, float(restriction["shared_bottleneck"]))
+
+    # 31. the rate leaving a VNF for a request depends on the rate entering it for the same request
+    # (vnf, request) -> the first arc of the request ending respectively starting with the vnf
+    arc_ending_with = {}
+    arc_starting_with = {}
+    for arc in arcs:
+        arc_ending_with.setdefault((get_vnf_from_arc(arc[1]), get_request_from_arc(arc[1])), arc)
+        arc_starting_with.setdefault((get_vnf_from_arc(arc[0]), get_request_from_arc(arc[0])), arc)
+    for vnf, path in itertools.product(vnfs, paths):
+        if "SRC" in vnf or "DST" in vnf or "ingress" in path or "egress" in path:
+            continue
+        function = functions.outgoing_rate[vnf]
+        for request in parameters.vnf_requests.keys():
+            arc_ending_with_vnf = arc_ending_with.get((vnf, request))
+            arc_starting_with_vnf = arc_starting_with.get((vnf, request))
+            if arc_ending_with_vnf is not None and arc_starting_with_vnf is not None:
+                incoming = totals(indices.sparse.total_by_end[arc_ending_with_vnf, path])
+                outgoing = totals(indices.sparse.total_by_start[arc_starting_with_vnf, path])
+                if function.is_affine:
+                    rows.add_row(incoming + outgoing, [function.slope] * len(incoming) + [-1.0] * len(outgoing),
+                                 GRB.EQUAL, -function.intercept)
+                else:
+                    name = "lambda_distribution_" + vnf + "_" + path + "_" + request
+                    rate = layout.allocate(name, [0], names=[name + "_rate"])
+                    rows.add_row([rate] + incoming, [1.0] + [-1.0] * len(incoming), GRB.EQUAL, 0.0)
+                    value = function_values(function, [rate], [name])[0]
+                    rows.add_row([value] + outgoing, [1.0] + [-1.0] * len(outgoing), GRB.EQUAL, 0.0)
+
+    # route only between existing instances, one entry per lambda_total variable
+    lambda_total = layout.block("lambda_total")
+    starting_gamma = [gamma[vnf_position[get_vnf_from_arc(arc[0])], path_position[p]] for arc, p, _ in
+                      indices.sparse.lambda_total]
+    ending_gamma = [gamma[vnf_position[get_vnf_from_arc(arc[1])], path_position[p_prime]] for arc, _, p_prime in
+                    indices.sparse.lambda_total]
+    total_bounds = [indices.bounds.lambda_total[key] for key in indices.sparse.lambda_total]
+    on_off(lambda_total, starting_gamma, total_bounds)
+    on_off(lambda_total, ending_gamma, total_bounds)
+
+    return max_constraints, indicators, pwl_constraints
+
+
+def __objective_coefficients(parameters, indices, layout):
+    """
+    :return: the coefficient vectors of the three objectives of the model
+    """
+    objectives = np.zeros((3, layout.num_columns))
+    delta_inter = layout.block("delta_inter")
+    delta_intra = layout.block("delta_intra")
+    inter_delays = np.array([get_delay_of_link(parameters, e) for _, _, _, e in indices.sparse.lambda_inter],
+                            dtype=float)
+    intra_delays = np.array([get_delay_of_path(parameters, p_prime_prime) for _, _, _, p_prime_prime in
+                             indices.sparse.lambda_intra], dtype=float)
+    # number of placements and delay
+    objectives[0, layout.block("gamma")] = 1.0
+    objectives[0, delta_inter] = inter_delays
+    objectives[0, delta_intra] = intra_delays
+    # delay
+    objectives[1, delta_inter] = inter_delays
+    objectives[1, delta_intra] = intra_delays
+    # number of used paths and edges
+    objectives[2, delta_inter] = 1.0
+    objectives[2, delta_intra] = 1.0
+    return objectives
+
+
+def define_model(parameters, indices, model):
+    """
+    Defines the decision variables, the linear constraints and the objectives of the model through the matrix API.
+    The delay constraints are not part of this, they are general constraints and are added by gurobipy_mip on top.
+    Needs the sparse indices and the network index of the model.
+    :param parameters: the parameters of the model
+    :param indices: the indices of the model
+    :param model: an empty gurobipy model
+    :return: the decision variables, each family is a tupledict with the same keys as in gurobipy_mip
+    """
+    layout = VariableLayout()
+    __define_columns(indices, layout)
+    rows = ConstraintRows()
+    max_constraints, indicators, pwl_constraints = __define_linear_constraints(parameters, indices, layout, rows)
+
+    x, variables = layout.add_to_model(model)
+    matrix, senses, rhs = rows.to_matrix(layout.num_columns)
+    model.addMConstr(matrix, x, senses, rhs)
+    for resultant, arguments in max_constraints:
+        model.addGenConstrMax(variables[resultant], [variables[column] for column in arguments])
+    for variable, switch in indicators:
+        model.addGenConstrIndicator(variables[switch], False, variables[variable] <= 0)
+    for argument, value, function in pwl_constraints:
+        model.addGenConstrPWL(variables[argument], variables[value], *function.pwl_points())
+
+    # setMObjective only knows a single objective, the hierarchical objectives are set from the same coefficients
+    for index, coefficients in enumerate(__objective_coefficients(parameters, indices, layout)):
+        non_zeros = np.flatnonzero(coefficients)
+        model.setObjectiveN(LinExpr(coefficients[non_zeros].tolist(), [variables[column] for column in non_zeros]),
+                            index=index, priority=3 - index, weight=1.0)
+
+    return DecisionVariables(**{family: layout.tupledict_of(family, variables) for family in
+                                ["lambda_total", "lambda_inter", "lambda_intra", "sigma_in", "sigma_out",
+                                 "delta_inter", "delta_intra", "gamma", "kappa", "beta", "epsilon", "zeta"]})
@@ -0,0 +1,132 @@
+"""
+Content addressed cache of built models. Experiment sweeps solve the same inputs under many seeds and thread counts,
+with the cache the model of an input is only built once. An entry consists of the model as MPS file and a pickle of
+the parameters, the indices and the position of every decision variable in the model, the entries are keyed by a hash
+of the inputs (files or in-memory descriptions) and of the options the model was built with.
+"""
+import copy
+import hashlib
+import json
+import os
+import pickle
+import shutil
+
+import gurobipy
+from gurobipy import tupledict
+
+from hvc.mip.models import DecisionVariables
+from hvc.mip.utils import setup_logger
+
+logger = setup_logger("model_cache", "model_cache.log")
+
+# part of every key, increase it whenever the formulation of the model changes to invalidate existing entries
+cache_version = 3
+
+decision_variable_families = ["lambda_total", "lambda_inter", "lambda_intra", "sigma_in", "sigma_out", "delta_inter",
+                              "delta_intra", "gamma", "kappa", "beta", "epsilon", "zeta"]
+
+
+class ModelCache:
+    def __init__(self, directory, max_size=None):
+        """
+        :param directory: the folder the entries are stored in, created if it does not exist
+        :param max_size: the maximal total size of all entries in bytes, the least recently used entries are evicted
+         once it is exceeded, None if the cache is unbounded
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(inputs, options):
+        """
+        :param inputs: the inputs of the model, either the paths of its input files or the descriptions themselves (see
+         Parameters.descriptions)
+        :param options: a dict of the options the model is built with
+        :return: the hash of the contents of the inputs and of the options
+        """
+        digest = hashlib.sha256("{}|{}".format(cache_version, sorted(options.items())).encode())
+        for model_input in inputs:
+            if isinstance(model_input, str):
+                with open(model_input, 'rb') as input_file:
+                    content = input_file.read()
+            else:
+                content = json.dumps(model_input, sort_keys=True, default=str).encode()
+            digest.update(hashlib.sha256(content).digest())
+        return digest.hexdigest()
+
+    def __entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, key):
+        """
+        :return: the parameters, indices, decision variables and model of the entry, None if there is no entry
+        """
+        entry = self.__entry(key)
+        if not os.path.isfile(os.path.join(entry, "index.pickle")):
+            return None
+        with open(os.path.join(entry, "index.pickle"), 'rb') as index_file:
+            index = pickle.load(index_file)
+        model = gurobipy.read(os.path.join(entry, "model.mps"))
+        variables = model.getVars()
+        # names containing whitespace are not preserved by the MPS format
+        model.setAttr("VarName", variables, index["variable_names"])
+        decision_variables = DecisionVariables(**{
+            family: tupledict({key: variables[column] for key, column in columns}) for family, columns in
+            index["columns"].items()})
+        # mark the entry as recently used
+        os.utime(entry)
+        logger.info("Loaded model {} from the cache".format(key))
+        return index["parameters"], index["indices"], decision_variables, model
+
+    def store(self, key, parameters, indices, decision_variables, model):
+        """
+        Adds a built model to the cache and evicts the least recently used entries if the cache is too large.
+        """
+        model.update()
+        # the compiled VNF functions are compiled again on first use, dict views of the descriptions cannot be pickled
+        parameters = copy.copy(parameters)
+        parameters.vnf_functions = None
+        indices = copy.copy(indices)
+        for attribute in ["cpu_restrictions", "paths", "edges", "routing_restrictions"]:
+            setattr(indices, attribute, list(getattr(indices, attribute)))
+        index = {
+            "parameters": parameters,
+            "indices": indices,
+            "variable_names": model.getAttr("VarName", model.getVars()),
+            "columns": {family: [(key, variable.index) for key, variable in
+                                 getattr(decision_variables, family).items()] for family in
+                        decision_variable_families},
+        }
+
+        # write to a temporary folder first, concurrent runs must never see a partial entry
+        temporary = self.__entry("{}.{}.tmp".format(key, os.getpid()))
+        os.makedirs(temporary, exist_ok=True)
+        model.write(os.path.join(temporary, "model.mps"))
+        with open(os.path.join(temporary, "index.pickle"), 'wb') as index_file:
+            pickle.dump(index, index_file)
+        try:
+            os.rename(temporary, self.__entry(key))
+        except OSError:
+            # another run stored the same model in the meantime
+            shutil.rmtree(temporary, ignore_errors=True)
+        logger.info("Stored model {} in the cache".format(key))
+        self.__evict(keep=key)
+
+    def __size(self, entry):
+        return sum(os.path.getsize(os.path.join(entry, file)) for file in os.listdir(entry))
+
+    def __evict(self, keep):
+        if self.max_size is None:
+            return
+        entries = [self.__entry(key) for key in os.listdir(self.directory) if not key.endswith(".tmp")]
+        sizes = {entry: self.__size(entry) for entry in entries}
+        total_size = sum(sizes.values())
+        for entry in sorted(entries, key=os.path.getmtime):
+            if total_size <= self.max_size:
+                break
+            if entry == self.__entry(keep):
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= sizes[entry]
+            logger.info("Evicted model {} from the cache".format(os.path.basename(entry)))
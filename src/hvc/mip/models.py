@@ -5,6 +5,16 @@ class Parameters:
         self.chains = kwargs["chains"]
         self.vnf_requests = kwargs["vnf_requests"]
         self.advertised_restrictions = kwargs["advertised_restrictions"]
+        # compiled rate and cpu functions, see utils.get_vnf_functions
+        self.vnf_functions = kwargs.get("vnf_functions")
+
+    def descriptions(self):
+        """
+        :return: the descriptions in the order of the parameter files, e.g. to compute a ModelCache key of parameters
+         that were not read from files
+        """
+        return [self.network_description, self.vnf_description, self.chains, self.vnf_requests,
+                self.advertised_restrictions]
 
 
 class DecisionVariables:
@@ -21,6 +31,55 @@ class DecisionVariables:
         self.beta = kwargs["beta"]
         self.epsilon = kwargs["epsilon"]
         self.zeta = kwargs["zeta"]
+        # binary switches of the placements that need no routing, only defined for lazy delay constraints
+        self.placement_switches = kwargs.get("placement_switches")
+
+
+class SolvePolicy:
+    """
+    How the three hierarchical objectives of a model (placements and delay, delay, number of used edges and paths) are
+    optimized. The lists hold one entry per objective, None leaves the Gurobi default.
+    mode "hierarchical" optimizes the objectives one after another, "blended" optimizes the weighted sum of the
+    objectives in a single pass (which uses the first time limit and gap), "primary" only optimizes the first objective.
+    """
+    modes = ["hierarchical", "blended", "primary"]
+
+    def __init__(self, **kwargs):
+        self.mode = kwargs.get("mode", "hierarchical")
+        if self.mode not in SolvePolicy.modes:
+            raise ValueError("Unknown solve mode {}, known modes are {}".format(self.mode, SolvePolicy.modes))
+        # TimeLimit of each objective in seconds
+        self.time_limits = kwargs.get("time_limits", [None, None, None])
+        # MIPGap of each objective
+        self.mip_gaps = kwargs.get("mip_gaps", [None, None, None])
+        # ObjNRelTol, the relative degradation of an objective allowed when optimizing the lower priority ones
+        self.relative_tolerances = kwargs.get("relative_tolerances", [None, None, None])
+        # weights of the objectives in the blended mode
+        self.weights = kwargs.get("weights", [1.0, 1e-2, 1e-4])
+
+
+class SeedResult:
+    def __init__(self, **kwargs):
+        self.seed = kwargs["seed"]
+        self.status = kwargs["status"]
+        # in seconds
+        self.runtime = kwargs["runtime"]
+        # None if no solution was found
+        self.objective_values = kwargs["objective_values"]
+
+    def to_yaml_dict(self):
+        return {'status': self.status, 'runtime_ms': self.runtime * 1000, 'objective_values': self.objective_values}
+
+
+class SolvedVariable:
+    """
+    A decision variable whose value was determined without a gurobipy model (e.g. by the placement heuristic). It has
+    the attributes of a solved gurobipy Var that the solution handling relies on.
+    """
+
+    def __init__(self, **kwargs):
+        self.VarName = kwargs["name"]
+        self.X = kwargs["value"]
 
 
 class Indices:
@@ -32,6 +91,47 @@ class Indices:
         self.border_nodes = kwargs["border_nodes"]
         self.vnfs = kwargs["vnfs"]
         self.routing_restrictions = kwargs["routing_restrictions"]
+        self.sparse = kwargs.get("sparse")
+        self.network = kwargs.get("network")
+        self.bounds = kwargs.get("bounds")
+
+
+class SparseIndices:
+    def __init__(self, **kwargs):
+        self.lambda_total = kwargs["lambda_total"]
+        self.gamma = kwargs["gamma"]
+        self.placements = kwargs["placements"]
+        self.lambda_inter = kwargs["lambda_inter"]
+        self.lambda_intra = kwargs["lambda_intra"]
+        self.zeta = kwargs["zeta"]
+        # (arc, p, p_prime) -> paths, edges and border nodes that can carry its traffic
+        self.paths_of = kwargs["paths_of"]
+        self.edges_of = kwargs["edges_of"]
+        self.nodes_of = kwargs["nodes_of"]
+        self.inter_by_edge = kwargs["inter_by_edge"]
+        self.intra_by_path = kwargs["intra_by_path"]
+        # (arc, p) -> keys of lambda_total starting at p, (arc, p_prime) -> keys ending at p_prime, arc -> keys of the arc
+        self.total_by_start = kwargs["total_by_start"]
+        self.total_by_end = kwargs["total_by_end"]
+        self.total_by_arc = kwargs["total_by_arc"]
+
+
+# big-M value of the on/off constraints of the variables without a finite upper bound
+bigM = 1e5
+
+
+class VariableBounds:
+    def __init__(self, **kwargs):
+        # variable key -> upper bound, keyed like the decision variables, math.inf if there is no finite bound
+        self.lambda_total = kwargs["lambda_total"]
+        self.lambda_inter = kwargs["lambda_inter"]
+        self.lambda_intra = kwargs["lambda_intra"]
+        self.sigma_in = kwargs["sigma_in"]
+        self.sigma_out = kwargs["sigma_out"]
+        self.kappa = kwargs["kappa"]
+        self.beta = kwargs["beta"]
+        # True if the on/off constraints are modelled as indicator constraints instead of big-M rows
+        self.use_indicators = kwargs.get("use_indicators", False)
 
 
 class IntraDomainPath:
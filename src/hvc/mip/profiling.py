@@ -0,0 +1,65 @@
+import time
+from contextlib import contextmanager
+
+import yaml
+
+
+class BuildProfiler:
+    """
+    Records for every constraint family added to a model the wall time it took and how many constraints, general
+    constraints and non-zeros it added. As the model attributes are only updated on Model.update(), the profiler
+    updates the model before and after each family, thus it should only be used if the figures are actually needed.
+    """
+
+    def __init__(self):
+        self.families = {}
+        self.variables = {}
+        self.total_time = 0.0
+
+    @contextmanager
+    def measure(self, model, family):
+        """
+        Context manager measuring everything added to the model inside of it as the given family
+        :param model: the model that is being built
+        :param family: the name of the constraint family
+        """
+        model.update()
+        constraints, general_constraints, non_zeros = self.__model_size(model)
+        start = time.perf_counter()
+        yield
+        model.update()
+        elapsed = time.perf_counter() - start
+        self.total_time += elapsed
+        after = self.__model_size(model)
+        # families may be measured in several steps, accumulate them
+        figures = self.families.setdefault(family, {"time_ms": 0.0, "constraints": 0, "general_constraints": 0,
+                                                    "non_zeros": 0})
+        figures["time_ms"] += elapsed * 1000
+        figures["constraints"] += after[0] - constraints
+        figures["general_constraints"] += after[1] - general_constraints
+        figures["non_zeros"] += after[2] - non_zeros
+
+    def record_variables(self, decision_variables):
+        """
+        Records the number of variables of each decision variable family
+        """
+        self.variables = {family: len(variables) for family, variables in vars(decision_variables).items() if
+                          variables is not None}
+
+    @staticmethod
+    def __model_size(model):
+        return model.NumConstrs, model.NumGenConstrs, model.NumNZs
+
+    def to_dict(self):
+        return {
+            "families": self.families,
+            "variables": self.variables,
+            "total_time_ms": self.total_time * 1000
+        }
+
+    def save(self, output_path):
+        """
+        Writes the recorded figures to build_profile.yaml in the given folder, next to the solution.log
+        """
+        with open(output_path + "/build_profile.yaml", 'w') as profile_file:
+            yaml.dump(self.to_dict(), profile_file)
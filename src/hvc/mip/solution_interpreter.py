@@ -9,6 +9,10 @@ logging.basicConfig(filename='solution_interpreter.log', level=logging.DEBUG)
 
 
 def pretty_print_model(indices, parameters, decision_variables, domain):
+    """
+    Prints the nonzero traffic of the domain.
+    :param decision_variables: the decision variables of the domain, see __get_dec_vars_for_domain
+    """
     nodes_in_domain = parameters.network_description["domain_nodes"][domain]
     paths_in_domain = [path_key for path_key, path in parameters.network_description[key_intra_domain_paths].items()
                        if path["domain"] == domain]
@@ -16,35 +20,24 @@ def pretty_print_model(indices, parameters, decision_variables, domain):
                        edge["src"] in nodes_in_domain or edge["dst"] in nodes_in_domain]
     print("# ==========================================================")
     logger.debug("# ==========================================================")
-    for arc, p, p_prime in itertools.product(indices.arcs, indices.paths, indices.paths):
-        if p in paths_in_domain or p_prime in paths_in_domain:
-            if __decision_variable_is_not_zero(decision_variables.lambda_total[arc, p, p_prime]):
-                print("lambda_total[{0},{1},{2}] {3}".format(arc, p, p_prime,
-                                                             decision_variables.lambda_total[arc, p, p_prime]))
-                logger.debug("lambda_total[{0},{1},{2}] {3}".format(arc, p, p_prime,
-                                                                    decision_variables.lambda_total[arc, p, p_prime]))
+    for (arc, p, p_prime), value in decision_variables.lambda_total.items():
+        if (p in paths_in_domain or p_prime in paths_in_domain) and __decision_variable_is_not_zero(value):
+            print("lambda_total[{0},{1},{2}] {3}".format(arc, p, p_prime, value))
+            logger.debug("lambda_total[{0},{1},{2}] {3}".format(arc, p, p_prime, value))
     print("# ==========================================================")
     logger.debug("# ==========================================================")
 
-    for arc, p, p_prime, e in itertools.product(indices.arcs, indices.paths, indices.paths, edges_in_domain):
-        if __decision_variable_is_not_zero(decision_variables.lambda_inter[arc, p, p_prime, e]):
-            print("lambda_inter[{0},{1},{2},{3}] {4}".format(arc, p, p_prime, e,
-                                                             decision_variables.lambda_inter[arc, p, p_prime, e]))
-            logger.debug("lambda_inter[{0},{1},{2},{3}] {4}".format(arc, p, p_prime, e,
-                                                                    decision_variables.lambda_inter[
-                                                                        arc, p, p_prime, e]))
+    for (arc, p, p_prime, e), value in decision_variables.lambda_inter.items():
+        if e in edges_in_domain and __decision_variable_is_not_zero(value):
+            print("lambda_inter[{0},{1},{2},{3}] {4}".format(arc, p, p_prime, e, value))
+            logger.debug("lambda_inter[{0},{1},{2},{3}] {4}".format(arc, p, p_prime, e, value))
     print("# ==========================================================")
     logger.debug("# ==========================================================")
 
-    for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                            paths_in_domain):
-        if __decision_variable_is_not_zero(decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime]):
-            print("lambda_intra[{0},{1},{2},{3}] {4}".format(arc, p, p_prime, p_prime_prime,
-                                                             decision_variables.lambda_intra[
-                                                                 arc, p, p_prime, p_prime_prime]))
-            logger.debug("lambda_intra[{0},{1},{2},{3}] {4}".format(arc, p, p_prime, p_prime_prime,
-                                                                    decision_variables.lambda_intra[
-                                                                        arc, p, p_prime, p_prime_prime]))
+    for (arc, p, p_prime, p_prime_prime), value in decision_variables.lambda_intra.items():
+        if p_prime_prime in paths_in_domain and __decision_variable_is_not_zero(value):
+            print("lambda_intra[{0},{1},{2},{3}] {4}".format(arc, p, p_prime, p_prime_prime, value))
+            logger.debug("lambda_intra[{0},{1},{2},{3}] {4}".format(arc, p, p_prime, p_prime_prime, value))
 
 
 def __decision_variable_is_not_zero(variable):
@@ -110,21 +103,15 @@ def __copy_vnf_description(parameters, vnf, vnf_description):
     vnf_description["cpu_consumption"][vnf] = parameters.vnf_description["cpu_consumption"][vnf]
 
 
-def __define_new_service_chain(parameters, chain, output_path):
+def __define_new_service_chain(parameters, chain, descriptions):
     """
-    Creates a service chain in the subfolder. Therefore it copies the given specs for the chain into the
+    Creates a service chain in the descriptions of the child coordinator. Therefore it copies the given specs for the
+    chain into them
     :param chain:
-    :param output_path:
+    :param descriptions: the chains, vnf description and vnf requests generated for the child coordinator so far
     :return:
     """
-    chains = {}
-    chain_path = output_path + "/chains.yaml"
-    # first check if there is a valid chains.yaml file already
-    if os.path.isfile(chain_path):
-        # load existing chains definition into dict
-        with open(chain_path, 'r') as chains_file:
-            chains = yaml.load(chains_file, Loader=yaml.FullLoader)
-
+    chains = descriptions["chains"]
     if len(chains.keys()) > 0:
         # iterate over chains to avoid duplicates
         for chain_key, chain_val in chains.items():
@@ -137,34 +124,22 @@ def __define_new_service_chain(parameters, chain, output_path):
     chains[chain_identifier] = chain
 
     # now we need to also make sure that the vnf descriptions are updated
-    # load vnf_description file (if it exists)
-    vnf_description_path = output_path + "/vnf_descriptions.yaml"
-    vnf_description = {}
-    if os.path.isfile(vnf_description_path):
-        with open(vnf_description_path, 'r') as vnf_description_file:
-            vnf_description = yaml.load(vnf_description_file, Loader=yaml.FullLoader)
-    else:
-        # intitialize empty dicts s.t. they can be accessed in the same manner as a loaded dict
-        vnf_description["vnfs"] = []
-        vnf_description["cpu_consumption"] = {}
-        vnf_description["outgoing_rate"] = {}
-
+    vnf_description = descriptions["vnf_description"]
     for (vnf1, vnf2) in chain:
         if vnf1 not in vnf_description["vnfs"]:
             __copy_vnf_description(parameters, vnf1, vnf_description)
         if vnf2 not in vnf_description["vnfs"]:
             __copy_vnf_description(parameters, vnf2, vnf_description)
 
-    # write the files
-    with open(chain_path, 'w') as chains_file, open(vnf_description_path, 'w') as vnf_description_file:
-        yaml.dump(chains, chains_file)
-        yaml.dump(vnf_description, vnf_description_file)
-
     return chain_identifier
 
 
-def __define_new_request(parameters, chain, ingress, egress, initial_traffic, output_path,
+def __define_new_request(parameters, chain, ingress, egress, initial_traffic, descriptions, network_description,
                          request_identifier_prefix=""):
+    """
+    :param descriptions: the chains, vnf description and vnf requests generated for the child coordinator so far
+    :param network_description: the network description of the child coordinator
+    """
     # transform temporary node into normal one
     if "ingress" in ingress:
         ingress = ingress[len("ingress_"):]
@@ -175,13 +150,7 @@ def __define_new_request(parameters, chain, ingress, egress, initial_traffic, ou
         return
 
     # start with the chain
-    chain_identifier = __define_new_service_chain(parameters, chain, output_path)
-    # now define a service request
-    # load the network description of the child coordinator
-    network_description_path = output_path + "/network_description.yaml"
-    # this file exists (is given by assumption)
-    with open(network_description_path, 'r') as network_description_file:
-        network_description = yaml.load(network_description_file, Loader=yaml.FullLoader)
+    chain_identifier = __define_new_service_chain(parameters, chain, descriptions)
 
     # define the request
     ingress_domain = next(domain_key for domain_key, domain_value in network_description["domain_nodes"].items() if
@@ -193,23 +162,16 @@ def __define_new_request(parameters, chain, ingress, egress, initial_traffic, ou
     request = {"vnf_chain": chain_identifier, "ingress": ingress, "ingress_domain": ingress_domain, "egress": egress,
                "egress_domain": egress_domain, "initial_rate": initial_traffic}
 
-    # save the request in the vnf requests file
-    vnf_requests_path = output_path + "/vnf_requests.yaml"
-    vnf_requests = {}
-    if os.path.isfile(vnf_requests_path):
-        with open(vnf_requests_path, 'r') as vnf_requests_file:
-            vnf_requests = yaml.load(vnf_requests_file, Loader=yaml.FullLoader)
-            vnf_request_identifier = "{0}-request{1}".format(request_identifier_prefix, len(vnf_requests))
+    # add the request to the vnf requests of the child coordinator
+    vnf_requests = descriptions["vnf_requests"]
+    if len(vnf_requests) > 0:
+        vnf_request_identifier = "{0}-request{1}".format(request_identifier_prefix, len(vnf_requests))
+    elif request_identifier_prefix != "":
+        vnf_request_identifier = "{0}-request0".format(request_identifier_prefix)
     else:
-        if request_identifier_prefix != "":
-            vnf_request_identifier = "{0}-request0".format(request_identifier_prefix)
-        else:
-            vnf_request_identifier = "request0"
+        vnf_request_identifier = "request0"
 
     vnf_requests[vnf_request_identifier] = request
-    # save the yaml
-    with open(vnf_requests_path, 'w') as vnf_requests_file:
-        yaml.dump(vnf_requests, vnf_requests_file)
     return vnf_request_identifier
 
 
@@ -388,11 +350,12 @@ def __generate_request_for_source(parameters, indices, decision_variables, paths
                 chain = [arc_in_chain] + chain
                 # now it gets tricky
                 # we have to compute the in_rate of our vnf depending on the used out_rate
-                # use the relative out_rate to get the absolute in_rate (since relative in_rate mathes relative out_rate in linear functions!)
-                # (only works with linear functions!)
-                relative_out_rate = out_rate / decision_variables.sigma_out[vnf, p_prime]
-                relative_in_rate = relative_out_rate
-                absolute_in_rate = decision_variables.sigma_in[vnf, p_prime] * relative_in_rate
+                # the outgoing rate function of the vnf is inverted for that, if it cannot be inverted the relative
+                # out_rate is used as relative in_rate (which only matches for linear functions)
+                absolute_in_rate = get_vnf_functions(parameters).outgoing_rate[vnf].inverse(out_rate)
+                if absolute_in_rate is None:
+                    relative_out_rate = out_rate / decision_variables.sigma_out[vnf, p_prime]
+                    absolute_in_rate = decision_variables.sigma_in[vnf, p_prime] * relative_out_rate
                 logger.debug("Recursion finishing: VNF had incoming rate {0}".format(absolute_in_rate))
                 # deduct it from the decision variable
                 if "ingress" in p:
@@ -424,7 +387,7 @@ def __generate_request_for_source(parameters, indices, decision_variables, paths
 
 
 def __generate_requests_for_single_child_coordinator(parameters, indices, decision_variables, model, domain,
-                                                     output_path, request_resolver):
+                                                     descriptions, network_description, request_resolver):
     """
     Takes the solution of a model and parses vnf requests, vnf chains, vnf specifications for a single child coordinator
     :param parameters: the parameters of the solved model
@@ -432,7 +395,8 @@ def __generate_requests_for_single_child_coordinator(parameters, indices, decisi
     :param decision_variables: the decision variables of the solved model
     :param model: the gurobipy model
     :param domain: the child coordinator
-    :param output_path: the path of the output folder for the generated files
+    :param descriptions: the chains, vnf description and vnf requests of the child coordinator, they are filled
+    :param network_description: the network description of the child coordinator
     :return:
     """
 
@@ -487,7 +451,9 @@ def __generate_requests_for_single_child_coordinator(parameters, indices, decisi
                 # chain = chain + [(chain[-1][1], "DST")]
                 request_identifier = __define_new_request(parameters=parameters, chain=chain,
                                                           initial_traffic=out_rate,
-                                                          output_path=output_path, ingress=border_node, egress=sink,
+                                                          descriptions=descriptions,
+                                                          network_description=network_description,
+                                                          ingress=border_node, egress=sink,
                                                           request_identifier_prefix=request_prefix)
 
                 request_resolver[domain][request_identifier] = (get_vnf_from_arc(arc[0]), final_arc[1])
@@ -548,7 +514,9 @@ def __generate_requests_for_single_child_coordinator(parameters, indices, decisi
 
                 request_identifier = __define_new_request(parameters=parameters, chain=chain,
                                                           initial_traffic=out_rate,
-                                                          output_path=output_path, ingress=border_node, egress=sink,
+                                                          descriptions=descriptions,
+                                                          network_description=network_description,
+                                                          ingress=border_node, egress=sink,
                                                           request_identifier_prefix=request_prefix)
 
                 request_resolver[domain][request_identifier] = (get_vnf_from_arc(arc[0]), final_arc[1])
@@ -567,80 +535,118 @@ def __generate_requests_for_single_child_coordinator(parameters, indices, decisi
     return request_resolver
 
 
-def __get_dec_vars_for_domain(parameters, indices, decision_variables, model, domain):
+def __get_dec_vars_for_domain(parameters, solution, domain):
+    """
+    :param solution: the SolutionView of the solved model
+    :return: the decision variables of the traffic of the domain, a copy that can be changed while the requests of the
+     domain are generated
+    """
     nodes_in_domain = parameters.network_description["domain_nodes"][domain]
     ingress_paths__in_domain = ["ingress_" + request_value['ingress'] for request_value in
                                 parameters.vnf_requests.values() if request_value['ingress_domain'] == domain]
     egress_paths__in_domain = ["egress_" + request_value['egress'] for request_value in parameters.vnf_requests.values()
                                if request_value['egress_domain'] == domain]
 
-    paths_in_domain = [path_key for path_key, path in parameters.network_description[key_intra_domain_paths].items()
-                       if path["domain"] == domain] + ingress_paths__in_domain + egress_paths__in_domain
-    edges_in_domain = [edge_key for edge_key, edge in parameters.network_description[key_inter_domain_edges].items() if
-                       edge["src"] in nodes_in_domain or edge["dst"] in nodes_in_domain]
-    lambda_total = {}
-    lambda_intra = {}
-    lambda_inter = {}
-    sigma_out = {}
-    sigma_in = {}
-    zeta = {}
-    for arc, p, p_prime in itertools.product(indices.arcs, indices.paths, indices.paths):
-        if p in paths_in_domain or p_prime in paths_in_domain:
-            lambda_total[arc, p, p_prime] = decision_variables.lambda_total[arc, p, p_prime].X
-        for p_prime_prime in paths_in_domain:
-            lambda_intra[arc, p, p_prime, p_prime_prime] = decision_variables.lambda_intra[
-                arc, p, p_prime, p_prime_prime].X
-        for e in edges_in_domain:
-            lambda_inter[arc, p, p_prime, e] = decision_variables.lambda_inter[arc, p, p_prime, e].X
-        for b in nodes_in_domain:
-            # zeta[arc, p, p_prime, b] = decision_variables.zeta[arc, p, p_prime, b]
-            pass
-
-    for vnf, path in itertools.product(indices.vnfs, paths_in_domain):
-        sigma_in[vnf, path] = decision_variables.sigma_in[vnf, path].X
-        sigma_out[vnf, path] = decision_variables.sigma_out[vnf, path].X
-
-    return DecisionVariables(lambda_total=lambda_total, lambda_inter=lambda_inter, lambda_intra=lambda_intra,
-                             sigma_in=sigma_in, sigma_out=sigma_out,
-                             delta_inter=decision_variables.delta_inter,
-                             delta_intra=decision_variables.delta_intra,
-                             gamma=decision_variables.gamma,
-                             kappa=decision_variables.kappa, beta=decision_variables.beta,
-                             epsilon=decision_variables.epsilon,
-                             zeta=zeta)
-
-
-def generate_requests_for_child_coordinators(parameters, indices, decision_variables, model, path_prefix=""):
+    paths_in_domain = set([path_key for path_key, path in
+                           parameters.network_description[key_intra_domain_paths].items() if path["domain"] == domain]
+                          + ingress_paths__in_domain + egress_paths__in_domain)
+    edges_in_domain = set([edge_key for edge_key, edge in
+                           parameters.network_description[key_inter_domain_edges].items() if
+                           edge["src"] in nodes_in_domain or edge["dst"] in nodes_in_domain])
+    # variables that were left out of the sparse model carry no traffic, they read as 0 like all other zero values
+    return DecisionVariables(
+        lambda_total=solution.lambda_total.restrict(lambda key: key[1] in paths_in_domain or key[2] in paths_in_domain),
+        lambda_inter=solution.lambda_inter.restrict(lambda key: key[3] in edges_in_domain),
+        lambda_intra=solution.lambda_intra.restrict(lambda key: key[3] in paths_in_domain),
+        sigma_in=solution.sigma_in.restrict(lambda key: key[1] in paths_in_domain),
+        sigma_out=solution.sigma_out.restrict(lambda key: key[1] in paths_in_domain),
+        delta_inter=solution.delta_inter, delta_intra=solution.delta_intra, gamma=solution.gamma,
+        kappa=solution.kappa, beta=solution.beta, epsilon=solution.epsilon, zeta={})
+
+
+def generate_requests_for_child_coordinators(parameters, indices, decision_variables, model, path_prefix=None,
+                                             network_descriptions=None):
     """
     Takes the solution of a model and parses vnf requests, vnf chains, vnf specifications for the child coordinators
-    :param path_prefix: the prefix of the output path where the domains are placed
+    :param path_prefix: the prefix of the output path where the domains are placed, the generated files and the
+     request mappings are written to it, None if they are only returned
     :param parameters: the parameters of the solved model
     :param indices: the indices of the solved model
     :param decision_variables: the decision variables of the solved model
     :param model: the gurobipy model
-    :return:
+    :param network_descriptions: a dict mapping each domain to the network description of its coordinator, by default
+     the network_description.yaml files of the domain folders are read
+    :return: a dict mapping each domain with requests to the dict of its "chains", "vnf_description" and
+     "vnf_requests", and the request mappings
     """
     request_resolver = {}
+    child_descriptions = {}
+    for domain, descriptions in stream_requests_for_child_coordinators(parameters, indices, decision_variables, model,
+                                                                       request_resolver, path_prefix=path_prefix,
+                                                                       network_descriptions=network_descriptions):
+        if descriptions is not None:
+            child_descriptions[domain] = descriptions
+    return child_descriptions, request_resolver
+
+
+def stream_requests_for_child_coordinators(parameters, indices, decision_variables, model, request_resolver,
+                                           path_prefix=None, network_descriptions=None):
+    """
+    Like generate_requests_for_child_coordinators, but the requests of each domain are yielded as soon as they are
+    generated, e.g. to start solving a child coordinator while the requests of its siblings are still generated. The
+    descriptions of a domain are not changed after they were yielded.
+    :param request_resolver: the dict the request mappings of each domain are added to, they are complete once the
+     generator is exhausted
+    :return: a generator of the domains and the dict of the "chains", "vnf_description" and "vnf_requests" of the
+     domain, None if no requests were generated for it
+    """
+    solution = solution_view(decision_variables, model)
+    if path_prefix is not None:
+        # the mappings of each domain are appended to the file once the domain is done
+        open(path_prefix + "request_mappings.yaml", 'w').close()
     domains = parameters.network_description["domain_nodes"].keys()
     for domain in domains:
         print("****************DOMAIN {0}*******************".format(domain))
         logger.debug("****************DOMAIN {0}*******************".format(domain))
-        dec_vars_model = __get_dec_vars_for_domain(parameters, indices, decision_variables, model, domain)
+        dec_vars_model = __get_dec_vars_for_domain(parameters, solution, domain)
         pretty_print_model(indices=indices, decision_variables=dec_vars_model, parameters=parameters,
                            domain=domain)
-        domain_path = path_prefix + str(domain)
-        if not os.path.exists(domain_path):
-            os.mkdir(domain_path)
-        # delete the exisiting requests...
-        if os.path.exists(path_prefix + str(domain) + "/vnf_requests.yaml"):
-            os.remove(path_prefix + str(domain) + "/vnf_requests.yaml")
-        if os.path.exists(path_prefix + str(domain) + "/chains.yaml"):
-            os.remove(path_prefix + str(domain) + "/chains.yaml")
-        if os.path.exists(path_prefix + str(domain) + "/vnf_descriptions.yaml"):
-            os.remove(path_prefix + str(domain) + "/vnf_descriptions.yaml")
-
+        network_description = None
+        if network_descriptions is not None:
+            network_description = network_descriptions[domain]
+        elif os.path.isfile(path_prefix + str(domain) + "/network_description.yaml"):
+            with open(path_prefix + str(domain) + "/network_description.yaml", 'r') as network_description_file:
+                network_description = yaml.load(network_description_file, Loader=yaml.FullLoader)
+
+        descriptions = {"chains": {}, "vnf_description": {"vnfs": [], "cpu_consumption": {}, "outgoing_rate": {}},
+                        "vnf_requests": {}}
         __generate_requests_for_single_child_coordinator(parameters, indices, dec_vars_model, model, domain,
-                                                         path_prefix + str(domain), request_resolver)
-
-    with open(path_prefix + "request_mappings.yaml", 'w+') as request_mapping_file:
-        yaml.dump(request_resolver, request_mapping_file)
+                                                         descriptions, network_description, request_resolver)
+        if len(descriptions["vnf_requests"]) == 0:
+            descriptions = None
+        if path_prefix is not None:
+            __write_child_descriptions(path_prefix + str(domain), descriptions)
+            # the domains are unique keys of the top-level mapping, the file stays a valid YAML document
+            with open(path_prefix + "request_mappings.yaml", 'a') as request_mapping_file:
+                yaml.dump({domain: request_resolver[domain]}, request_mapping_file)
+        yield domain, descriptions
+
+
+def __write_child_descriptions(domain_path, descriptions):
+    """
+    Replaces the request files of the domain by the generated ones, the existing files are only deleted if no requests
+    were generated.
+    """
+    if not os.path.exists(domain_path):
+        os.mkdir(domain_path)
+    for file_name in ["vnf_requests.yaml", "chains.yaml", "vnf_descriptions.yaml"]:
+        if os.path.exists(domain_path + "/" + file_name):
+            os.remove(domain_path + "/" + file_name)
+    if descriptions is None:
+        return
+    with open(domain_path + "/chains.yaml", 'w') as chains_file, \
+            open(domain_path + "/vnf_descriptions.yaml", 'w') as vnf_description_file, \
+            open(domain_path + "/vnf_requests.yaml", 'w') as vnf_requests_file:
+        yaml.dump(descriptions["chains"], chains_file)
+        yaml.dump(descriptions["vnf_description"], vnf_description_file)
+        yaml.dump(descriptions["vnf_requests"], vnf_requests_file)
@@ -0,0 +1,162 @@
+"""
+Columnar storage of solutions. A solution is a folder of numpy arrays: one row per nonzero value with the id of its
+decision variable family, the ids of the elements of its key, the id of its name and its value. All strings are kept
+once in a string table. The arrays are memory mapped when they are read, loading a solution does not parse any text.
+"""
+import os
+import shutil
+
+import numpy as np
+
+# the folders of the full and the condensed solution next to full_solution.log and solution.log
+full_solution_store = "full_solution"
+condensed_solution_store = "solution"
+# the folder of the merged solution of a hierarchy next to overlay_solution.yaml
+overlay_solution_store = "overlay_solution"
+
+# families whose keys start with an arc, the arc takes two columns
+arc_keyed_families = ["lambda_total", "lambda_inter", "lambda_intra", "delta_inter", "delta_intra", "zeta"]
+
+__arrays = ["strings", "families", "keys", "names", "values"]
+
+
+class SolutionRecord:
+    def __init__(self, **kwargs):
+        self.family = kwargs["family"]
+        # the key of the decision variable, e.g. ((arc0, arc1), p, p_prime, e) for lambda_inter
+        self.key = kwargs["key"]
+        self.name = kwargs["name"]
+        self.value = kwargs["value"]
+
+
+class StoredSolution:
+    """
+    The arrays of a stored solution, the records are decoded on demand.
+    """
+
+    def __init__(self, **kwargs):
+        self.strings = kwargs["strings"]
+        # per row the string id of the family, the string ids of the key elements (-1 padded), the name id and value
+        self.families = kwargs["families"]
+        self.keys = kwargs["keys"]
+        self.names = kwargs["names"]
+        self.values = kwargs["values"]
+
+    def __len__(self):
+        return len(self.values)
+
+    def records(self, family=None):
+        """
+        :param family: only the records of this family, all records if None
+        :return: a generator of the SolutionRecords of the solution
+        """
+        strings = self.strings
+        rows = range(len(self.values))
+        if family is not None:
+            family_ids = np.flatnonzero(strings == family)
+            if len(family_ids) == 0:
+                return
+            rows = np.flatnonzero(self.families == family_ids[0])
+        for row in rows:
+            row_family = str(strings[self.families[row]])
+            elements = [str(strings[element]) for element in self.keys[row] if element >= 0]
+            if row_family in arc_keyed_families:
+                key = ((elements[0], elements[1]),) + tuple(elements[2:])
+            elif len(elements) == 1:
+                key = elements[0]
+            else:
+                key = tuple(elements)
+            yield SolutionRecord(family=row_family, key=key, name=str(strings[self.names[row]]),
+                                 value=float(self.values[row]))
+
+    def to_dict(self):
+        """
+        :return: a dict mapping the names to the values, just like the YAML solution files
+        """
+        return {str(self.strings[name]): float(value) for name, value in zip(self.names, self.values)}
+
+
+def condensed_solution_name(family, key):
+    """
+    :return: the name of a condensed value, e.g. lambda_inter[(A_request1,B_request1), path_3, path_7, edge_12]
+    """
+    elements = ["({0},{1})".format(*key[0])] + list(key[1:]) if family in arc_keyed_families else \
+        list(key) if isinstance(key, tuple) else [key]
+    return "{0}[{1}]".format(family, ", ".join(str(element) for element in elements))
+
+
+def parse_condensed_solution_name(name):
+    """
+    The inverse of condensed_solution_name.
+    :return: the family and the key of the name
+    """
+    family = name[:name.index("[")]
+    elements = name[name.index("[") + 1:name.rindex("]")]
+    if family in arc_keyed_families:
+        arc = elements[elements.index("(") + 1:elements.index(")")].split(",")
+        rest = elements[elements.index(")") + 1:].split(",")[1:]
+        return family, ((arc[0].strip(), arc[1].strip()),) + tuple(element.strip() for element in rest)
+    key = tuple(element.strip() for element in elements.split(","))
+    return family, key[0] if len(key) == 1 else key
+
+
+def write_solution_store(folder, records):
+    """
+    Writes the records to the folder, an existing solution in it is replaced.
+    :param records: the SolutionRecords of the solution
+    """
+    string_ids = {}
+
+    def string_id(string):
+        if string not in string_ids:
+            string_ids[string] = len(string_ids)
+        return string_ids[string]
+
+    families = []
+    keys = []
+    names = []
+    values = []
+    for record in records:
+        elements = list(record.key[0]) + list(record.key[1:]) if record.family in arc_keyed_families else \
+            list(record.key) if isinstance(record.key, tuple) else [record.key]
+        families.append(string_id(record.family))
+        keys.append([string_id(str(element)) for element in elements])
+        names.append(string_id(record.name))
+        values.append(record.value)
+    width = max([len(key) for key in keys], default=0)
+    key_array = np.full((len(keys), width), -1, dtype=np.int32)
+    for row, key in enumerate(keys):
+        key_array[row, :len(key)] = key
+
+    # write next to the folder first, readers must never see a partially written solution
+    temporary = "{}.{}.tmp".format(folder, os.getpid())
+    os.makedirs(temporary, exist_ok=True)
+    arrays = {
+        "strings": np.array(list(string_ids), dtype=str),
+        "families": np.array(families, dtype=np.int32),
+        "keys": key_array,
+        "names": np.array(names, dtype=np.int32),
+        "values": np.array(values, dtype=float),
+    }
+    for array_name, array in arrays.items():
+        np.save(os.path.join(temporary, array_name + ".npy"), array)
+    shutil.rmtree(folder, ignore_errors=True)
+    os.rename(temporary, folder)
+
+
+def read_solution_store(folder, memory_map=True):
+    """
+    :param memory_map: True, if the arrays are memory mapped instead of read into memory
+    :return: the StoredSolution in the folder, None if there is none
+    """
+    if not os.path.isfile(os.path.join(folder, "values.npy")):
+        return None
+    arrays = {}
+    for array_name in __arrays:
+        path = os.path.join(folder, array_name + ".npy")
+        try:
+            arrays[array_name] = np.load(path, mmap_mode="r" if memory_map else None)
+        except ValueError:
+            # empty arrays cannot be memory mapped
+            arrays[array_name] = np.load(path)
+    return StoredSolution(**arrays)
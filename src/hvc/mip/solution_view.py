@@ -0,0 +1,118 @@
+"""
+The solution of a model reduced to its nonzero values. The values of each decision variable family are fetched with a
+single bulk attribute query, so reading a solution scales with its nonzeros instead of with the size of the index
+space. Saving, printing and the generation of the requests of the child coordinators all read from the same view.
+"""
+import numpy as np
+from gurobipy import Var
+
+
+class SolutionFamily:
+    """
+    The nonzero values of a decision variable family, keyed like the family. Keys without a nonzero value read as 0.
+    """
+
+    def __init__(self, keys, values, names, variables, contains=None):
+        """
+        :param keys: the keys of the nonzero values
+        :param values: a numpy array of the nonzero values
+        :param names: the variable names of the nonzero values
+        :param variables: the variables of the family, used for the names of keys without a nonzero value
+        :param contains: a function deciding which keys are part of the family, by default the keys of the variables
+        """
+        self.keys = keys
+        self.values = values
+        self.names = names
+        self.variables = variables
+        self.contains = (lambda key: key in variables) if contains is None else contains
+        self.position = {key: position for position, key in enumerate(keys)}
+
+    def __getitem__(self, key):
+        position = self.position.get(key)
+        return 0.0 if position is None else float(self.values[position])
+
+    def __setitem__(self, key, value):
+        position = self.position.get(key)
+        if position is None:
+            self.position[key] = len(self.keys)
+            self.keys.append(key)
+            self.values = np.append(self.values, value)
+            # looked up on demand, keys left out of a sparse model have no variable
+            self.names.append(None)
+        else:
+            self.values[position] = value
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def items(self, tolerance=0.0):
+        """
+        :return: the keys and values whose absolute value exceeds the tolerance
+        """
+        for position in np.flatnonzero(np.abs(self.values) > tolerance):
+            yield self.keys[position], float(self.values[position])
+
+    def name(self, key):
+        position = self.position.get(key)
+        if position is None or self.names[position] is None:
+            return self.variables[key].VarName
+        return self.names[position]
+
+    def restrict(self, contains):
+        """
+        :param contains: a function deciding which keys are part of the restricted family
+        :return: a copy of the family that only holds the keys accepted by contains, changing its values does not change
+         the values of this family
+        """
+        positions = [position for position, key in enumerate(self.keys) if contains(key)]
+        return SolutionFamily([self.keys[position] for position in positions], self.values[positions].copy(),
+                              [self.names[position] for position in positions], self.variables, contains)
+
+
+class SolutionView:
+    """
+    The nonzero values of all decision variable families of a solution, each family is available as attribute of the
+    same name.
+    """
+
+    def __init__(self, decision_variables, model=None, tolerance=1e-6):
+        """
+        :param decision_variables: the decision variables, either gurobipy Vars of the solved model or SolvedVariables
+        :param model: the solved gurobipy model, None if the decision variables are SolvedVariables
+        :param tolerance: values whose absolute value does not exceed it are treated as 0
+        """
+        self.decision_variables = decision_variables
+        self.families = []
+        for family, variables in vars(decision_variables).items():
+            if variables is None:
+                continue
+            setattr(self, family, self.__fetch(variables, model, tolerance))
+            self.families.append(family)
+
+    @staticmethod
+    def __fetch(variables, model, tolerance):
+        keys = list(variables.keys())
+        family_variables = list(variables.values())
+        if model is not None and len(family_variables) > 0 and isinstance(family_variables[0], Var):
+            values = np.array(model.getAttr("X", family_variables), dtype=float)
+            nonzero = np.flatnonzero(np.abs(values) > tolerance)
+            names = model.getAttr("VarName", [family_variables[position] for position in nonzero])
+        else:
+            values = np.array([variable.X for variable in family_variables], dtype=float)
+            nonzero = np.flatnonzero(np.abs(values) > tolerance)
+            names = [family_variables[position].VarName for position in nonzero]
+        return SolutionFamily([keys[position] for position in nonzero], values[nonzero], list(names), variables)
+
+
+def solution_view(decision_variables, model=None):
+    """
+    :return: the view attached to the model by the last solve of gurobipy_mip.solve_model or the incremental model, a
+     new view if there is none for these decision variables
+    """
+    view = getattr(model, "_solution_view", None) if model is not None else None
+    if view is None or view.decision_variables is not decision_variables:
+        view = SolutionView(decision_variables, model)
+    return view
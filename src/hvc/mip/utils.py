@@ -1,5 +1,7 @@
 # noinspection PyUnresolvedReferences
+import itertools
 import logging
+import os
 from collections import defaultdict
 import xml.etree.ElementTree as ET
 import networkx as nx
@@ -7,6 +9,11 @@ import yaml
 from gurobipy import *
 from networkx.drawing.nx_pydot import write_dot
 
+from hvc.mip.solution_store import SolutionRecord, condensed_solution_name, condensed_solution_store, \
+    full_solution_store, read_solution_store, write_solution_store
+from hvc.mip.solution_view import solution_view
+from hvc.mip.vnf_functions import VnfFunctions
+
 formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
 
 
@@ -30,19 +37,19 @@ key_routing_restrictions = "routing_restrictions"
 def log_solution(indices, decision_variables, model, logger):
     tol = 1e-4
     logger.debug("# ==========================================================")
-    for arc, p, p_prime in itertools.product(indices.arcs, indices.paths, indices.paths):
+    for arc, p, p_prime in decision_variables.lambda_total.keys():
         if abs(decision_variables.lambda_total[arc, p, p_prime].X) > tol:
             logger.debug(decision_variables.lambda_total[arc, p, p_prime].VarName,
                          decision_variables.lambda_total[arc, p, p_prime].X)
     logger.debug("# ==========================================================")
-    for arc, p, p_prime, e in itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges):
+    for arc, p, p_prime, e in decision_variables.lambda_inter.keys():
         if abs(decision_variables.lambda_inter[arc, p, p_prime, e].X) > tol:
             logger.debug(decision_variables.lambda_inter[arc, p, p_prime, e].VarName,
                          decision_variables.lambda_inter[
                              arc, p, p_prime, e].X)
     logger.debug("# ==========================================================")
     logger.debug("Lambda intra")
-    for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths, indices.paths):
+    for arc, p, p_prime, p_prime_prime in decision_variables.lambda_intra.keys():
         if abs(decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].X) > tol:
             logger.debug(decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].VarName,
                          decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].X)
@@ -55,7 +62,7 @@ def log_solution(indices, decision_variables, model, logger):
         if abs(decision_variables.sigma_out[vnf, path].X) > tol:
             logger.debug(decision_variables.sigma_out[vnf, path].VarName, decision_variables.sigma_out[vnf, path].X)
     logger.debug("# ==========================================================")
-    for vnf, path in itertools.product(indices.vnfs, indices.paths):
+    for vnf, path in decision_variables.gamma.keys():
         if abs(decision_variables.gamma[vnf, path].X) > tol:
             logger.debug(decision_variables.gamma[vnf, path].VarName, decision_variables.gamma[vnf, path].X)
     logger.debug("# ==========================================================")
@@ -73,147 +80,137 @@ def log_solution(indices, decision_variables, model, logger):
             logger.debug(decision_variables.beta[path].VarName, decision_variables.beta[path].X)
 
 
-def save_solution(indices, decision_variables, model, output_path):
-    condensed_solution_dict = output_path + "/solution.log"
-    full_solution_dict = output_path +"/full_solution.log"
-    with open(condensed_solution_dict, 'w') as condensed_file, open(full_solution_dict, 'w') as full_solution_file:
-        solution_dict = {}
-        condensed_solution_dict = defaultdict(int)
-        tol = 1e-4
-        for arc, p, p_prime in itertools.product(indices.arcs, indices.paths, indices.paths):
-            if abs(decision_variables.lambda_total[arc, p, p_prime].X) > tol:
-                solution_dict[decision_variables.lambda_total[arc, p, p_prime].VarName] = \
-                    decision_variables.lambda_total[arc, p, p_prime].X
-
-        for arc, p, p_prime, e in itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges):
-            if abs(decision_variables.lambda_inter[arc, p, p_prime, e].X) > tol:
-                key = "lambda_inter[({0},{1}), {2}, {3}, {4}]".format(get_original_request_from_arc(arc[0]),
-                                                                      get_original_request_from_arc(arc[1]), p, p_prime,
-                                                                      e)
-                solution_dict[decision_variables.lambda_inter[arc, p, p_prime, e].VarName] = \
-                    decision_variables.lambda_inter[arc, p, p_prime, e].X
-                solution_dict[decision_variables.delta_inter[arc, p, p_prime, e].VarName] = \
-                    decision_variables.delta_inter[arc, p, p_prime, e].X
-                condensed_solution_dict[key] += decision_variables.lambda_inter[arc, p, p_prime, e].X
-
-        for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                                indices.paths):
-            if abs(decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].X) > tol:
-                solution_dict[decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].VarName] = \
-                    decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].X
-                solution_dict[decision_variables.delta_intra[arc, p, p_prime, p_prime_prime].VarName] = \
-                    decision_variables.delta_intra[arc, p, p_prime, p_prime_prime].X
-
-        for vnf, path in itertools.product(indices.vnfs, indices.paths):
-            if abs(decision_variables.sigma_in[vnf, path].X) > tol:
-                solution_dict[decision_variables.sigma_in[vnf, path].VarName] = \
-                    decision_variables.sigma_in[vnf, path].X
-
-        for vnf, path in itertools.product(indices.vnfs, indices.paths):
-            if abs(decision_variables.sigma_out[vnf, path].X) > tol:
-                solution_dict[decision_variables.sigma_out[vnf, path].VarName] = \
-                    decision_variables.sigma_out[vnf, path].X
-
-        for vnf, path in itertools.product(indices.vnfs, indices.paths):
-            if abs(decision_variables.gamma[vnf, path].X) > tol:
-                key = "gamma[{0}, {1}]".format(vnf, path)
-                solution_dict[decision_variables.gamma[vnf, path].VarName] = \
-                    decision_variables.gamma[vnf, path].X
-                condensed_solution_dict[key] = decision_variables.gamma[vnf, path].X
-
-        for vnf, path in itertools.product(indices.vnfs, indices.paths):
-            if abs(decision_variables.kappa[vnf, path].X) > tol:
-                solution_dict[decision_variables.kappa[vnf, path].VarName] = \
-                    decision_variables.kappa[vnf, path].X
-
-        for cpu_restriction, path in itertools.product(indices.cpu_restrictions, indices.paths):
-            if abs(decision_variables.epsilon[cpu_restriction, path].X) > tol:
-                solution_dict[decision_variables.epsilon[cpu_restriction, path].VarName] = \
-                    decision_variables.epsilon[cpu_restriction, path].X
-
-        for path in indices.paths:
-            if abs(decision_variables.beta[path].X) > tol:
-                solution_dict[decision_variables.beta[path].VarName] = \
-                    decision_variables.beta[path].X
-        yaml.dump(dict(condensed_solution_dict), condensed_file)
-        yaml.dump(solution_dict, full_solution_file)
-
-
-def pretty_print_solution(indices, decision_variables, model, natural_language=False):
+def save_solution(indices, decision_variables, model, output_path, solution=None, yaml_output=True):
+    """
+    Writes the nonzero values of the solution to the columnar solution stores (full and condensed, see
+    solution_store) and optionally to solution.log (condensed) and full_solution.log.
+    :param solution: the SolutionView of the solution, by default the view of the model is used
+    :param yaml_output: True, if the human-readable YAML files are written as well
+    """
+    solution = solution_view(decision_variables, model) if solution is None else solution
+    tol = 1e-4
+    full_records = []
+
+    def add(family, key):
+        values = getattr(solution, family)
+        full_records.append(SolutionRecord(family=family, key=key, name=values.name(key), value=values[key]))
+
+    for family in ["lambda_total", "sigma_in", "sigma_out", "kappa", "epsilon", "beta"]:
+        for key, value in getattr(solution, family).items(tol):
+            add(family, key)
+
+    for (arc, p, p_prime, e), value in solution.lambda_inter.items(tol):
+        add("lambda_inter", (arc, p, p_prime, e))
+        add("delta_inter", (arc, p, p_prime, e))
+
+    for key, value in solution.lambda_intra.items(tol):
+        add("lambda_intra", key)
+        add("delta_intra", key)
+
+    for key, value in solution.gamma.items(tol):
+        add("gamma", key)
+    condensed_records = condensed_solution_records(decision_variables, model, solution=solution)
+
+    write_solution_store(output_path + "/" + full_solution_store, full_records)
+    write_solution_store(output_path + "/" + condensed_solution_store, condensed_records)
+    if yaml_output:
+        with open(output_path + "/solution.log", 'w') as condensed_file, \
+                open(output_path + "/full_solution.log", 'w') as full_solution_file:
+            yaml.dump({record.name: record.value for record in condensed_records}, condensed_file)
+            yaml.dump({record.name: record.value for record in full_records}, full_solution_file)
+
+
+def condensed_solution_records(decision_variables, model, solution=None):
+    """
+    :param solution: the SolutionView of the solution, by default the view of the model is used
+    :return: the SolutionRecords of the condensed solution, i.e. the inter-domain traffic of the original requests and
+     the placements, as saved to the condensed solution store by save_solution
+    """
+    solution = solution_view(decision_variables, model) if solution is None else solution
+    tol = 1e-4
+    # (family, key) -> value, the arcs of the condensed keys refer to the original requests
+    condensed_values = defaultdict(int)
+    for (arc, p, p_prime, e), value in solution.lambda_inter.items(tol):
+        original_arc = (get_original_request_from_arc(arc[0]), get_original_request_from_arc(arc[1]))
+        condensed_values["lambda_inter", (original_arc, p, p_prime, e)] += value
+    for key, value in solution.gamma.items(tol):
+        condensed_values["gamma", key] = value
+    return [SolutionRecord(family=family, key=key, name=condensed_solution_name(family, key), value=value)
+            for (family, key), value in condensed_values.items()]
+
+
+def load_solution(output_path, condensed=False):
+    """
+    Loads a solution saved by save_solution.
+    :param output_path: the folder the solution was saved to
+    :param condensed: True, if the condensed solution is loaded instead of the full one
+    :return: the memory mapped StoredSolution, None if there is none
+    """
+    return read_solution_store(output_path + "/" + (condensed_solution_store if condensed else full_solution_store))
+
+
+def variable_name(family, key):
+    """
+    :return: the name of the variable of the given family and key, same naming scheme as Model.addVars
+    """
+    if isinstance(key, tuple):
+        return "{}[{}]".format(family, ",".join(str(element) for element in key))
+    return "{}[{}]".format(family, key)
+
+
+def normalize_variable_name(name):
+    """
+    :return: the name without whitespace, the names of the variables keyed by an arc contain a space, the keys of
+     condensed or overlay solutions may not
+    """
+    return "".join(str(name).split())
+
+
+def read_solution(solution):
+    """
+    Reads a previously saved solution, e.g. to warm start a model with it.
+    :param solution: a full_solution.log file, a folder containing a saved solution or an already loaded solution dict
+    :return: a dict mapping the normalized variable names (see normalize_variable_name) to their values
+    """
+    if not isinstance(solution, dict):
+        stored_solution = load_solution(solution) if os.path.isdir(solution) else None
+        if stored_solution is not None:
+            solution = stored_solution.to_dict()
+        else:
+            if os.path.isdir(solution):
+                solution = solution + "/full_solution.log"
+            with open(solution, 'r') as solution_file:
+                solution = yaml.safe_load(solution_file) or {}
+    return {normalize_variable_name(name): value for name, value in solution.items()}
+
+
+def pretty_print_solution(indices, decision_variables, model, natural_language=False, solution=None):
+    """
+    Prints the nonzero values of the solution.
+    :param solution: the SolutionView of the solution, by default the view of the model is used
+    """
+    solution = solution_view(decision_variables, model) if solution is None else solution
     tol = 1e-4
     print("# ==========================================================")
-    for arc, p, p_prime in itertools.product(indices.arcs, indices.paths, indices.paths):
-        if abs(decision_variables.lambda_total[arc, p, p_prime].X) > tol:
-            if natural_language:
-                print(
-                    "Total traffic from VNF '{0}' placed on path '{1}' to VNF '{2}' placed on path '{3}' is: {4}".format(
-                        arc[0], p,
-                        arc[1],
-                        p_prime,
-                        decision_variables.lambda_total[
-                            arc, p, p_prime].X))
-            else:
-                print(decision_variables.lambda_total[arc, p, p_prime].VarName,
-                      decision_variables.lambda_total[arc, p, p_prime].X)
-    print("# ==========================================================")
-    for arc, p, p_prime, e in itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges):
-        if abs(decision_variables.lambda_inter[arc, p, p_prime, e].X) > tol:
-            if natural_language:
-                print("Routed traffic from VNF '{0}' placed on '{1}' to VNF '{2}' placed on '{3}'"
-                      " over the inter-domain edge '{4}' is: {5}".format(arc[0], p, arc[1], p_prime, e,
-                                                                         decision_variables.lambda_inter[
-                                                                             arc, p, p_prime, e].X))
-            else:
-                print(decision_variables.lambda_inter[arc, p, p_prime, e].VarName,
-                      decision_variables.lambda_inter[
-                          arc, p, p_prime, e].X)
-    print("# ==========================================================")
-    for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                            indices.paths):
-        if abs(decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].X) > tol:
-            print(decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].VarName,
-                  decision_variables.lambda_intra[arc, p, p_prime, p_prime_prime].X)
-    print("# ==========================================================")
-    for vnf, path in itertools.product(indices.vnfs, indices.paths):
-        if abs(decision_variables.sigma_in[vnf, path].X) > tol:
-            print(decision_variables.sigma_in[vnf, path].VarName, decision_variables.sigma_in[vnf, path].X)
-    print("# ==========================================================")
-    for vnf, path in itertools.product(indices.vnfs, indices.paths):
-        if abs(decision_variables.sigma_out[vnf, path].X) > tol:
-            print(decision_variables.sigma_out[vnf, path].VarName, decision_variables.sigma_out[vnf, path].X)
-    print("# ==========================================================")
-    for vnf, path in itertools.product(indices.vnfs, indices.paths):
-        if abs(decision_variables.gamma[vnf, path].X) > tol:
-            print(decision_variables.gamma[vnf, path].VarName, decision_variables.gamma[vnf, path].X)
-    print("# ==========================================================")
-    for vnf, path in itertools.product(indices.vnfs, indices.paths):
-        if abs(decision_variables.kappa[vnf, path].X) > tol:
-            print(decision_variables.kappa[vnf, path].VarName, decision_variables.kappa[vnf, path].X)
-    print("# ==========================================================")
-    for cpu_restriction, path in itertools.product(indices.cpu_restrictions, indices.paths):
-        if abs(decision_variables.epsilon[cpu_restriction, path].X) > tol:
-            print(decision_variables.epsilon[cpu_restriction, path].VarName,
-                  decision_variables.epsilon[cpu_restriction, path].X)
-    print("# ==========================================================")
-    for path in indices.paths:
-        if abs(decision_variables.beta[path].X) > tol:
-            print(decision_variables.beta[path].VarName, decision_variables.beta[path].X)
-    print("# ==========================================================")
-    for arc, p, p_prime, e in itertools.product(indices.arcs, indices.paths, indices.paths, indices.edges):
-        if abs(decision_variables.delta_inter[arc, p, p_prime, e].X) > tol:
-            print(decision_variables.delta_inter[arc, p, p_prime, e].VarName,
-                  decision_variables.delta_inter[arc, p, p_prime, e].X)
-    print("# ==========================================================")
-    for arc, p, p_prime, p_prime_prime in itertools.product(indices.arcs, indices.paths, indices.paths,
-                                                            indices.paths):
-        if abs(decision_variables.delta_intra[arc, p, p_prime, p_prime_prime].X) > tol:
-            print(decision_variables.delta_intra[arc, p, p_prime, p_prime_prime].VarName,
-                  decision_variables.delta_intra[arc, p, p_prime, p_prime_prime].X)
+    for (arc, p, p_prime), value in solution.lambda_total.items(tol):
+        if natural_language:
+            print("Total traffic from VNF '{0}' placed on path '{1}' to VNF '{2}' placed on path '{3}' is: {4}".format(
+                arc[0], p, arc[1], p_prime, value))
+        else:
+            print(solution.lambda_total.name((arc, p, p_prime)), value)
     print("# ==========================================================")
-    for arc, p, p_prime, b in itertools.product(indices.arcs, indices.paths, indices.paths, indices.border_nodes):
-        if abs(decision_variables.zeta[arc, p, p_prime, b].X) > tol:
-            print(decision_variables.zeta[arc, p, p_prime, b].VarName,
-                  decision_variables.zeta[arc, p, p_prime, b].X)
+    for (arc, p, p_prime, e), value in solution.lambda_inter.items(tol):
+        if natural_language:
+            print("Routed traffic from VNF '{0}' placed on '{1}' to VNF '{2}' placed on '{3}'"
+                  " over the inter-domain edge '{4}' is: {5}".format(arc[0], p, arc[1], p_prime, e, value))
+        else:
+            print(solution.lambda_inter.name((arc, p, p_prime, e)), value)
+    for family in ["lambda_intra", "sigma_in", "sigma_out", "gamma", "kappa", "epsilon", "beta", "delta_inter",
+                   "delta_intra", "zeta"]:
+        print("# ==========================================================")
+        values = getattr(solution, family)
+        for key, value in values.items(tol):
+            print(values.name(key), value)
 
 
 def get_backward_edge_id(forward_edge_id):
@@ -237,26 +234,53 @@ def get_backward_edge_id(forward_edge_id):
     return backward_edge_id
 
 
+def get_vnf_functions(parameters):
+    """
+    :return: the compiled rate and cpu functions of the VNFs, compiled on first use
+    """
+    if parameters.vnf_functions is None:
+        parameters.vnf_functions = VnfFunctions(parameters.vnf_description)
+    return parameters.vnf_functions
+
+
 def evaluate_outgoing_rate(parameters, vnf, ingoing_rate):
     """
-    Helper function to evaluate the outgoing rate lambda that is marshalled as a string
+    Helper function to evaluate the outgoing rate function of a VNF
     :param vnf: unique identifier of a VNF (not the component name)
     :param ingoing_rate: the ingoing_rate which defines the outgoing_rate
-    :return: the evaluated lambda
+    :return: the evaluated function
     """
-    lambda_string = parameters.vnf_description["outgoing_rate"][vnf]
-    return eval(lambda_string)(ingoing_rate)
+    return get_vnf_functions(parameters).outgoing_rate[vnf](ingoing_rate)
 
 
 def evaluate_cpu_consumption(parameters, vnf, ingoing_rate):
     """
-    Helper function to evaluate the cpu consumption lambda that is marshalled as a string
+    Helper function to evaluate the cpu consumption function of a VNF
     :param vnf: unique identifier of a VNF (not the component name)
     :param ingoing_rate: the ingoing_rate which defines the cpu_consumption
-    :return: the evaluated lambda
+    :return: the evaluated function
+    """
+    return get_vnf_functions(parameters).cpu_consumption[vnf](ingoing_rate)
+
+
+def get_chain_rates(parameters, request_key):
     """
-    lambda_string = parameters.vnf_description["cpu_consumption"][vnf]
-    return eval(lambda_string)(ingoing_rate)
+    :return: the rate of each arc in the chain of the request, followed by the final rate arriving at DST
+    """
+    request = parameters.vnf_requests[request_key]
+    return get_vnf_functions(parameters).chain_rates(parameters.chains[request["vnf_chain"]], request["initial_rate"])
+
+
+def get_rate_of_arc(parameters, arc):
+    """
+    :param arc: a request arc of the form (A_request, B_request)
+    :return: the total rate the request sends over the arc
+    """
+    request_key = get_request_from_arc(arc[0])
+    chain = parameters.chains[parameters.vnf_requests[request_key]["vnf_chain"]]
+    rates = get_chain_rates(parameters, request_key)
+    ending_vnf = get_vnf_from_arc(arc[1])
+    return next((rates[index] for index, tup in enumerate(chain) if tup[1] == ending_vnf), rates[-1])
 
 
 def get_delay_of_path(parameters, path):
@@ -298,8 +322,28 @@ def level1_expansion(network_description_path, cpu_capacities, with_backward_pat
     with open(network_description_path, 'r') as network_description_file:
         network_description = yaml.load(network_description_file, Loader=yaml.FullLoader)
 
-        if network_description[key_intra_domain_paths] is None:
-            network_description[key_intra_domain_paths] = {}
+    expand_level1(network_description, cpu_capacities, with_backward_paths=with_backward_paths)
+
+    if not overwrite:
+        extended_network_description_path = network_description_path + "_extended"
+    else:
+        extended_network_description_path = network_description_path
+
+    with open(extended_network_description_path, 'w') as network_description_file:
+        yaml.dump(network_description, network_description_file)
+
+    return extended_network_description_path
+
+
+def expand_level1(network_description, cpu_capacities, with_backward_paths=False):
+    """
+    The in-memory counterpart of level1_expansion, completes the given network description.
+    :param network_description: the network description of a lowest level coordinator, it is changed
+    :param cpu_capacities: a dict mapping nodes to their cpu capacity
+    :return: the completed network description
+    """
+    if network_description[key_intra_domain_paths] is None:
+        network_description[key_intra_domain_paths] = {}
 
     # first add temporary nodes for each node
     for node_list in network_description["domain_nodes"].values():
@@ -319,16 +363,7 @@ def level1_expansion(network_description_path, cpu_capacities, with_backward_pat
                 "max_rate": 1000000
             }
             network_description[key_intra_domain_paths]["path" + node + "-temp-bw"] = backward_path
-
-    if not overwrite:
-        extended_network_description_path = network_description_path + "_extended"
-    else:
-        extended_network_description_path = network_description_path
-
-    with open(extended_network_description_path, 'w') as network_description_file:
-        yaml.dump(network_description, network_description_file)
-
-    return extended_network_description_path
+    return network_description
 
 
 def decision_variable_is_not_zero(variable):
@@ -0,0 +1,124 @@
+"""
+Rate and cpu functions of the VNFs. In vnf_descriptions.yaml a function is either given as a lambda string, which has
+to be affine in the ingoing rate, or as a list of [ingoing rate, value] breakpoints of a piecewise-linear function:
+
+outgoing_rate:
+  A: 'lambda in_rate: 1.5 * in_rate'
+  B: [[0, 0], [10, 8], [40, 20]]
+
+Each description is compiled once, affine functions expose their slope and intercept, piecewise-linear functions are
+added to the model as PWL constraints and are extended beyond their first and last breakpoint just like Gurobi does.
+"""
+import math
+
+# ingoing rates at which a lambda is additionally evaluated to make sure it is affine
+probe_rates = [0.5, 2, 10, 1000]
+
+
+class VnfFunction:
+    def __init__(self, description):
+        """
+        :param description: a lambda string or a list of [ingoing rate, value] breakpoints
+        """
+        self.description = description
+        self.__function = None
+        self.breakpoints = None
+        if isinstance(description, str):
+            self.__function = eval(description)
+            self.intercept = float(self.__function(0))
+            self.slope = float(self.__function(1)) - self.intercept
+            if not self.__is_line_through([(rate, float(self.__function(rate))) for rate in probe_rates]):
+                raise ValueError("The function '{}' is not affine, describe it by a list of [rate, value] breakpoints "
+                                 "instead".format(description))
+        else:
+            breakpoints = sorted((float(rate), float(value)) for rate, value in description)
+            if len(breakpoints) < 2 or len(set(rate for rate, _ in breakpoints)) < len(breakpoints):
+                raise ValueError("A piecewise-linear function needs at least two breakpoints with distinct rates, got "
+                                 "{}".format(description))
+            (first_rate, first_value), (second_rate, second_value) = breakpoints[:2]
+            self.slope = (second_value - first_value) / (second_rate - first_rate)
+            self.intercept = first_value - self.slope * first_rate
+            # collinear breakpoints describe an affine function, which does not need a PWL constraint
+            if not self.__is_line_through(breakpoints[2:]):
+                self.breakpoints = breakpoints
+                self.slope = None
+                self.intercept = None
+
+    def __is_line_through(self, points):
+        return all(math.isclose(value, self.slope * rate + self.intercept, rel_tol=1e-9, abs_tol=1e-9) for
+                   rate, value in points)
+
+    @property
+    def is_affine(self):
+        return self.breakpoints is None
+
+    def __call__(self, rate):
+        """
+        Evaluates the function. Affine functions can also be applied to gurobipy expressions.
+        """
+        if self.__function is not None:
+            # the compiled lambda keeps the expressions it produces identical to the described ones
+            return self.__function(rate)
+        if self.is_affine:
+            return self.slope * rate + self.intercept
+        index = self.__segment(rate, [breakpoint_rate for breakpoint_rate, _ in self.breakpoints])
+        (left_rate, left_value), (right_rate, right_value) = self.breakpoints[index:index + 2]
+        return left_value + (right_value - left_value) * (rate - left_rate) / (right_rate - left_rate)
+
+    def inverse(self, value):
+        """
+        :return: the ingoing rate for which the function takes the given value, None if the function is not strictly
+         increasing and thus not invertible
+        """
+        if self.is_affine:
+            if self.slope <= 0:
+                return None
+            return (value - self.intercept) / self.slope
+        values = [breakpoint_value for _, breakpoint_value in self.breakpoints]
+        if any(right <= left for left, right in zip(values, values[1:])):
+            return None
+        index = self.__segment(value, values)
+        (left_rate, left_value), (right_rate, right_value) = self.breakpoints[index:index + 2]
+        return left_rate + (right_rate - left_rate) * (value - left_value) / (right_value - left_value)
+
+    @staticmethod
+    def __segment(x, xs):
+        # index of the segment containing x, the first and the last segment are extended to infinity
+        index = 0
+        while index < len(xs) - 2 and x > xs[index + 1]:
+            index += 1
+        return index
+
+    def pwl_points(self):
+        """
+        :return: the rates and the values of the breakpoints, as expected by Model.addGenConstrPWL
+        """
+        return [rate for rate, _ in self.breakpoints], [value for _, value in self.breakpoints]
+
+
+class VnfFunctions:
+    """
+    The compiled rate and cpu functions of all VNFs of a vnf description. The rates along a chain are computed once
+    per chain and initial rate.
+    """
+
+    def __init__(self, vnf_description):
+        self.outgoing_rate = {vnf: VnfFunction(description) for vnf, description in
+                              vnf_description["outgoing_rate"].items()}
+        self.cpu_consumption = {vnf: VnfFunction(description) for vnf, description in
+                                vnf_description["cpu_consumption"].items()}
+        self.__chain_rates = {}
+
+    def chain_rates(self, chain, initial_rate):
+        """
+        :param chain: the (A, B) pairs of a vnf chain, starting with SRC
+        :param initial_rate: the rate leaving SRC
+        :return: the rate of each arc of the chain, followed by the rate arriving at the end of the chain
+        """
+        key = (tuple(tuple(arc) for arc in chain), initial_rate)
+        if key not in self.__chain_rates:
+            rates = [initial_rate]
+            for arc in chain:
+                rates.append(self.outgoing_rate[arc[1]](rates[-1]))
+            self.__chain_rates[key] = rates
+        return self.__chain_rates[key]
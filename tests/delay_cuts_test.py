@@ -0,0 +1,37 @@
+import pytest
+import yaml
+from gurobipy import GRB
+
+import src.hvc.mip.gurobipy_mip as gmip
+
+
+def __solve(tmp_path, max_delay, **options):
+    with open("testfiles/scenario_4/vnf_requests.yaml") as requests:
+        vnf_requests = yaml.safe_load(requests)
+    vnf_requests["request1"]["max_delay"] = max_delay
+    request_file = tmp_path / "vnf_requests.yaml"
+    with open(request_file, 'w') as requests:
+        yaml.dump(vnf_requests, requests)
+    _, _, _, model = gmip.solve_model(network_description_file="testfiles/scenario_4/network_description.yaml",
+                                      chain_description_file="testfiles/scenario_4/chains.yaml",
+                                      vnf_description_file="testfiles/scenario_4/vnf_descriptions.yaml",
+                                      vnf_request_description_file=str(request_file),
+                                      advertised_restriction_file="testfiles/scenario_4/advertised_restrictions.yaml",
+                                      **options)
+    if model.Status != GRB.OPTIMAL:
+        return model.Status, None
+    return model.Status, [model.getObjective(objective).getValue() for objective in range(model.NumObj)]
+
+
+@pytest.mark.parametrize("max_delay", [30, 18, 16])
+def test_lazy_delay_constraints(tmp_path, max_delay):
+    expected_status, expected_objectives = __solve(tmp_path, max_delay, with_delay_constraints=True)
+    status, objectives = __solve(tmp_path, max_delay, lazy_delay_constraints=True)
+    assert status == expected_status
+    if expected_objectives is not None:
+        assert objectives == pytest.approx(expected_objectives)
+
+
+def test_lazy_and_defined_delay_constraints_exclude_each_other(tmp_path):
+    with pytest.raises(ValueError):
+        __solve(tmp_path, 30, with_delay_constraints=True, lazy_delay_constraints=True)
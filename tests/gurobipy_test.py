@@ -1,6 +1,11 @@
+import os
+
+import pytest
 from gurobipy import GRB
 
 import src.hvc.mip.gurobipy_mip as gmip
+from src.hvc.mip.model_cache import ModelCache
+from src.hvc.mip.models import SolvePolicy
 from src.hvc.mip.utils import pretty_print_solution
 
 
@@ -22,8 +27,7 @@ def test_scenario_1():
     all_egresses = [request["egress"] for request in parameters.vnf_requests.values()]
     num_ingress_egress_nodes = len(set(all_ingresses)) + len(set(all_egresses))
 
-    assert sum(decision_vars.gamma[vnf, path].X for vnf in indices.vnfs for path in
-               indices.paths) == 2 + num_ingress_egress_nodes
+    assert sum(gamma.X for gamma in decision_vars.gamma.values()) == 2 + num_ingress_egress_nodes
 
 
 # just a single request but the inter domain edge e1 has such a huge delay that the request has to be routed over e2
@@ -51,8 +55,7 @@ def test_scenario_2():
     pretty_print_solution(indices=indices, decision_variables=decision_vars, model=model)
 
     # check if there are only two placements(+ SRC and DST placement):
-    assert sum(
-        decision_vars.gamma[vnf, path].X for vnf in indices.vnfs for path in indices.paths) == 2 + 2
+    assert sum(gamma.X for gamma in decision_vars.gamma.values()) == 2 + 2
 
     # check if A is placed on p2 and B on p4
     assert decision_vars.gamma["A", "p2"].X + decision_vars.gamma["A", "p1"].X == 1.0
@@ -121,3 +124,187 @@ def test_scenario_4():
 
     assert decision_vars.gamma["A", "p3"].X + decision_vars.gamma["A", "p4"].X == 1.0
     assert decision_vars.gamma["A", "p1"].X + decision_vars.gamma["A", "p2"].X == 0.0
+
+
+# the build profile has to account for every constraint of the model
+def test_build_profile(tmp_path):
+    network_description_file = "testfiles/scenario_4/network_description.yaml"
+    vnf_description_file = "testfiles/scenario_4/vnf_descriptions.yaml"
+    chain_description_file = "testfiles/scenario_4/chains.yaml"
+    advertised_restriction_file = "testfiles/scenario_4/advertised_restrictions.yaml"
+    vnf_request_description_file = "testfiles/scenario_4/vnf_requests.yaml"
+
+    parameters, indices, decision_vars, model, profile = gmip.solve_model(
+        network_description_file=network_description_file,
+        chain_description_file=chain_description_file,
+        vnf_description_file=vnf_description_file,
+        vnf_request_description_file=vnf_request_description_file,
+        advertised_restriction_file=advertised_restriction_file,
+        output_file=str(tmp_path),
+        profile_build=True)
+
+    assert sum(family["constraints"] for family in profile["families"].values()) == model.NumConstrs
+    assert sum(family["general_constraints"] for family in profile["families"].values()) == model.NumGenConstrs
+    assert sum(profile["variables"].values()) <= model.NumVars
+    assert (tmp_path / "build_profile.yaml").exists()
+
+
+def test_indicator_constraints():
+    network_description_file = "testfiles/scenario_4/network_description.yaml"
+    vnf_description_file = "testfiles/scenario_4/vnf_descriptions.yaml"
+    chain_description_file = "testfiles/scenario_4/chains.yaml"
+    advertised_restriction_file = "testfiles/scenario_4/advertised_restrictions.yaml"
+    vnf_request_description_file = "testfiles/scenario_4/vnf_requests.yaml"
+
+    objective_values = []
+    for use_indicators in [False, True]:
+        parameters, indices, decision_vars, model = gmip.solve_model(
+            network_description_file=network_description_file,
+            chain_description_file=chain_description_file,
+            vnf_description_file=vnf_description_file,
+            vnf_request_description_file=vnf_request_description_file,
+            advertised_restriction_file=advertised_restriction_file,
+            use_indicators=use_indicators)
+        assert model.Status == GRB.OPTIMAL
+        # the variable bounds derived from the requests hold in the optimal solution
+        for key, variable in decision_vars.lambda_total.items():
+            assert variable.X <= indices.bounds.lambda_total[key] + 1e-6
+        objective_values.append([model.getObjective(objective).getValue() for objective in range(model.NumObj)])
+
+    assert objective_values[0] == objective_values[1]
+
+
+def test_warm_start(tmp_path):
+    network_description_file = "testfiles/scenario_4/network_description.yaml"
+    vnf_description_file = "testfiles/scenario_4/vnf_descriptions.yaml"
+    chain_description_file = "testfiles/scenario_4/chains.yaml"
+    advertised_restriction_file = "testfiles/scenario_4/advertised_restrictions.yaml"
+    vnf_request_description_file = "testfiles/scenario_4/vnf_requests.yaml"
+
+    parameters, indices, decision_vars, model = gmip.solve_model(
+        network_description_file=network_description_file,
+        chain_description_file=chain_description_file,
+        vnf_description_file=vnf_description_file,
+        vnf_request_description_file=vnf_request_description_file,
+        advertised_restriction_file=advertised_restriction_file,
+        output_file=str(tmp_path))
+    placements = {key: variable.X for key, variable in decision_vars.gamma.items()}
+    rates = {family: {key: variable.X for key, variable in getattr(decision_vars, family).items()}
+             for family in ["lambda_total", "lambda_inter"]}
+
+    parameters, indices, decision_vars, warm_model = gmip.solve_model(
+        network_description_file=network_description_file,
+        chain_description_file=chain_description_file,
+        vnf_description_file=vnf_description_file,
+        vnf_request_description_file=vnf_request_description_file,
+        advertised_restriction_file=advertised_restriction_file,
+        warm_start=str(tmp_path))
+
+    assert warm_model.Status == GRB.OPTIMAL
+    # the previously used placements are the start values of the new model
+    for key, variable in decision_vars.gamma.items():
+        if placements[key] > 0.5:
+            assert variable.Start == 1
+    # the names of the variables keyed by an arc contain whitespace, they are started as well
+    for family in ["lambda_total", "lambda_inter"]:
+        started = [key for key, variable in getattr(decision_vars, family).items() if rates[family][key] > 1e-4]
+        assert len(started) > 0
+        for key in started:
+            assert getattr(decision_vars, family)[key].Start == pytest.approx(rates[family][key])
+    assert [warm_model.getObjective(objective).getValue() for objective in range(warm_model.NumObj)] == \
+           [model.getObjective(objective).getValue() for objective in range(model.NumObj)]
+
+
+def test_solve_policies():
+    network_description_file = "testfiles/scenario_4/network_description.yaml"
+    vnf_description_file = "testfiles/scenario_4/vnf_descriptions.yaml"
+    chain_description_file = "testfiles/scenario_4/chains.yaml"
+    advertised_restriction_file = "testfiles/scenario_4/advertised_restrictions.yaml"
+    vnf_request_description_file = "testfiles/scenario_4/vnf_requests.yaml"
+
+    policies = {
+        "hierarchical": SolvePolicy(time_limits=[60, 10, 5], mip_gaps=[0, 1e-4, 1e-2],
+                                    relative_tolerances=[0, 0.1, None]),
+        "blended": SolvePolicy(mode="blended", time_limits=[60, None, None]),
+        "primary": SolvePolicy(mode="primary"),
+    }
+    objective_values = {}
+    for mode, policy in policies.items():
+        parameters, indices, decision_vars, model = gmip.solve_model(
+            network_description_file=network_description_file,
+            chain_description_file=chain_description_file,
+            vnf_description_file=vnf_description_file,
+            vnf_request_description_file=vnf_request_description_file,
+            advertised_restriction_file=advertised_restriction_file,
+            solve_policy=policy)
+        assert model.Status == GRB.OPTIMAL
+        objective_values[mode] = [model.getObjective(objective).getValue() for objective in range(model.NumObj)]
+
+    assert objective_values["hierarchical"] == [13, 10, 2]
+    assert objective_values["blended"] == [13, 10, 2]
+    # the lower priority objectives are dropped
+    assert objective_values["primary"] == [13]
+
+    with pytest.raises(ValueError):
+        SolvePolicy(mode="lexicographic")
+
+
+def test_model_cache(tmp_path):
+    network_description_file = "testfiles/scenario_4/network_description.yaml"
+    vnf_description_file = "testfiles/scenario_4/vnf_descriptions.yaml"
+    chain_description_file = "testfiles/scenario_4/chains.yaml"
+    advertised_restriction_file = "testfiles/scenario_4/advertised_restrictions.yaml"
+    vnf_request_description_file = "testfiles/scenario_4/vnf_requests.yaml"
+    model_cache = ModelCache(str(tmp_path / "cache"))
+
+    solutions = []
+    for seed in [0, 1]:
+        output_path = tmp_path / "seed_{}".format(seed)
+        output_path.mkdir()
+        parameters, indices, decision_vars, model = gmip.solve_model(
+            network_description_file=network_description_file,
+            chain_description_file=chain_description_file,
+            vnf_description_file=vnf_description_file,
+            vnf_request_description_file=vnf_request_description_file,
+            advertised_restriction_file=advertised_restriction_file,
+            output_file=str(output_path), seed=seed, model_cache=model_cache)
+        assert model.Status == GRB.OPTIMAL
+        assert [model.getObjective(objective).getValue() for objective in range(model.NumObj)] == [13, 10, 2]
+        solutions.append((output_path / "full_solution.log").read_text())
+
+    # the second run reloaded the model, including its variable names
+    assert len(os.listdir(str(tmp_path / "cache"))) == 1
+    assert solutions[0] == solutions[1]
+
+    # other options are a different entry, the least recently used one is evicted when the cache is full
+    model_cache.max_size = 1
+    gmip.get_model(network_description_file, vnf_description_file, chain_description_file,
+                   vnf_request_description_file, advertised_restriction_file, use_indicators=True,
+                   model_cache=model_cache)
+    assert len(os.listdir(str(tmp_path / "cache"))) == 1
+
+
+def test_solve_with_seeds(tmp_path):
+    network_description_file = "testfiles/scenario_4/network_description.yaml"
+    vnf_description_file = "testfiles/scenario_4/vnf_descriptions.yaml"
+    chain_description_file = "testfiles/scenario_4/chains.yaml"
+    advertised_restriction_file = "testfiles/scenario_4/advertised_restrictions.yaml"
+    vnf_request_description_file = "testfiles/scenario_4/vnf_requests.yaml"
+
+    parameters, indices, decision_vars, results = gmip.solve_model_with_seeds(
+        network_description_file=network_description_file,
+        chain_description_file=chain_description_file,
+        vnf_description_file=vnf_description_file,
+        vnf_request_description_file=vnf_request_description_file,
+        advertised_restriction_file=advertised_restriction_file,
+        seeds=[0, 1, 2], output_file=str(tmp_path))
+
+    assert sorted(results) == [0, 1, 2]
+    for seed, result in results.items():
+        assert result.status == GRB.OPTIMAL
+        assert result.objective_values == [13, 10, 2]
+    # the first seed is the solution of the model, the others are saved next to it
+    assert sum(variable.X for variable in decision_vars.gamma.values()) == 3
+    assert (tmp_path / "full_solution.log").exists()
+    assert (tmp_path / "seed_1" / "full_solution.log").exists()
+    assert (tmp_path / "seed_2" / "solution.log").exists()
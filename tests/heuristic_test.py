@@ -0,0 +1,44 @@
+import pytest
+from gurobipy import GRB
+
+import src.hvc.mip.gurobipy_mip as gmip
+import src.hvc.mip.heuristic as heuristic
+
+
+def __scenario_files(scenario):
+    return dict(network_description_file="testfiles/{}/network_description.yaml".format(scenario),
+                chain_description_file="testfiles/{}/chains.yaml".format(scenario),
+                vnf_description_file="testfiles/{}/vnf_descriptions.yaml".format(scenario),
+                vnf_request_description_file="testfiles/{}/vnf_requests.yaml".format(scenario),
+                advertised_restriction_file="testfiles/{}/advertised_restrictions.yaml".format(scenario))
+
+
+@pytest.mark.parametrize("scenario", ["scenario_1", "scenario_2", "scenario_3", "scenario_4", "scenario_4_pwl"])
+def test_heuristic_places_all_requests(scenario):
+    parameters, indices, decision_vars, result = heuristic.solve_model(**__scenario_files(scenario))
+    assert result.feasible
+    # every arc of every request is placed exactly once
+    placed_arcs = [arc for arc, p, p_prime in decision_vars.lambda_total]
+    assert sorted(placed_arcs) == sorted(indices.arcs)
+
+
+@pytest.mark.parametrize("scenario", ["scenario_1", "scenario_2", "scenario_3", "scenario_4", "scenario_4_pwl"])
+def test_heuristic_solution_is_feasible_for_mip(scenario):
+    files = __scenario_files(scenario)
+    _, _, heuristic_vars, result = heuristic.solve_model(**files)
+    _, _, _, optimal_model = gmip.solve_model(**files)
+    optimal_values = [optimal_model.getObjective(objective).getValue() for objective in range(optimal_model.NumObj)]
+
+    # fix the placements and routes of the heuristic in the MIP, which then has to remain feasible
+    _, _, decision_vars, model = gmip.get_model(**files)
+    for family in ["lambda_total", "lambda_inter", "lambda_intra", "gamma"]:
+        heuristic_values = getattr(heuristic_vars, family)
+        for key, variable in getattr(decision_vars, family).items():
+            value = heuristic_values[key].X if key in heuristic_values else 0
+            variable.LB = value
+            variable.UB = value
+    model.optimize()
+    assert model.Status == GRB.OPTIMAL
+    assert [model.getObjective(objective).getValue() for objective in range(model.NumObj)] == pytest.approx(
+        result.objective_values)
+    assert result.objective_values[0] >= optimal_values[0] - 1e-6
@@ -0,0 +1,74 @@
+import copy
+
+import networkx as nx
+import pytest
+import yaml
+from gurobipy import GRB
+
+import src.hvc.api.graphml as gml
+import src.hvc.mip.gurobipy_mip as gmip
+from src.hvc.coordinator.coordinator import Coordinator
+from src.hvc.mip.model_cache import ModelCache
+
+
+def __scenario_files(scenario):
+    return dict(network_description_file="testfiles/{}/network_description.yaml".format(scenario),
+                chain_description_file="testfiles/{}/chains.yaml".format(scenario),
+                vnf_description_file="testfiles/{}/vnf_descriptions.yaml".format(scenario),
+                vnf_request_description_file="testfiles/{}/vnf_requests.yaml".format(scenario),
+                advertised_restriction_file="testfiles/{}/advertised_restrictions.yaml".format(scenario))
+
+
+def __objective_values(model):
+    return [model.getObjective(objective).getValue() for objective in range(model.NumObj)]
+
+
+@pytest.mark.parametrize("scenario", ["scenario_4", "scenario_4_pwl"])
+def test_solve_model_with_parameters(scenario):
+    files = __scenario_files(scenario)
+    parameters = gmip.load_descriptions(**files)
+    unchanged_parameters = copy.deepcopy(parameters)
+
+    _, _, _, model = gmip.solve_model(parameters=parameters)
+    _, _, _, expected_model = gmip.solve_model(**files)
+    assert model.Status == GRB.OPTIMAL
+    assert __objective_values(model) == pytest.approx(__objective_values(expected_model))
+    # the temporary paths are only added to the copy of the model
+    assert parameters.descriptions() == unchanged_parameters.descriptions()
+
+
+def test_model_cache_key_of_parameters():
+    parameters = gmip.load_descriptions(**__scenario_files("scenario_4"))
+    key = ModelCache.key(parameters.descriptions(), {})
+    assert ModelCache.key(gmip.load_descriptions(**__scenario_files("scenario_4")).descriptions(), {}) == key
+
+    parameters.vnf_requests["request1"]["initial_rate"] += 1
+    assert ModelCache.key(parameters.descriptions(), {}) != key
+
+
+def test_descriptions_match_written_files(tmp_path):
+    scenario = "graph_ml_scenario_1"
+    with open("testfiles/{}/input/hierarchy.yaml".format(scenario), 'r') as hierarchy_file:
+        hierarchy = yaml.safe_load(hierarchy_file)
+    root_coordinator = Coordinator(name="rootCoordinator", is_root_coordinator=True,
+                                   child_coordinators=gml.read_child_coordinators("rootCoordinator", hierarchy))
+    graph = nx.DiGraph(nx.read_gml("testfiles/{}/input/atlanta_extended.gml".format(scenario)))
+    for edge in graph.edges:
+        graph.edges[edge]["max_rate"] = graph.edges[edge]["maxRate"]
+    with open("testfiles/{}/input/vnf_requests.yaml".format(scenario), 'r') as vnf_requests_file:
+        vnf_requests = yaml.safe_load(vnf_requests_file)
+    root_coordinator.build_hierarchy(network=graph,
+                                     vnf_ingresses=list({request["ingress"] for request in vnf_requests.values()}),
+                                     vnf_egresses=list({request["egress"] for request in vnf_requests.values()}))
+    root_coordinator.compute_advertised_paths()
+    root_coordinator.write_network_description(str(tmp_path))
+    root_coordinator.write_advertised_restriction(str(tmp_path))
+
+    coordinators = [(root_coordinator, tmp_path)]
+    while len(coordinators) > 0:
+        coordinator, folder = coordinators.pop()
+        with open(folder / "network_description.yaml", 'r') as network_description_file, \
+                open(folder / "advertised_restrictions.yaml", 'r') as advertised_restriction_file:
+            assert yaml.safe_load(network_description_file) == coordinator.network_description()
+            assert yaml.safe_load(advertised_restriction_file) == coordinator.advertised_restrictions()
+        coordinators += [(child, folder / child.name) for child in coordinator.child_coordinators]
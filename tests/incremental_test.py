@@ -0,0 +1,54 @@
+import pytest
+import yaml
+from gurobipy import GRB
+
+import src.hvc.mip.gurobipy_mip as gmip
+from src.hvc.mip.incremental import IncrementalModel
+
+
+def __scenario_files(scenario):
+    return dict(network_description_file="testfiles/{}/network_description.yaml".format(scenario),
+                chain_description_file="testfiles/{}/chains.yaml".format(scenario),
+                vnf_description_file="testfiles/{}/vnf_descriptions.yaml".format(scenario),
+                vnf_request_description_file="testfiles/{}/vnf_requests.yaml".format(scenario),
+                advertised_restriction_file="testfiles/{}/advertised_restrictions.yaml".format(scenario))
+
+
+def __objective_values(model):
+    return [model.getObjective(objective).getValue() for objective in range(model.NumObj)]
+
+
+def __solve_from_scratch(files, vnf_requests, tmp_path):
+    request_file = tmp_path / "vnf_requests.yaml"
+    with open(request_file, 'w') as requests:
+        yaml.dump(vnf_requests, requests)
+    _, _, _, model = gmip.solve_model(**dict(files, vnf_request_description_file=str(request_file)))
+    assert model.Status == GRB.OPTIMAL
+    return model
+
+
+@pytest.mark.parametrize("fix_untouched", [False, True])
+def test_add_and_remove_request(tmp_path, fix_untouched):
+    files = __scenario_files("scenario_4")
+    incremental_model = IncrementalModel(**files, fix_untouched=fix_untouched)
+    vnf_requests = dict(incremental_model.parameters.vnf_requests)
+    _, _, _, model = incremental_model.solve()
+    assert model.Status == GRB.OPTIMAL
+    assert __objective_values(model) == pytest.approx([13, 10, 2])
+    # the rows of the placements of request1 that do not involve the paths of other requests
+    rows_of_request1 = incremental_model.placement_rows["request1"][frozenset()]
+
+    vnf_requests["request2"] = dict(vnf_requests["request1"], ingress="v2", initial_rate=1, vnf_chain="chain2")
+    incremental_model.add_request("request2", vnf_requests["request2"])
+    _, _, _, model = incremental_model.solve()
+    assert model.Status == GRB.OPTIMAL
+    assert incremental_model.placement_rows["request1"][frozenset()] is rows_of_request1
+    expected_model = __solve_from_scratch(files, vnf_requests, tmp_path)
+    assert (model.NumVars, model.NumConstrs, model.NumGenConstrs) == (
+        expected_model.NumVars, expected_model.NumConstrs, expected_model.NumGenConstrs)
+    assert __objective_values(model) == pytest.approx(__objective_values(expected_model))
+
+    incremental_model.remove_request("request2")
+    _, _, _, model = incremental_model.solve()
+    assert model.Status == GRB.OPTIMAL
+    assert __objective_values(model) == pytest.approx([13, 10, 2])
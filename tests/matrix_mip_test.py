@@ -0,0 +1,26 @@
+import pytest
+from gurobipy import GRB
+
+import src.hvc.mip.gurobipy_mip as gmip
+
+
+def __objective_values(scenario, builder):
+    parameters, indices, decision_vars, model = gmip.solve_model(
+        network_description_file="testfiles/{}/network_description.yaml".format(scenario),
+        chain_description_file="testfiles/{}/chains.yaml".format(scenario),
+        vnf_description_file="testfiles/{}/vnf_descriptions.yaml".format(scenario),
+        vnf_request_description_file="testfiles/{}/vnf_requests.yaml".format(scenario),
+        advertised_restriction_file="testfiles/{}/advertised_restrictions.yaml".format(scenario),
+        builder=builder)
+    assert model.Status == GRB.OPTIMAL
+    values = []
+    for objective in range(model.NumObj):
+        model.setParam(GRB.Param.ObjNumber, objective)
+        values.append(model.ObjNVal)
+    return values
+
+
+# both builders have to define the same model, thus the optimal values of all objectives match
+@pytest.mark.parametrize("scenario", ["scenario_1", "scenario_2", "scenario_3", "scenario_4"])
+def test_matrix_builder_matches_quicksum_builder(scenario):
+    assert __objective_values(scenario, "matrix") == pytest.approx(__objective_values(scenario, "quicksum"))
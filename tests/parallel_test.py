@@ -0,0 +1,119 @@
+import pickle
+
+import networkx as nx
+import pytest
+import yaml
+
+import src.hvc.api.graphml as gml
+from src.hvc.coordinator.coordinator import Coordinator
+from src.hvc.mip.models import Parameters
+from src.hvc.mip.utils import key_inter_domain_edges, key_intra_domain_paths
+
+
+def __hierarchy(scenario, workers=None):
+    """
+    :param workers: the number of worker processes computing the advertised paths
+    :return: the root coordinator of the hierarchy of the scenario with its advertised paths and the Parameters of the
+     root coordinator
+    """
+    folder = "testfiles/{}/input/".format(scenario)
+    with open(folder + "hierarchy.yaml", 'r') as hierarchy_file, \
+            open(folder + "vnf_requests.yaml", 'r') as vnf_requests_file, \
+            open(folder + "vnf_descriptions.yaml", 'r') as vnf_description_file, \
+            open(folder + "chains.yaml", 'r') as chains_file:
+        hierarchy = yaml.safe_load(hierarchy_file)
+        vnf_requests = yaml.safe_load(vnf_requests_file)
+        vnf_description = yaml.safe_load(vnf_description_file)
+        chains = yaml.load(chains_file, Loader=yaml.FullLoader)
+    root_coordinator = Coordinator(name="rootCoordinator", is_root_coordinator=True,
+                                   child_coordinators=gml.read_child_coordinators("rootCoordinator", hierarchy))
+    graph = nx.DiGraph(nx.read_gml(folder + "atlanta_extended.gml"))
+    for edge in graph.edges:
+        graph.edges[edge]["max_rate"] = graph.edges[edge]["maxRate"]
+    root_coordinator.build_hierarchy(network=graph,
+                                     vnf_ingresses=list({request["ingress"] for request in vnf_requests.values()}),
+                                     vnf_egresses=list({request["egress"] for request in vnf_requests.values()}))
+    root_coordinator.compute_advertised_paths(workers=workers)
+    parameters = Parameters(network_description=root_coordinator.network_description(),
+                            vnf_description=vnf_description, chains=chains, vnf_requests=vnf_requests,
+                            advertised_restrictions=root_coordinator.advertised_restrictions())
+    return root_coordinator, parameters
+
+
+def __unordered_paths(advertised_restrictions):
+    # the paths of a restriction are collected from a set, their order depends on the hash seed of the process
+    return {kind: {identifier: dict(restriction, paths=sorted(restriction["paths"]))
+                   for identifier, restriction in restrictions.items()}
+            for kind, restrictions in advertised_restrictions.items()}
+
+
+@pytest.mark.parametrize("workers", [2, 8])
+def test_parallel_path_computation_matches_sequential_computation(workers):
+    root_coordinator, _ = __hierarchy("graph_ml_scenario_1")
+    parallel_root_coordinator, _ = __hierarchy("graph_ml_scenario_1", workers=workers)
+    coordinators = [(root_coordinator, parallel_root_coordinator)]
+    while len(coordinators) > 0:
+        coordinator, parallel_coordinator = coordinators.pop()
+        network_description = coordinator.network_description()
+        parallel_network_description = parallel_coordinator.network_description()
+        assert parallel_network_description[key_intra_domain_paths] == network_description[key_intra_domain_paths]
+        assert parallel_network_description[key_inter_domain_edges] == network_description[key_inter_domain_edges]
+        assert __unordered_paths(parallel_coordinator.advertised_restrictions()) == \
+            __unordered_paths(coordinator.advertised_restrictions())
+        coordinators += list(zip(coordinator.child_coordinators, parallel_coordinator.child_coordinators))
+
+
+def test_coordinators_can_be_pickled():
+    root_coordinator, _ = __hierarchy("graph_ml_scenario_1")
+    copied_coordinator = pickle.loads(pickle.dumps(root_coordinator))
+    coordinators = [(root_coordinator, copied_coordinator)]
+    while len(coordinators) > 0:
+        coordinator, copy = coordinators.pop()
+        assert copy.name == coordinator.name
+        network_description = coordinator.network_description()
+        copied_network_description = copy.network_description()
+        for description in [network_description, copied_network_description]:
+            # the domain nodes are collected from a set as well
+            description["domain_nodes"] = {domain: sorted(nodes) for domain, nodes in
+                                           description["domain_nodes"].items()}
+        assert copied_network_description == network_description
+        assert __unordered_paths(copy.advertised_restrictions()) == \
+            __unordered_paths(coordinator.advertised_restrictions())
+        coordinators += list(zip(coordinator.child_coordinators, copy.child_coordinators))
+
+
+@pytest.mark.parametrize("scenario", ["graph_ml_scenario_1"])
+def test_parallel_solve_matches_sequential_solve(scenario):
+    overlay_solutions = []
+    for workers in [None, 2]:
+        root_coordinator, parameters = __hierarchy(scenario)
+        solutions = {}
+        gml.recursively_solve_model(None, root_coordinator, solvers=["heuristic"], parameters=parameters,
+                                    solutions=solutions, workers=workers, num_threads=1)
+        overlay_solutions.append(root_coordinator.collect_solution_records(solutions=solutions))
+        assert set(solutions) <= set(gml.delta)
+    assert len(overlay_solutions[0]) > 0
+    assert overlay_solutions[1] == pytest.approx(overlay_solutions[0])
+
+
+def test_incremental_models_are_not_shared_with_workers():
+    root_coordinator, parameters = __hierarchy("graph_ml_scenario_1")
+    with pytest.raises(ValueError):
+        gml.recursively_solve_model(None, root_coordinator, parameters=parameters, incremental_models={}, workers=2)
+
+
+def test_streamed_request_mappings_match_returned_mappings(tmp_path):
+    root_coordinator, parameters = __hierarchy("graph_ml_scenario_1")
+    solutions = {}
+    gml.recursively_solve_model(str(tmp_path), root_coordinator, solvers=["heuristic"], parameters=parameters,
+                                solutions=solutions, workers=2, num_threads=1)
+    coordinators = [(root_coordinator, tmp_path)]
+    while len(coordinators) > 0:
+        coordinator, folder = coordinators.pop()
+        if coordinator.is_lowest_hierarchy or coordinator.name not in solutions:
+            continue
+        with open(folder / "request_mappings.yaml", 'r') as request_mappings_file:
+            request_mappings = yaml.load(request_mappings_file, Loader=yaml.FullLoader)
+        assert request_mappings == solutions[coordinator.name]["request_mappings"]
+        assert set(request_mappings) == {child.name for child in coordinator.child_coordinators}
+        coordinators += [(child, folder / child.name) for child in coordinator.child_coordinators]
@@ -1,6 +1,10 @@
-from src.hvc.api.graphml import read_hierarchy, __read_graph
+import networkx as nx
 import yaml as yaml
 
+import src.hvc.coordinator.path_computing as pc
+from src.hvc.api.graphml import read_hierarchy, read_child_coordinators, __read_graph
+from src.hvc.coordinator.coordinator import Coordinator
+
 
 def test_scenario_1():
     ingresses, egresses = set(), set()
@@ -27,4 +31,68 @@ def test_scenario_1():
     root_coordinator.build_hierarchy(network=graph, vnf_ingresses=list(ingresses), vnf_egresses=list(egresses))
     root_coordinator.compute_advertised_paths()
     root_coordinator.write_network_description(output_path)
-    root_coordinator.write_advertised_restriction(output_path)
\ No newline at end of file
+    root_coordinator.write_advertised_restriction(output_path)
+
+
+def test_edge_index():
+    substrate = nx.DiGraph()
+    substrate.add_edge("N1", "N2", id=4, max_rate=10)
+    substrate.add_edge("N2", "N1", id=5, max_rate=10)
+    assert pc.get_edge(substrate, 5) == ("N2", "N1")
+    assert pc.get_edge(substrate, "4") == ("N1", "N2")
+    assert pc.get_edge(substrate, 6) is None
+
+    expanded = nx.MultiDiGraph()
+    expanded.add_edge("N1", "N2", key="path_0", max_rate=3)
+    expanded.add_edge("N1", "N2", key="path_2", max_rate=7)
+    pc.index_edges(expanded)
+    assert pc.get_edge(expanded, "path_2") == ("N1", "N2", "path_2")
+    assert expanded.edges[pc.get_edge(expanded, "path_2")]["max_rate"] == 7
+
+
+def test_inter_domain_links_of_hierarchy():
+    graph = nx.DiGraph()
+    for edge_id, (u, v) in enumerate([("N1", "N3"), ("N3", "N1"), ("N2", "N4"), ("N4", "N2"), ("N3", "N4"),
+                                      ("N4", "N3"), ("N1", "N2"), ("N2", "N1")]):
+        graph.add_edge(u, v, id=edge_id, max_rate=10, delay=1)
+    domain_a = Coordinator(child_coordinators=[], name="A", nodes=["N1", "N2"])
+    domain_b = Coordinator(child_coordinators=[], name="B", nodes=["N3"])
+    domain_c = Coordinator(child_coordinators=[], name="C", nodes=["N4"])
+    root_coordinator = Coordinator(child_coordinators=[domain_a, domain_b, domain_c], name="rootCoordinator",
+                                   is_root_coordinator=True)
+    root_coordinator.build_hierarchy(network=graph, vnf_ingresses=["N1"], vnf_egresses=["N4"])
+
+    # ordered by the pairs of domains, then by the pairs of their nodes
+    assert [link.identifier for link in root_coordinator.inter_domain_links] == \
+           ["edge_0", "edge_1", "edge_2", "edge_3", "edge_4", "edge_5"]
+    assert root_coordinator.get_child_coordinators_of("N2") == [domain_a]
+    assert root_coordinator.get_child_coordinators_of("N5") == []
+    assert dict(domain_a.border_nodes_in_higher_domains) == {domain_b: {"N1"}, domain_c: {"N2"}, "ingress": {"N1"}}
+    assert dict(domain_c.border_nodes_in_higher_domains) == {domain_a: {"N4"}, domain_b: {"N4"}, "egress": {"N4"}}
+
+
+def __advertised_paths(path_aggregation, paths_per_pair=None):
+    scenario = "graph_ml_scenario_1"
+    with open("testfiles/{0}/input/vnf_requests.yaml".format(scenario)) as vnf_request_file, \
+            open("testfiles/{0}/input/hierarchy.yaml".format(scenario)) as hierarchy_file:
+        vnf_requests = yaml.safe_load(vnf_request_file)
+        hierarchy = yaml.safe_load(hierarchy_file)
+    graph = __read_graph("testfiles/{0}/input/atlanta_extended.gml".format(scenario))
+    root_coordinator = Coordinator(name="rootCoordinator", is_root_coordinator=True,
+                                   child_coordinators=read_child_coordinators("rootCoordinator", hierarchy))
+    root_coordinator.build_hierarchy(network=graph,
+                                     vnf_ingresses=list({request["ingress"] for request in vnf_requests.values()}),
+                                     vnf_egresses=list({request["egress"] for request in vnf_requests.values()}))
+    root_coordinator.compute_advertised_paths(path_aggregation=path_aggregation, paths_per_pair=paths_per_pair)
+    advertised_paths, coordinators = {}, [root_coordinator]
+    while len(coordinators) > 0:
+        coordinator = coordinators.pop()
+        advertised_paths[coordinator.name] = sorted(coordinator.network_description()["intra_domain_paths"].items())
+        coordinators += coordinator.child_coordinators
+    return advertised_paths
+
+
+def test_k_paths():
+    assert __advertised_paths("k_paths", [1]) == __advertised_paths("one_path")
+    assert __advertised_paths("k_paths", [2]) == __advertised_paths("two_paths")
+    assert __advertised_paths("k_paths", [100]) == __advertised_paths("full_expansion")
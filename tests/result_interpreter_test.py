@@ -0,0 +1,23 @@
+import yaml
+
+from src.hvc.experiments.result_interpreter import read_overlay_solution_index
+
+
+def test_overlay_solution_index(tmp_path):
+    overlay_solution = {
+        "lambda_inter[(SRC_request1,A_request1), path_1, path_2, edge_1]": 2.0,
+        "lambda_inter[(A_request1,DST_request1), path_2, egress_v3, edge_2]": 1.5,
+        "lambda_inter[(SRC_request10,A_request10), path_1, path_4, edge_3]": 4.0,
+        "gamma[A, path_2]": 1.0,
+        "gamma[A, path_4]": 1.0,
+    }
+    with open(tmp_path / "overlay_solution.yaml", 'w') as overlay_solution_file:
+        yaml.dump(overlay_solution, overlay_solution_file)
+
+    index = read_overlay_solution_index(str(tmp_path))
+    assert sorted(index.edges_of_request("request1")) == ["edge_1", "edge_2"]
+    assert index.edges_of_request("request10") == ["edge_3"]
+    assert index.edges_of_arc("request1", ["SRC", "A"]) == ["edge_1"]
+    assert index.edges_of_arc("request1", ["A", "B"]) == []
+    assert index.edges["request1"]["A", "DST"] == [("edge_2", 1.5)]
+    assert index.placements == {("A", "path_2"): 1.0, ("A", "path_4"): 1.0}
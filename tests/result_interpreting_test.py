@@ -1,3 +1,5 @@
+import shutil
+
 import src.hvc.mip.gurobipy_mip as gmip
 import src.hvc.mip.solution_interpreter as interpreter
 import src.hvc.mip.utils as utils
@@ -19,6 +21,8 @@ def cleanup_domains(scenario, domains):
         path = file.format(scenario, domain)
         if os.path.exists(path):
             os.remove(path)
+    for domain, store in itertools.product(domains, ["solution", "full_solution"]):
+        shutil.rmtree("testfiles/result_interpreting/{0}/{1}/{2}".format(scenario, domain, store), ignore_errors=True)
 
 
 def run_scenario(scenario, domains, domain_nodes):
@@ -0,0 +1,34 @@
+import yaml
+
+import src.hvc.mip.gurobipy_mip as gmip
+from src.hvc.mip.utils import load_solution, read_solution
+
+
+def __solve(output_path, yaml_output=True):
+    return gmip.solve_model(network_description_file="testfiles/scenario_4/network_description.yaml",
+                            chain_description_file="testfiles/scenario_4/chains.yaml",
+                            vnf_description_file="testfiles/scenario_4/vnf_descriptions.yaml",
+                            vnf_request_description_file="testfiles/scenario_4/vnf_requests.yaml",
+                            advertised_restriction_file="testfiles/scenario_4/advertised_restrictions.yaml",
+                            output_file=str(output_path), yaml_output=yaml_output)
+
+
+def test_solution_store(tmp_path):
+    _, _, decision_variables, _ = __solve(tmp_path)
+    for condensed, yaml_file in [(False, "full_solution.log"), (True, "solution.log")]:
+        stored_solution = load_solution(str(tmp_path), condensed=condensed)
+        with open(tmp_path / yaml_file) as solution_file:
+            assert stored_solution.to_dict() == yaml.safe_load(solution_file)
+
+    records = list(load_solution(str(tmp_path)).records(family="lambda_total"))
+    assert len(records) > 0
+    for record in records:
+        assert record.value == decision_variables.lambda_total[record.key].X
+        assert record.name == decision_variables.lambda_total[record.key].VarName
+    assert read_solution(str(tmp_path)) == read_solution(str(tmp_path / "full_solution.log"))
+
+
+def test_solution_store_without_yaml(tmp_path):
+    __solve(tmp_path, yaml_output=False)
+    assert not (tmp_path / "full_solution.log").exists()
+    assert len(load_solution(str(tmp_path), condensed=True)) > 0
@@ -0,0 +1,29 @@
+import src.hvc.mip.gurobipy_mip as gmip
+from src.hvc.mip.solution_view import SolutionView, solution_view
+
+
+def test_solution_view():
+    parameters, indices, decision_variables, model = gmip.solve_model(
+        network_description_file="testfiles/scenario_4/network_description.yaml",
+        chain_description_file="testfiles/scenario_4/chains.yaml",
+        vnf_description_file="testfiles/scenario_4/vnf_descriptions.yaml",
+        vnf_request_description_file="testfiles/scenario_4/vnf_requests.yaml",
+        advertised_restriction_file="testfiles/scenario_4/advertised_restrictions.yaml")
+    solution = solution_view(decision_variables, model)
+    # the view of the solve is reused
+    assert solution is solution_view(decision_variables, model)
+    for family in solution.families:
+        values = getattr(solution, family)
+        variables = getattr(decision_variables, family)
+        assert len(values) == len([variable for variable in variables.values() if abs(variable.X) > 1e-6])
+        for key, variable in variables.items():
+            assert abs(values[key] - variable.X) <= 1e-6
+            assert key in values
+
+    lambda_total = SolutionView(decision_variables, model).lambda_total
+    key, value = next(lambda_total.items())
+    restricted = lambda_total.restrict(lambda restricted_key: restricted_key == key)
+    assert len(restricted) == 1
+    restricted[key] = 0
+    assert lambda_total[key] == value
+    assert list(restricted.items()) == []
@@ -0,0 +1,63 @@
+import pytest
+from gurobipy import GRB
+
+import src.hvc.mip.gurobipy_mip as gmip
+from src.hvc.mip.vnf_functions import VnfFunction, VnfFunctions
+
+
+def test_affine_lambda():
+    function = VnfFunction('lambda in_rate: 1.5 * in_rate + 2')
+    assert function.is_affine
+    assert function.slope == pytest.approx(1.5)
+    assert function.intercept == pytest.approx(2)
+    assert function(4) == pytest.approx(8)
+    assert function.inverse(8) == pytest.approx(4)
+
+
+def test_non_affine_lambda_is_rejected():
+    with pytest.raises(ValueError):
+        VnfFunction('lambda in_rate: in_rate ** 2')
+
+
+def test_piecewise_linear_function():
+    function = VnfFunction([[10, 7], [0, 0], [4, 4]])
+    assert not function.is_affine
+    assert function.pwl_points() == ([0, 4, 10], [0, 4, 7])
+    assert function(2) == pytest.approx(2)
+    assert function(7) == pytest.approx(5.5)
+    # extended beyond the last breakpoint
+    assert function(12) == pytest.approx(8)
+    assert function.inverse(5.5) == pytest.approx(7)
+
+    # collinear breakpoints describe an affine function
+    assert VnfFunction([[0, 1], [1, 3], [2, 5]]).is_affine
+    assert VnfFunction([[0, 0], [1, 1], [2, 1]]).inverse(1) is None
+
+
+def test_chain_rates():
+    functions = VnfFunctions({
+        "outgoing_rate": {"SRC": 'lambda in_rate: in_rate', "A": 'lambda in_rate: 2 * in_rate',
+                          "DST": 'lambda in_rate: in_rate'},
+        "cpu_consumption": {"SRC": 'lambda in_rate: 0', "A": 'lambda in_rate: in_rate', "DST": 'lambda in_rate: 0'}})
+    chain = [("SRC", "A"), ("A", "DST")]
+    assert functions.chain_rates(chain, 3) == [3, 6, 6]
+    assert functions.chain_rates(chain, 3) is functions.chain_rates(chain, 3)
+
+
+def test_piecewise_linear_scenario():
+    objective_values = []
+    for builder in ["quicksum", "matrix"]:
+        parameters, indices, decision_vars, model = gmip.solve_model(
+            network_description_file="testfiles/scenario_4_pwl/network_description.yaml",
+            chain_description_file="testfiles/scenario_4_pwl/chains.yaml",
+            vnf_description_file="testfiles/scenario_4_pwl/vnf_descriptions.yaml",
+            vnf_request_description_file="testfiles/scenario_4_pwl/vnf_requests.yaml",
+            advertised_restriction_file="testfiles/scenario_4_pwl/advertised_restrictions.yaml",
+            builder=builder)
+        assert model.Status == GRB.OPTIMAL
+        # the rate of 5 entering A is reduced to 4.5 by its piecewise-linear outgoing rate function
+        assert sum(decision_vars.sigma_out["DST", path].X for path in indices.paths if
+                   ("DST", path) in decision_vars.sigma_out) == pytest.approx(4.5)
+        objective_values.append([model.getObjective(objective).getValue() for objective in range(model.NumObj)])
+
+    assert objective_values[0] == objective_values[1]